@@ -1,199 +1,395 @@
-from flask import Flask, request, jsonify
-from web3 import Web3, HTTPProvider
+from flask import Flask, Blueprint, request, jsonify, g
+from web3 import Web3
+import datetime
 import json
 import os
 import sys
 import time
-from api.utils import load_contract, get_contract_address
+from api.utils import load_contract, load_contract_functions, get_contract_address, PAGE_CONTRACT_FUNCTIONS
+from api.chain import serialize_chain_campaign
+from api.async_chain import AsyncChainClient, SyncChainClient
+from api.simulator import SimulatedChain, SIM_CAMPAIGNS
+from api.providers import ProviderPool, PooledHTTPProvider, ProvidersUnavailable, rpc_urls_from_env
+from api.breaker import CircuitBreaker, CircuitOpenError
+from api.cache import BlockCache
+from api.listing import parse_listing_args, wants_listing, query_campaigns, filter_campaign_list
+from api.search import parse_search_args, search_campaigns
+from api.suggest import CampaignSuggestions, DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS
+from api.stats import load_stats, is_new_contributor, apply_contribution_stats, apply_comment_stats
+from api.ingest import ingest_contributions
+from api.upserts import insert_for, upsert_returning
+from api.indexer import INDEXER_NAME
 
 # Add parent directory to path to import models
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
-from models import db, User, OffChainCampaign, Comment, UserActivity, Contribution
+from models import (db, User, OffChainCampaign, Comment, UserActivity, Contribution, ChainCampaign, ContributionBalance,
+                    Refund, IndexerState)
 
-app = Flask(__name__)
-
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+# Routes are registered on every app create_app() builds
+bp = Blueprint('api', __name__)
 
 # Connect to Ethereum node - Sepolia testnet
 INFURA_KEY = os.getenv("INFURA_KEY", "")
-DEV_MODE = INFURA_KEY == ""  # Run in dev mode if no Infura key is provided
+# RPC endpoints to spread reads over (RPC_URLS, comma-separated; defaults to Infura)
+RPC_URLS = rpc_urls_from_env(INFURA_KEY)
+# Where chain reads come from: "rpc" (the endpoints above) or "sim" (an in-memory simulated contract)
+CHAIN_BACKEND = os.getenv("CHAIN_BACKEND", "rpc" if RPC_URLS else "sim")
+if CHAIN_BACKEND not in ("rpc", "sim"):
+    raise ValueError(f"Unknown CHAIN_BACKEND {CHAIN_BACKEND!r}, expected rpc or sim")
+if CHAIN_BACKEND == "rpc" and not RPC_URLS:
+    raise ValueError("CHAIN_BACKEND=rpc needs INFURA_KEY or RPC_URLS")
+DEV_MODE = CHAIN_BACKEND == "sim"  # No blockchain connection
 
-if not DEV_MODE:
-    try:
-        w3 = Web3(HTTPProvider(f"https://sepolia.infura.io/v3/{INFURA_KEY}"))
-        
-        # Contract setup
-        CONTRACT_ADDRESS = get_contract_address()
-        contract_abi = load_contract()
-        contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=contract_abi)
-    except Exception as e:
-        print(f"Error connecting to Ethereum: {e}")
-        DEV_MODE = True  # Fallback to dev mode
+# Serve read endpoints from the tables kept up to date by run_indexer.py
+READ_FROM_INDEX = os.getenv("READ_FROM_INDEX", "false").lower() == "true"
+
+# Chain read failures that open the circuit and make reads fall back to cached or indexed data
+CHAIN_FAILURE_ERRORS = (ProvidersUnavailable, TimeoutError)
+
+
+class ChainUnavailable(Exception):
+    """A chain read failed and there is no cached or indexed data to serve instead"""
+
+# Contract setup
+CONTRACT_ADDRESS = Web3.to_checksum_address(get_contract_address())
+contract_abi = load_contract()
+
+if CHAIN_BACKEND == "rpc":
+    # Requests go to the fastest healthy endpoint and fail over to the others; an endpoint
+    # that is down (even at startup) is retried after a cooldown instead of disabling chain reads
+    provider_pool = ProviderPool(RPC_URLS)
+    w3 = Web3(PooledHTTPProvider(provider_pool))
+    contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=contract_abi)
+
+    # Read endpoints go through the async client, which issues independent reads concurrently
+    chain = SyncChainClient(AsyncChainClient(provider_pool, CONTRACT_ADDRESS, contract_abi))
 else:
-    print("Running API in development mode with sample data (no blockchain connection)")
+    print(f"Running API in development mode on a simulated contract with {SIM_CAMPAIGNS} campaigns "
+          "(no blockchain connection)")
+    provider_pool = None
     w3 = None
     contract = None
+    chain = SimulatedChain(campaigns=SIM_CAMPAIGNS)
+
+# Stop calling a node that keeps failing; reads are served stale until it recovers
+chain_breaker = CircuitBreaker("chain", CHAIN_FAILURE_ERRORS)
+
+# Chain reads are cached per block; identical concurrent misses share one node call,
+# which passes the circuit breaker once however many requests wait on it
+chain_cache = BlockCache(lambda: chain_breaker.call(chain.block_number))
+
+# In-memory prefix index behind GET /api/campaigns/suggest
+campaign_suggestions = CampaignSuggestions()
+
+def indexed_block():
+    """Last block mirrored by the indexer, or None if it has never run against this database"""
+    state = db.session.get(IndexerState, INDEXER_NAME)
+    return state.last_block if state else None
+
+def mark_stale(block):
+    """Record that this response serves data as of an older block"""
+    g.as_of_block = min(block, g.get('as_of_block', block))
+
+def freshness():
+    """stale / as_of_block response fields when a chain read fell back to older data"""
+    if g.get('as_of_block') is None:
+        return {}
+    return {"stale": True, "as_of_block": g.as_of_block}
+
+def cached_read(endpoint, args, loader, fallback):
+    """
+    Serve a chain read from the block-keyed cache; loader receives the block number
+    When the node fails (or the circuit is open), serve the last cached result of the
+    same read, else fallback() from the indexed tables, and mark the response stale
+    """
+    try:
+        return chain_cache.get_or_load(endpoint, args, lambda block: chain_breaker.call(lambda: loader(block)))
+    except CHAIN_FAILURE_ERRORS + (CircuitOpenError,) as e:
+        error = e
+
+    last = chain_cache.last_known(endpoint, args)
+    if last is not None:
+        block, value = last
+        mark_stale(block)
+        return value
+
+    block = indexed_block()
+    if block is None:
+        raise ChainUnavailable(f"Blockchain node unavailable and no indexed data to serve: {error}") from error
+    mark_stale(block)
+    return fallback()
 
-@app.route('/api/campaigns', methods=['GET'])
+def index_campaigns():
+    """Every indexed campaign"""
+    return [serialize_chain_campaign(c) for c in ChainCampaign.query.order_by(ChainCampaign.chain_id)]
+
+def index_campaigns_by_id(campaign_ids):
+    """Indexed campaigns with the given IDs"""
+    rows = ChainCampaign.query.filter(ChainCampaign.chain_id.in_(campaign_ids)).all()
+    return [serialize_chain_campaign(row) for row in rows]
+
+def index_campaign(campaign_id):
+    """An indexed campaign, or None"""
+    campaign = db.session.get(ChainCampaign, campaign_id)
+    return serialize_chain_campaign(campaign) if campaign else None
+
+def index_contribution(campaign_id, address):
+    """Indexed contribution balance of an address to a campaign, in ETH"""
+    balance = db.session.get(ContributionBalance, (campaign_id, address.lower()))
+    return balance.amount if balance else 0.0
+
+def load_campaigns(campaign_ids):
+    """Load several campaigns in one query or one batched chain read, keyed by ID"""
+    campaign_ids = sorted(set(campaign_ids))
+    if not campaign_ids:
+        return {}
+
+    if READ_FROM_INDEX:
+        return {c['id']: c for c in index_campaigns_by_id(campaign_ids)}
+
+    campaigns = cached_read('campaigns_by_id', tuple(campaign_ids), lambda block: chain.get_campaigns(
+        campaign_ids, block), lambda: index_campaigns_by_id(campaign_ids))
+    return {c['id']: c for c in campaigns if c['exists']}
+
+def serialize_metadata(campaign):
+    """Off-chain metadata fields shown on campaign cards"""
+    return {
+        "id": campaign.id,
+        "chain_id": campaign.chain_id,
+        "title": campaign.title,
+        "description": campaign.description,
+        "image_url": campaign.image_url,
+        "category": campaign.category,
+        "tags": campaign.tags,
+        "website": campaign.website
+    }
+
+def attach_metadata(campaigns):
+    """Return copies of the campaigns with their OffChainCampaign metadata, loaded in one query"""
+    chain_ids = [c['id'] for c in campaigns]
+    rows = OffChainCampaign.query.filter(OffChainCampaign.chain_id.in_(chain_ids)).all() if chain_ids else []
+    metadata = {row.chain_id: serialize_metadata(row) for row in rows}
+    return [{**c, "metadata": metadata.get(c['id'])} for c in campaigns]
+
+def attach_stats(campaigns):
+    """Return copies of the campaigns with their stats rollup, loaded in one query"""
+    stats = load_stats(c['id'] for c in campaigns)
+    return [{**c, "stats": stats[c['id']]} for c in campaigns]
+
+def wants_include(name):
+    """Whether ?include= (comma-separated) asks for an optional section"""
+    return name in request.args.get('include', '').split(',')
+
+@bp.route('/api/campaigns', methods=['GET'])
 def get_campaigns():
-    """Get all campaigns from the blockchain"""
+    """
+    Get campaigns from the blockchain
+    Accepts limit, cursor, status, sort, creator and q for a filtered, paginated listing,
+    and include=metadata,stats to merge in off-chain metadata and the stats rollup
+    """
     try:
-        if DEV_MODE:
-            # Sample data for development mode
-            campaigns = [
-                {
-                    'id': 0,
-                    'creator': '0x1234567890123456789012345678901234567890',
-                    'title': 'Sample Campaign 1',
-                    'description': 'This is a sample campaign for testing purposes',
-                    'imageUrl': 'https://picsum.photos/800/500',
-                    'fundingGoal': 5.0,
-                    'currentAmount': 2.5,
-                    'deadline': int(time.time()) + 604800,  # 1 week from now
-                    'claimed': False,
-                    'exists': True
-                },
-                {
-                    'id': 1,
-                    'creator': '0x2345678901234567890123456789012345678901',
-                    'title': 'Sample Campaign 2',
-                    'description': 'Another sample campaign with more details',
-                    'imageUrl': 'https://picsum.photos/800/500?random=2',
-                    'fundingGoal': 10.0,
-                    'currentAmount': 7.5,
-                    'deadline': int(time.time()) + 1209600,  # 2 weeks from now
-                    'claimed': False,
-                    'exists': True
-                }
-            ]
+        listing = parse_listing_args(request.args) if wants_listing(request.args) else None
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+
+    try:
+        next_cursor = None
+        
+        if READ_FROM_INDEX and listing:
+            campaigns, next_cursor = query_campaigns(listing)
+        elif READ_FROM_INDEX:
+            campaigns = index_campaigns()
         else:
-            # Real blockchain data
-            campaign_count = contract.functions.campaignCount().call()
-            campaigns = []
-            
-            for i in range(campaign_count):
-                campaign = contract.functions.getCampaign(i).call()
-                campaign_data = {
-                    'id': i,
-                    'creator': campaign[0],
-                    'title': campaign[1],
-                    'description': campaign[2],
-                    'imageUrl': campaign[3],
-                    'fundingGoal': w3.from_wei(campaign[4], 'ether'),
-                    'currentAmount': w3.from_wei(campaign[5], 'ether'),
-                    'deadline': campaign[6],
-                    'claimed': campaign[7],
-                    'exists': campaign[8]
-                }
-                campaigns.append(campaign_data)
-        
-        return jsonify({"campaigns": campaigns, "success": True})
+            # Chain data (from the node in concurrent batched round trips, or the simulator)
+            campaigns = cached_read('campaigns', (), chain.get_all_campaigns, index_campaigns)
+        
+        if listing and not READ_FROM_INDEX:
+            campaigns, next_cursor = filter_campaign_list(campaigns, listing)
+        
+        if wants_include('metadata'):
+            campaigns = attach_metadata(campaigns)
+        if wants_include('stats'):
+            campaigns = attach_stats(campaigns)
+        
+        if listing:
+            return jsonify({"campaigns": campaigns, "next_cursor": next_cursor, **freshness(), "success": True})
+        
+        return jsonify({"campaigns": campaigns, **freshness(), "success": True})
+    except ChainUnavailable as e:
+        return jsonify({"error": str(e), "success": False}), 503
+    except Exception as e:
+        return jsonify({"error": str(e), "success": False}), 500
+
+@bp.route('/api/campaigns/search', methods=['GET'])
+def search():
+    """
+    Full-text search over campaign metadata (title, description, category and tags)
+    Accepts q (every word is matched as a prefix), limit and cursor; campaigns come back
+    best match first with their metadata and rank, and include=stats adds the stats rollup
+    """
+    try:
+        params = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+
+    try:
+        rows, next_cursor = search_campaigns(params)
+        chain_campaigns = load_campaigns(row.chain_id for row, _ in rows)
+        
+        # Metadata of a campaign that is not on chain (yet) is left out
+        campaigns = [
+            {**chain_campaigns[row.chain_id], "metadata": serialize_metadata(row), "rank": rank}
+            for row, rank in rows if row.chain_id in chain_campaigns
+        ]
+        if wants_include('stats'):
+            campaigns = attach_stats(campaigns)
+        
+        return jsonify({"campaigns": campaigns, "next_cursor": next_cursor, **freshness(), "success": True})
+    except ChainUnavailable as e:
+        return jsonify({"error": str(e), "success": False}), 503
     except Exception as e:
         return jsonify({"error": str(e), "success": False}), 500
 
-@app.route('/api/campaigns/<int:campaign_id>', methods=['GET'])
+@bp.route('/api/campaigns/suggest', methods=['GET'])
+def suggest():
+    """
+    Search-as-you-type suggestions from an in-memory index (no database round trip)
+    Returns the terms, and the campaigns, whose title (or a word of it), category or
+    a tag starts with q; limit caps each list
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_SUGGESTIONS))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer", "success": False}), 400
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SUGGESTIONS}", "success": False}), 400
+
+    try:
+        terms, campaigns = campaign_suggestions.get().suggest(request.args.get('q', ''), limit)
+        return jsonify({"terms": terms, "campaigns": campaigns, "success": True})
+    except Exception as e:
+        return jsonify({"error": str(e), "success": False}), 500
+
+def load_campaign(campaign_id):
+    """Load a single campaign, or None if it does not exist"""
+    if READ_FROM_INDEX:
+        return index_campaign(campaign_id)
+
+    campaign = cached_read('campaign', (campaign_id,), lambda block: chain.get_campaign(campaign_id, block),
+                           lambda: index_campaign(campaign_id))
+    return campaign if campaign and campaign['exists'] else None
+
+def load_contribution(campaign_id, address):
+    """Load the contribution of an address to a campaign, in ETH"""
+    if READ_FROM_INDEX:
+        return index_contribution(campaign_id, address)
+
+    return cached_read('contribution', (campaign_id, address.lower()), lambda block: chain.get_contribution(
+        campaign_id, address, block), lambda: index_contribution(campaign_id, address))
+
+def load_campaign_page(campaign_id, viewer):
+    """Load a campaign and the viewer's contribution (None without a viewer), reading the chain concurrently"""
+    if READ_FROM_INDEX:
+        return load_campaign(campaign_id), load_contribution(campaign_id, viewer) if viewer else None
+
+    key = (campaign_id, viewer.lower() if viewer else None)
+    campaign, contribution = cached_read(
+        'campaign_page', key, lambda block: chain.get_campaign_page(campaign_id, viewer, block),
+        lambda: (index_campaign(campaign_id), index_contribution(campaign_id, viewer) if viewer else None))
+    return campaign if campaign and campaign['exists'] else None, contribution
+
+@bp.route('/api/campaigns/<int:campaign_id>', methods=['GET'])
 def get_campaign(campaign_id):
     """Get details of a specific campaign"""
     try:
-        if DEV_MODE:
-            # Sample data for development mode
-            if campaign_id == 0:
-                campaign_data = {
-                    'id': 0,
-                    'creator': '0x1234567890123456789012345678901234567890',
-                    'title': 'Sample Campaign 1',
-                    'description': 'This is a sample campaign for testing purposes',
-                    'imageUrl': 'https://picsum.photos/800/500',
-                    'fundingGoal': 5.0,
-                    'currentAmount': 2.5,
-                    'deadline': int(time.time()) + 604800,  # 1 week from now
-                    'claimed': False,
-                    'exists': True
-                }
-            elif campaign_id == 1:
-                campaign_data = {
-                    'id': 1,
-                    'creator': '0x2345678901234567890123456789012345678901',
-                    'title': 'Sample Campaign 2',
-                    'description': 'Another sample campaign with more details',
-                    'imageUrl': 'https://picsum.photos/800/500?random=2',
-                    'fundingGoal': 10.0,
-                    'currentAmount': 7.5,
-                    'deadline': int(time.time()) + 1209600,  # 2 weeks from now
-                    'claimed': False,
-                    'exists': True
-                }
-            else:
-                return jsonify({"error": "Campaign not found", "success": False}), 404
-        else:
-            # Real blockchain data
-            campaign = contract.functions.getCampaign(campaign_id).call()
-            campaign_data = {
-                'id': campaign_id,
-                'creator': campaign[0],
-                'title': campaign[1],
-                'description': campaign[2],
-                'imageUrl': campaign[3],
-                'fundingGoal': w3.from_wei(campaign[4], 'ether'),
-                'currentAmount': w3.from_wei(campaign[5], 'ether'),
-                'deadline': campaign[6],
-                'claimed': campaign[7],
-                'exists': campaign[8]
-            }
+        campaign_data = load_campaign(campaign_id)
+        if campaign_data is None:
+            return jsonify({"error": "Campaign not found", "success": False}), 404
         
-        return jsonify({"campaign": campaign_data, "success": True})
+        return jsonify({"campaign": campaign_data, **freshness(), "success": True})
+    except ChainUnavailable as e:
+        return jsonify({"error": str(e), "success": False}), 503
     except Exception as e:
         return jsonify({"error": str(e), "success": False}), 500
 
-@app.route('/api/campaigns/<int:campaign_id>/contribution/<address>', methods=['GET'])
+@bp.route('/api/campaigns/<int:campaign_id>/contribution/<address>', methods=['GET'])
 def get_contribution(campaign_id, address):
     """Get contribution amount for a specific campaign and contributor"""
     try:
-        if DEV_MODE:
-            # Sample data for development mode
-            if address.lower() == '0x1234567890123456789012345678901234567890'.lower():
-                contribution_amount = 1.5 if campaign_id == 0 else 0.0
-            elif address.lower() == '0x2345678901234567890123456789012345678901'.lower():
-                contribution_amount = 0.5 if campaign_id == 0 else 3.0
-            else:
-                contribution_amount = 0.0
-        else:
-            # Real blockchain data
-            contribution = contract.functions.getContribution(campaign_id, address).call()
-            contribution_amount = w3.from_wei(contribution, 'ether')
-            
         return jsonify({
-            "contribution": contribution_amount,
+            "contribution": load_contribution(campaign_id, address),
+            **freshness(),
             "success": True
         })
+    except ChainUnavailable as e:
+        return jsonify({"error": str(e), "success": False}), 503
     except Exception as e:
         return jsonify({"error": str(e), "success": False}), 500
 
-# Route for contract information
-@app.route('/api/contract', methods=['GET'])
-def get_contract_info():
-    """Get contract address and ABI"""
-    if DEV_MODE:
-        # Sample contract information
-        sample_address = "0x8123d34f5b52e8852cda1accac646b34dd4c77b5"
-        sample_abi = load_contract()  # Use the same ABI for development
-        return jsonify({
-            "address": sample_address,
-            "abi": sample_abi,
-            "success": True
-        })
-    else:
+@bp.route('/api/campaigns/<int:campaign_id>/page', methods=['GET'])
+def get_campaign_page(campaign_id):
+    """
+    Get everything the campaign details page renders in one response:
+    campaign, metadata, viewer contribution, comments, stats and the ABI it calls
+    """
+    try:
+        viewer = request.args.get('viewer')
+        campaign_data, viewer_contribution = load_campaign_page(campaign_id, viewer)
+        if campaign_data is None:
+            return jsonify({"error": "Campaign not found", "success": False}), 404
+        
+        metadata = OffChainCampaign.query.filter_by(chain_id=campaign_id).first()
+        comments, comments_cursor = load_comments(metadata) if metadata else ([], None)
+        stats = load_stats([campaign_id])[campaign_id]
+        
         return jsonify({
-            "address": CONTRACT_ADDRESS,
-            "abi": contract_abi,
+            "campaign": campaign_data,
+            "metadata": serialize_metadata(metadata) if metadata else None,
+            "viewer_contribution": viewer_contribution,
+            "comments": comments,
+            "comments_next_cursor": comments_cursor,
+            "contributor_count": stats["backer_count"],
+            "stats": stats,
+            "contract_address": get_contract_address(),
+            "abi": load_contract_functions(PAGE_CONTRACT_FUNCTIONS),
+            **freshness(),
             "success": True
         })
+    except ChainUnavailable as e:
+        return jsonify({"error": str(e), "success": False}), 503
+    except Exception as e:
+        return jsonify({"error": str(e), "success": False}), 500
+
+# Route for contract information
+@bp.route('/api/contract', methods=['GET'])
+def get_contract_info():
+    """Get contract address and ABI"""
+    return jsonify({
+        "address": CONTRACT_ADDRESS,
+        "abi": contract_abi,
+        "success": True
+    })
+
+# Route for read-path metrics
+@bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get chain read cache, request coalescing, circuit breaker and RPC endpoint statistics"""
+    return jsonify({
+        "cache": chain_cache.stats() if chain_cache else None,
+        "singleflight": chain_cache.flight.stats() if chain_cache else None,
+        "breaker": chain_breaker.stats() if chain_breaker else None,
+        "providers": provider_pool.stats() if provider_pool else None,
+        "success": True
+    })
 
 # User routes
-@app.route('/api/users', methods=['POST'])
+USER_PROFILE_FIELDS = ('username', 'email', 'profile_image', 'bio')
+
+def get_or_create_user(wallet_address):
+    """Return the user of a wallet address, creating it if needed, in one statement"""
+    return upsert_returning(User, {"wallet_address": wallet_address}, [User.wallet_address])
+
+@bp.route('/api/users', methods=['POST'])
 def create_user():
     """Create or update a user profile"""
     try:
@@ -203,29 +399,15 @@ def create_user():
         if not wallet_address:
             return jsonify({"error": "Wallet address is required", "success": False}), 400
         
-        # Check if user already exists
-        user = User.query.filter_by(wallet_address=wallet_address).first()
+        # Only the fields that were sent are written to an existing user
+        profile = {field: data.get(field) for field in USER_PROFILE_FIELDS if field in data}
         
-        if user:
-            # Update existing user
-            if 'username' in data:
-                user.username = data.get('username')
-            if 'email' in data:
-                user.email = data.get('email')
-            if 'profile_image' in data:
-                user.profile_image = data.get('profile_image')
-            if 'bio' in data:
-                user.bio = data.get('bio')
-        else:
-            # Create new user
-            user = User(
-                wallet_address=wallet_address,
-                username=data.get('username'),
-                email=data.get('email'),
-                profile_image=data.get('profile_image'),
-                bio=data.get('bio')
-            )
-            db.session.add(user)
+        user = upsert_returning(
+            User,
+            {"wallet_address": wallet_address, **profile},
+            [User.wallet_address],
+            set_={**profile, "updated_at": datetime.datetime.utcnow()} if profile else None
+        )
         
         db.session.commit()
         
@@ -242,7 +424,7 @@ def create_user():
         db.session.rollback()
         return jsonify({"error": str(e), "success": False}), 500
 
-@app.route('/api/users/<wallet_address>', methods=['GET'])
+@bp.route('/api/users/<wallet_address>', methods=['GET'])
 def get_user(wallet_address):
     """Get user profile by wallet address"""
     try:
@@ -266,8 +448,68 @@ def get_user(wallet_address):
     except Exception as e:
         return jsonify({"error": str(e), "success": False}), 500
 
+# ETH left over after a full refund by float rounding; a net contribution below it is not backing
+REFUND_DUST = 1e-9
+
+@bp.route('/api/users/<address>/contributions', methods=['GET'])
+def get_user_contributions(address):
+    """
+    Get every campaign an address has contributed to, with campaign data
+    Backed by the indexer's contribution balances, or the contributions table without it
+    Accepts include=stats to add each campaign's stats rollup
+    """
+    try:
+        address = address.lower()
+
+        if READ_FROM_INDEX:
+            rows = db.session.query(ContributionBalance.campaign_id, ContributionBalance.amount).filter(
+                ContributionBalance.contributor_address == address,
+                ContributionBalance.amount > 0
+            ).order_by(ContributionBalance.campaign_id).all()
+        else:
+            # Net of refunds, like the contract's contributions mapping
+            refunded = db.session.query(
+                Refund.campaign_id, db.func.sum(Refund.amount).label('amount')
+            ).filter(Refund.contributor_address == address).group_by(Refund.campaign_id).subquery()
+            total = db.func.sum(Contribution.amount) - db.func.coalesce(db.func.max(refunded.c.amount), 0)
+            rows = db.session.query(Contribution.campaign_id, total).outerjoin(
+                refunded, refunded.c.campaign_id == Contribution.campaign_id
+            ).filter(
+                Contribution.contributor_address == address
+            ).group_by(Contribution.campaign_id).having(total > REFUND_DUST).order_by(Contribution.campaign_id).all()
+
+        campaigns = load_campaigns(campaign_id for campaign_id, _ in rows)
+
+        contributions = [
+            {
+                "campaign_id": campaign_id,
+                "amount": amount,
+                "campaign": campaigns.get(campaign_id)
+            }
+            for campaign_id, amount in rows
+        ]
+
+        if wants_include('stats'):
+            stats = load_stats(campaign_id for campaign_id, _ in rows)
+            for contribution in contributions:
+                contribution["stats"] = stats[contribution["campaign_id"]]
+
+        return jsonify({
+            "contributions": contributions,
+            "total": sum(amount for _, amount in rows),
+            **freshness(),
+            "success": True
+        })
+    except ChainUnavailable as e:
+        return jsonify({"error": str(e), "success": False}), 503
+    except Exception as e:
+        return jsonify({"error": str(e), "success": False}), 500
+
 # Campaign metadata routes
-@app.route('/api/campaign-metadata', methods=['POST'])
+CAMPAIGN_METADATA_FIELDS = ('title', 'description', 'image_url', 'category', 'tags', 'website', 'social_links')
+REQUIRED_METADATA_FIELDS = ('title', 'description', 'image_url')
+
+@bp.route('/api/campaign-metadata', methods=['POST'])
 def create_campaign_metadata():
     """Create or update off-chain campaign metadata"""
     try:
@@ -284,43 +526,36 @@ def create_campaign_metadata():
         if chain_id is None or not wallet_address:
             return jsonify({"error": "Chain ID and wallet address are required", "success": False}), 400
         
-        # Get user by wallet address
-        user = User.query.filter_by(wallet_address=wallet_address).first()
+        user = get_or_create_user(wallet_address)
         
-        if not user:
-            # Create user if doesn't exist
-            user = User(wallet_address=wallet_address)
-            db.session.add(user)
-            db.session.flush()
+        # Only the fields that were sent are written to existing metadata
+        fields = {field: data.get(field) for field in CAMPAIGN_METADATA_FIELDS if field in data}
+        updated_at = datetime.datetime.utcnow()
         
-        # Check if campaign metadata already exists
-        campaign = OffChainCampaign.query.filter_by(chain_id=chain_id).first()
-        
-        if campaign:
-            # Update existing campaign metadata
-            campaign.title = data.get('title', campaign.title)
-            campaign.description = data.get('description', campaign.description)
-            campaign.image_url = data.get('image_url', campaign.image_url)
-            campaign.category = data.get('category', campaign.category)
-            campaign.tags = data.get('tags', campaign.tags)
-            campaign.website = data.get('website', campaign.website)
-            campaign.social_links = data.get('social_links', campaign.social_links)
-        else:
-            # Create new campaign metadata
-            campaign = OffChainCampaign(
-                chain_id=chain_id,
-                creator_id=user.id,
-                title=data.get('title'),
-                description=data.get('description'),
-                image_url=data.get('image_url'),
-                category=data.get('category'),
-                tags=data.get('tags'),
-                website=data.get('website'),
-                social_links=data.get('social_links')
+        if all(fields.get(field) is not None for field in REQUIRED_METADATA_FIELDS):
+            # Create the metadata or update it, in one statement (relies on uq_campaigns_chain_id)
+            campaign = upsert_returning(
+                OffChainCampaign,
+                {"chain_id": chain_id, "creator_id": user.id, **fields},
+                [OffChainCampaign.chain_id],
+                set_={**fields, "updated_at": updated_at}
             )
-            db.session.add(campaign)
+        else:
+            # Without the required fields this can only update existing metadata
+            campaign = db.session.scalars(
+                db.update(OffChainCampaign)
+                .where(OffChainCampaign.chain_id == chain_id)
+                .values(**fields, updated_at=updated_at)
+                .returning(OffChainCampaign),
+                execution_options={"populate_existing": True}
+            ).one_or_none()
+            
+            if campaign is None:
+                db.session.rollback()
+                return jsonify({"error": "Title, description and image URL are required", "success": False}), 400
         
         db.session.commit()
+        campaign_suggestions.update(campaign)
         
         return jsonify({
             "campaign": {
@@ -334,7 +569,7 @@ def create_campaign_metadata():
         db.session.rollback()
         return jsonify({"error": str(e), "success": False}), 500
 
-@app.route('/api/campaign-metadata/<int:chain_id>', methods=['GET'])
+@bp.route('/api/campaign-metadata/<int:chain_id>', methods=['GET'])
 def get_campaign_metadata(chain_id):
     """Get off-chain campaign metadata by chain ID"""
     try:
@@ -364,9 +599,112 @@ def get_campaign_metadata(chain_id):
         return jsonify({"error": str(e), "success": False}), 500
 
 # Comment routes
-@app.route('/api/campaigns/<int:chain_id>/comments', methods=['GET'])
+def serialize_author(user):
+    return {
+        "id": user.id,
+        "wallet_address": user.wallet_address,
+        "username": user.username,
+        "profile_image": user.profile_image
+    }
+
+COMMENTS_PAGE_SIZE = 20
+MAX_COMMENTS_PAGE_SIZE = 100
+# Replies returned per top-level thread
+REPLY_LIMIT = 50
+MAX_REPLY_LIMIT = 500
+# Guards the recursive query against parent_id cycles
+MAX_COMMENT_DEPTH = 100
+
+def serialize_comment(comment, user):
+    return {
+        "id": comment.id,
+        "content": comment.content,
+        "user": serialize_author(user),
+        "created_at": comment.created_at,
+        "replies": []
+    }
+
+def load_comments(campaign, limit=COMMENTS_PAGE_SIZE, cursor=None, reply_limit=REPLY_LIMIT):
+    """
+    Load a page of top-level comments with their reply trees, in two queries
+    Top-level comments are keyset-paginated by ID; each thread returns at most
+    reply_limit replies (of any depth) plus its total reply_count
+    Returns (comments, next_cursor)
+    """
+    query = db.session.query(Comment, User).join(User, User.id == Comment.user_id).filter(
+        Comment.campaign_id == campaign.id,
+        Comment.parent_id.is_(None)
+    )
+    if cursor is not None:
+        query = query.filter(Comment.id > cursor)
+    top_level = query.order_by(Comment.id).limit(limit + 1).all()
+    
+    next_cursor = top_level[limit - 1][0].id if len(top_level) > limit else None
+    top_level = top_level[:limit]
+    
+    threads = {comment.id: serialize_comment(comment, user) for comment, user in top_level}
+    for thread in threads.values():
+        thread["reply_count"] = 0
+    
+    if threads and reply_limit > 0:
+        # Walk every reply tree under this page's comments, remembering its thread
+        tree = db.select(
+            Comment.id,
+            Comment.parent_id.label('root_id'),
+            db.literal(1).label('depth')
+        ).where(Comment.parent_id.in_(list(threads))).cte('comment_tree', recursive=True)
+        tree = tree.union_all(
+            db.select(Comment.id, tree.c.root_id, tree.c.depth + 1)
+            .where(Comment.parent_id == tree.c.id, tree.c.depth < MAX_COMMENT_DEPTH)
+        )
+        
+        # Rank replies per thread in creation order; a parent always ranks before its replies
+        ranked = db.select(
+            tree.c.id,
+            tree.c.root_id,
+            db.func.row_number().over(partition_by=tree.c.root_id, order_by=tree.c.id).label('position'),
+            db.func.count().over(partition_by=tree.c.root_id).label('thread_size')
+        ).subquery()
+        
+        rows = db.session.execute(
+            db.select(Comment, User, ranked.c.root_id, ranked.c.thread_size)
+            .join(ranked, ranked.c.id == Comment.id)
+            .join(User, User.id == Comment.user_id)
+            .where(ranked.c.position <= reply_limit)
+            .order_by(Comment.id)
+        ).all()
+        
+        nodes = dict(threads)
+        for reply, user, root_id, thread_size in rows:
+            nodes[reply.id] = serialize_comment(reply, user)
+            threads[root_id]["reply_count"] = thread_size
+            nodes[reply.parent_id]["replies"].append(nodes[reply.id])
+    
+    return list(threads.values()), next_cursor
+
+def parse_bounded_int(name, default, maximum, minimum=1):
+    """Read an integer query parameter within [minimum, maximum]; raises ValueError"""
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return value
+
+@bp.route('/api/campaigns/<int:chain_id>/comments', methods=['GET'])
 def get_comments(chain_id):
-    """Get comments for a campaign"""
+    """
+    Get comments for a campaign
+    Accepts limit and cursor for top-level comments and reply_limit per thread
+    """
+    try:
+        limit = parse_bounded_int('limit', COMMENTS_PAGE_SIZE, MAX_COMMENTS_PAGE_SIZE)
+        reply_limit = parse_bounded_int('reply_limit', REPLY_LIMIT, MAX_REPLY_LIMIT, minimum=0)
+        cursor = parse_bounded_int('cursor', 0, 2**63 - 1, minimum=0) if 'cursor' in request.args else None
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    
     try:
         # Find the campaign
         campaign = OffChainCampaign.query.filter_by(chain_id=chain_id).first()
@@ -374,50 +712,17 @@ def get_comments(chain_id):
         if not campaign:
             return jsonify({"error": "Campaign not found", "success": False}), 404
         
-        # Get top-level comments (no parent_id)
-        comments = Comment.query.filter_by(campaign_id=campaign.id, parent_id=None).all()
-        
-        result = []
-        for comment in comments:
-            user = User.query.get(comment.user_id)
-            
-            # Get replies for this comment
-            replies_list = []
-            for reply in comment.replies:
-                reply_user = User.query.get(reply.user_id)
-                replies_list.append({
-                    "id": reply.id,
-                    "content": reply.content,
-                    "user": {
-                        "id": reply_user.id,
-                        "wallet_address": reply_user.wallet_address,
-                        "username": reply_user.username,
-                        "profile_image": reply_user.profile_image
-                    },
-                    "created_at": reply.created_at
-                })
-            
-            result.append({
-                "id": comment.id,
-                "content": comment.content,
-                "user": {
-                    "id": user.id,
-                    "wallet_address": user.wallet_address,
-                    "username": user.username,
-                    "profile_image": user.profile_image
-                },
-                "created_at": comment.created_at,
-                "replies": replies_list
-            })
+        comments, next_cursor = load_comments(campaign, limit, cursor, reply_limit)
         
         return jsonify({
-            "comments": result,
+            "comments": comments,
+            "next_cursor": next_cursor,
             "success": True
         })
     except Exception as e:
         return jsonify({"error": str(e), "success": False}), 500
 
-@app.route('/api/campaigns/<int:chain_id>/comments', methods=['POST'])
+@bp.route('/api/campaigns/<int:chain_id>/comments', methods=['POST'])
 def create_comment(chain_id):
     """Create a comment for a campaign"""
     try:
@@ -429,14 +734,7 @@ def create_comment(chain_id):
         if not wallet_address or not content:
             return jsonify({"error": "Wallet address and content are required", "success": False}), 400
         
-        # Get user by wallet address
-        user = User.query.filter_by(wallet_address=wallet_address).first()
-        
-        if not user:
-            # Create user if doesn't exist
-            user = User(wallet_address=wallet_address)
-            db.session.add(user)
-            db.session.flush()
+        user = get_or_create_user(wallet_address)
         
         # Find the campaign
         campaign = OffChainCampaign.query.filter_by(chain_id=chain_id).first()
@@ -453,6 +751,7 @@ def create_comment(chain_id):
         )
         
         db.session.add(comment)
+        apply_comment_stats(chain_id)
         
         # Record activity
         activity = UserActivity(
@@ -484,7 +783,7 @@ def create_comment(chain_id):
         return jsonify({"error": str(e), "success": False}), 500
 
 # Contribution tracking
-@app.route('/api/contributions', methods=['POST'])
+@bp.route('/api/contributions', methods=['POST'])
 def record_contribution():
     """Record a contribution to the database (mirror of blockchain data)"""
     try:
@@ -497,28 +796,32 @@ def record_contribution():
         if not campaign_id or not contributor_address or not amount or not transaction_hash:
             return jsonify({"error": "Missing required fields", "success": False}), 400
         
-        # Check if this transaction hash already exists
-        existing = Contribution.query.filter_by(transaction_hash=transaction_hash).first()
-        if existing:
+        # The indexer may already have recorded the transaction's events
+        if db.session.query(db.exists().where(Contribution.transaction_hash == transaction_hash)).scalar():
             return jsonify({"error": "Transaction already recorded", "success": False}), 400
         
-        # Create contribution record
-        contribution = Contribution(
+        new_contributor = is_new_contributor(campaign_id, contributor_address)
+        
+        # Create contribution record (addresses are stored lower-cased for lookups); the log index
+        # is left for the indexer, so a hash already reported inserts nothing and returns no row
+        stmt = insert_for(Contribution).values(
             campaign_id=campaign_id,
-            contributor_address=contributor_address,
+            contributor_address=contributor_address.lower(),
             amount=amount,
             transaction_hash=transaction_hash
-        )
+        ).on_conflict_do_nothing(
+            index_elements=[Contribution.transaction_hash, Contribution.log_index]
+        ).returning(Contribution)
+        contribution = db.session.scalars(stmt).one_or_none()
         
-        db.session.add(contribution)
+        if contribution is None:
+            db.session.rollback()
+            return jsonify({"error": "Transaction already recorded", "success": False}), 400
         
-        # Get or create user
-        user = User.query.filter_by(wallet_address=contributor_address).first()
+        # Stats are updated in the same transaction, so they never count a rolled back contribution
+        apply_contribution_stats(campaign_id, contribution.amount, contribution.timestamp, new_contributor)
         
-        if not user:
-            user = User(wallet_address=contributor_address)
-            db.session.add(user)
-            db.session.flush()
+        user = get_or_create_user(contributor_address)
         
         # Record activity
         activity = UserActivity(
@@ -546,9 +849,72 @@ def record_contribution():
         db.session.rollback()
         return jsonify({"error": str(e), "success": False}), 500
 
-# Create necessary database tables on startup
-with app.app_context():
-    db.create_all()
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+def read_ndjson(stream):
+    """Yield one parsed item per non-empty line, or the ValueError of a malformed line"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+@bp.route('/api/contributions/bulk', methods=['POST'])
+def record_contributions_bulk():
+    """
+    Record many contributions at once (backfills of historical data)
+    Accepts a JSON array, or one JSON object per line with Content-Type application/x-ndjson
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = read_ndjson(request.stream)
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({"error": "Expected a JSON array of contributions", "success": False}), 400
+    
+    try:
+        results = ingest_contributions(items)
+        
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        
+        return jsonify({
+            "results": results,
+            "recorded": counts.get("recorded", 0),
+            "duplicates": counts.get("duplicate", 0),
+            "invalid": counts.get("invalid", 0),
+            "errors": counts.get("error", 0),
+            "success": True
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "success": False}), 500
+
+def create_app():
+    """
+    Create the API application
+    Building an app does not touch the database; create missing tables with
+    create_schema() (run_api.py does it once at startup) or manage them with alembic
+    """
+    app = Flask(__name__)
+
+    # Database configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    app.register_blueprint(bp)
+    return app
+
+def create_schema(app):
+    """Create missing tables, then close the connections used, so that forked workers open their own"""
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000, debug=True)
+# Default instance for the indexer, scripts and benchmarks
+app = create_app()
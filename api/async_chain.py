@@ -0,0 +1,189 @@
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from web3 import AsyncWeb3
+from api.chain import CAMPAIGN_BATCH_SIZE, ChainBackend, format_campaign
+from api.providers import PooledAsyncHTTPProvider
+
+# Maximum number of RPC requests (single calls or batches) in flight per API process
+ASYNC_CHAIN_CONCURRENCY = int(os.getenv("ASYNC_CHAIN_CONCURRENCY", "8"))
+# Seconds a synchronous caller waits for a read of every campaign before giving up
+ASYNC_CHAIN_TIMEOUT = float(os.getenv("ASYNC_CHAIN_TIMEOUT", "30"))
+# Seconds a synchronous caller waits for any other read (block number, one campaign, one contribution)
+CHAIN_CALL_TIMEOUT = float(os.getenv("CHAIN_CALL_TIMEOUT", "8"))
+
+
+class AsyncChainClient:
+    """
+    Contract reads over AsyncWeb3
+    Independent reads (and the batches of a large read) are issued concurrently;
+    each in-flight request holds one of `concurrency` connections, which bounds the fan-out
+    Requests are routed through the endpoints of a ProviderPool
+    """
+
+    def __init__(self, pool, contract_address, abi, concurrency=ASYNC_CHAIN_CONCURRENCY, batch_size=None):
+        self.pool = pool
+        self.contract_address = contract_address
+        self.abi = abi
+        self.concurrency = concurrency
+        self.batch_size = batch_size or CAMPAIGN_BATCH_SIZE
+        self._idle = None
+
+    def _connect(self):
+        w3 = AsyncWeb3(PooledAsyncHTTPProvider(self.pool))
+        return w3, w3.eth.contract(address=self.contract_address, abi=self.abi)
+
+    @asynccontextmanager
+    async def _connection(self):
+        """
+        Borrow an idle (w3, contract) pair, waiting while all of them are in use
+        web3 tracks an open batch on the provider, so concurrent requests must not share one
+        """
+        if self._idle is None:
+            # Created on first use so the queue belongs to the loop the client runs on
+            self._idle = asyncio.Queue()
+            for _ in range(self.concurrency):
+                self._idle.put_nowait(self._connect())
+
+        connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self):
+        """Close the HTTP sessions of every connection (waits for in-flight requests)"""
+        if self._idle is None:
+            return
+        for _ in range(self.concurrency):
+            w3, _ = await self._idle.get()
+            await w3.provider.disconnect()
+        self._idle = None
+
+    def forget_connections(self):
+        """Drop connections opened on another event loop (e.g. inherited from the parent of a fork)"""
+        self._idle = None
+
+    async def block_number(self):
+        async with self._connection() as (w3, _):
+            return await w3.eth.block_number
+
+    async def _pin(self, block_identifier):
+        """Resolve 'latest' once so that reads split across requests see the same block"""
+        if block_identifier == 'latest':
+            return await self.block_number()
+        return block_identifier
+
+    async def _fetch_batch(self, campaign_ids, block_identifier):
+        async with self._connection() as (w3, contract):
+            async with w3.batch_requests() as batch:
+                for campaign_id in campaign_ids:
+                    batch.add(contract.functions.getCampaign(campaign_id).call(block_identifier=block_identifier))
+                results = await batch.async_execute()
+
+        return [format_campaign(w3, campaign_id, campaign) for campaign_id, campaign in zip(campaign_ids, results)]
+
+    async def get_campaigns(self, campaign_ids, block_identifier='latest'):
+        """Fetch several campaigns in JSON-RPC batches that are sent concurrently"""
+        campaign_ids = list(campaign_ids)
+        if not campaign_ids:
+            return []
+        if len(campaign_ids) > self.batch_size:
+            block_identifier = await self._pin(block_identifier)
+
+        chunks = [campaign_ids[start:start + self.batch_size] for start in range(0, len(campaign_ids), self.batch_size)]
+        batches = await asyncio.gather(*(self._fetch_batch(chunk, block_identifier) for chunk in chunks))
+        return [campaign for batch in batches for campaign in batch]
+
+    async def get_all_campaigns(self, block_identifier='latest'):
+        block_identifier = await self._pin(block_identifier)
+        async with self._connection() as (_, contract):
+            campaign_count = await contract.functions.campaignCount().call(block_identifier=block_identifier)
+        return await self.get_campaigns(range(campaign_count), block_identifier)
+
+    async def get_campaign(self, campaign_id, block_identifier='latest'):
+        async with self._connection() as (w3, contract):
+            campaign = await contract.functions.getCampaign(campaign_id).call(block_identifier=block_identifier)
+        return format_campaign(w3, campaign_id, campaign)
+
+    async def get_contribution(self, campaign_id, address, block_identifier='latest'):
+        """Contribution of an address to a campaign, in ETH"""
+        address = AsyncWeb3.to_checksum_address(address)
+        async with self._connection() as (w3, contract):
+            amount = await contract.functions.getContribution(campaign_id, address).call(
+                block_identifier=block_identifier)
+        return float(w3.from_wei(amount, 'ether'))
+
+    async def get_campaign_page(self, campaign_id, viewer=None, block_identifier='latest'):
+        """Campaign and (if viewer is given) the viewer's contribution, read concurrently"""
+        block_identifier = await self._pin(block_identifier)
+        if not viewer:
+            return await self.get_campaign(campaign_id, block_identifier), None
+        return tuple(await asyncio.gather(
+            self.get_campaign(campaign_id, block_identifier),
+            self.get_contribution(campaign_id, viewer, block_identifier)
+        ))
+
+
+class SyncChainClient(ChainBackend):
+    """
+    Blocking adapter for Flask handlers
+    Runs an AsyncChainClient on one background event loop shared by all request threads
+    Every call has a deadline (timeout for full listings, call_timeout otherwise), after
+    which the read is cancelled and TimeoutError raised, so a slow node cannot hold a worker
+    The loop is started on first use in each process: a server that imports the app and
+    then forks workers leaves them without the parent's loop thread
+    """
+
+    def __init__(self, client, timeout=ASYNC_CHAIN_TIMEOUT, call_timeout=CHAIN_CALL_TIMEOUT):
+        self.client = client
+        self.timeout = timeout
+        self.call_timeout = call_timeout
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _running_loop(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    if self._pid is not None:
+                        self.client.forget_connections()
+                    self._loop = asyncio.new_event_loop()
+                    threading.Thread(target=self._loop.run_forever, name="chain-client", daemon=True).start()
+                    self._pid = os.getpid()
+        return self._loop
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the client's loop and wait for its result (up to timeout seconds)"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._running_loop())
+        try:
+            return future.result(timeout or self.call_timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self.run(self.client.close(), self.timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def block_number(self):
+        return self.run(self.client.block_number())
+
+    def get_campaigns(self, campaign_ids, block_identifier='latest'):
+        return self.run(self.client.get_campaigns(campaign_ids, block_identifier), self.timeout)
+
+    def get_all_campaigns(self, block_identifier='latest'):
+        return self.run(self.client.get_all_campaigns(block_identifier), self.timeout)
+
+    def get_campaign(self, campaign_id, block_identifier='latest'):
+        return self.run(self.client.get_campaign(campaign_id, block_identifier))
+
+    def get_contribution(self, campaign_id, address, block_identifier='latest'):
+        return self.run(self.client.get_contribution(campaign_id, address, block_identifier))
+
+    def get_campaign_page(self, campaign_id, viewer=None, block_identifier='latest'):
+        return self.run(self.client.get_campaign_page(campaign_id, viewer, block_identifier))
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+# Consecutive failed chain reads that open the circuit
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+# Seconds the circuit stays open before a single trial read is let through
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open, so the call was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency after failure_threshold consecutive failures
+    While open, calls fail immediately with CircuitOpenError; after reset_timeout one
+    trial call is let through, and its outcome closes the circuit or opens it again
+    Only exceptions in failure_errors count as failures, anything else is passed through
+    """
+
+    def __init__(self, name, failure_errors, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_errors = failure_errors
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.consecutive_failures = 0
+
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def _allow(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def _record_success(self):
+        with self._lock:
+            recovered = self._state != CLOSED
+            self._state = CLOSED
+            self._trial_running = False
+            self.consecutive_failures = 0
+
+        if recovered:
+            print(f"Circuit {self.name} closed")
+
+    def _record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            trips = self._state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold
+            self._trial_running = False
+            if trips:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self.opened += 1
+
+        if trips:
+            print(f"Circuit {self.name} open for {self.reset_timeout:g}s after {type(error).__name__}: {error}")
+
+    def call(self, fn):
+        """Call fn() unless the circuit is open"""
+        if not self._allow():
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+
+        try:
+            result = fn()
+        except self.failure_errors as e:
+            self._record_failure(e)
+            raise
+        except Exception:
+            # The dependency answered (e.g. a reverted call), so it counts as healthy
+            self._record_success()
+            raise
+
+        self._record_success()
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self.consecutive_failures,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened": self.opened
+            }
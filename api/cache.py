@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from api.singleflight import SingleFlight
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# How long (seconds) a fetched block number is trusted before asking the node again
+BLOCK_NUMBER_TTL = float(os.getenv("BLOCK_NUMBER_TTL", "1.0"))
+
+
+class BlockCache:
+    """
+    LRU cache of chain read results keyed by (endpoint, args, block number)
+    Chain state only changes once per block, so every entry is dropped as
+    soon as a new block number is observed
+    The last result of every read is also kept across blocks, to be served
+    (marked stale) when the node cannot be reached
+    Concurrent misses for the same read and block share one call to the node
+    """
+
+    def __init__(self, get_block_number, max_entries=CACHE_MAX_ENTRIES, block_ttl=BLOCK_NUMBER_TTL):
+        self._get_block_number = get_block_number
+        self.max_entries = max_entries
+        self.block_ttl = block_ttl
+
+        self._entries = OrderedDict()
+        self._last_known = OrderedDict()
+        self._lock = threading.Lock()
+        self.flight = SingleFlight()
+        self._block = None
+        self._block_checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_hits = 0
+
+    def current_block(self):
+        """Return the latest block number, polling the node at most once per block_ttl"""
+        now = time.monotonic()
+        with self._lock:
+            if self._block is not None and now - self._block_checked_at < self.block_ttl:
+                return self._block
+
+        block = self.flight.do(('block_number',), self._get_block_number)
+
+        with self._lock:
+            if block != self._block:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._block = block
+            self._block_checked_at = now
+
+        return block
+
+    def get_or_load(self, endpoint, args, loader):
+        """Return the cached result for the current block, calling loader(block) on a miss"""
+        block = self.current_block()
+        key = (endpoint, args, block)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        return self.flight.do(key, lambda: self._load(endpoint, args, block, loader))
+
+    def _load(self, endpoint, args, block, loader):
+        """Call loader(block) and store its result (before waiting callers are released)"""
+        key = (endpoint, args, block)
+        value = loader(block)
+
+        with self._lock:
+            # Skip storing results for a block that has already been superseded
+            if block == self._block:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+            last = self._last_known.get((endpoint, args))
+            if last is None or block >= last[0]:
+                self._last_known[(endpoint, args)] = (block, value)
+                self._last_known.move_to_end((endpoint, args))
+                while len(self._last_known) > self.max_entries:
+                    self._last_known.popitem(last=False)
+
+        return value
+
+    def last_known(self, endpoint, args):
+        """Return (block, result) of the newest successful load of a read, or None"""
+        with self._lock:
+            last = self._last_known.get((endpoint, args))
+            if last is not None:
+                self.stale_hits += 1
+            return last
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_hits": self.stale_hits,
+                "block": self._block
+            }
@@ -0,0 +1,95 @@
+import os
+
+# Number of getCampaign() calls packed into one JSON-RPC batch request
+CAMPAIGN_BATCH_SIZE = int(os.getenv("CAMPAIGN_BATCH_SIZE", "100"))
+
+
+def format_campaign(w3, campaign_id, campaign):
+    """Convert a raw getCampaign() result into the API response shape (amounts as float ETH, like the index)"""
+    return {
+        'id': campaign_id,
+        'creator': campaign[0],
+        'title': campaign[1],
+        'description': campaign[2],
+        'imageUrl': campaign[3],
+        'fundingGoal': float(w3.from_wei(campaign[4], 'ether')),
+        'currentAmount': float(w3.from_wei(campaign[5], 'ether')),
+        'deadline': campaign[6],
+        'claimed': campaign[7],
+        'exists': campaign[8]
+    }
+
+
+class ChainBackend:
+    """
+    The contract reads the API serves, whatever answers them
+    Implemented by SyncChainClient (JSON-RPC node) and SimulatedChain (in memory);
+    amounts are returned in ETH and campaigns in the format_campaign() shape
+    """
+
+    def block_number(self):
+        raise NotImplementedError
+
+    def get_campaigns(self, campaign_ids, block_identifier='latest'):
+        raise NotImplementedError
+
+    def get_all_campaigns(self, block_identifier='latest'):
+        raise NotImplementedError
+
+    def get_campaign(self, campaign_id, block_identifier='latest'):
+        raise NotImplementedError
+
+    def get_contribution(self, campaign_id, address, block_identifier='latest'):
+        raise NotImplementedError
+
+    def get_campaign_page(self, campaign_id, viewer=None, block_identifier='latest'):
+        """Campaign and (if viewer is given) the viewer's contribution, as of the same block"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def fetch_campaigns(w3, contract, campaign_ids, batch_size=None, block_identifier='latest'):
+    """
+    Fetch several campaigns using JSON-RPC batch requests
+    N campaigns cost ceil(N / batch_size) round trips instead of N
+    """
+    batch_size = batch_size or CAMPAIGN_BATCH_SIZE
+    campaign_ids = list(campaign_ids)
+    campaigns = []
+
+    for start in range(0, len(campaign_ids), batch_size):
+        chunk = campaign_ids[start:start + batch_size]
+
+        with w3.batch_requests() as batch:
+            for campaign_id in chunk:
+                batch.add(contract.functions.getCampaign(campaign_id).call(block_identifier=block_identifier))
+            results = batch.execute()
+
+        for campaign_id, campaign in zip(chunk, results):
+            campaigns.append(format_campaign(w3, campaign_id, campaign))
+
+    return campaigns
+
+
+def fetch_all_campaigns(w3, contract, batch_size=None, block_identifier='latest'):
+    """Fetch every campaign in a fixed number of batched round trips"""
+    campaign_count = contract.functions.campaignCount().call(block_identifier=block_identifier)
+    return fetch_campaigns(w3, contract, range(campaign_count), batch_size, block_identifier)
+
+
+def serialize_chain_campaign(campaign):
+    """Convert an indexed ChainCampaign row into the API response shape"""
+    return {
+        'id': campaign.chain_id,
+        'creator': campaign.creator,
+        'title': campaign.title,
+        'description': campaign.description,
+        'imageUrl': campaign.image_url,
+        'fundingGoal': campaign.funding_goal,
+        'currentAmount': campaign.current_amount,
+        'deadline': campaign.deadline,
+        'claimed': campaign.claimed,
+        'exists': True
+    }
@@ -0,0 +1,257 @@
+import datetime
+import os
+import time
+from web3 import Web3
+from models import db, ChainCampaign, ContributionBalance, Contribution, Refund, IndexerState, UNINDEXED_LOG_INDEX
+from api.chain import CAMPAIGN_BATCH_SIZE, fetch_campaigns
+from api.upserts import insert_for
+from api.stats import is_new_contributor, apply_contribution_stats, apply_refund_stats, apply_claim_stats
+
+INDEXER_NAME = "campaign_events"
+# First block to scan on a fresh database (should be the contract deployment block)
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+# Number of blocks requested per eth_getLogs call
+INDEXER_BLOCK_CHUNK = int(os.getenv("INDEXER_BLOCK_CHUNK", "2000"))
+# Blocks behind the head that are considered final enough to index
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "5"))
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "12"))
+
+
+def to_eth(w3, amount):
+    """Convert a wei amount to a float ETH value as stored in the database"""
+    return float(w3.from_wei(amount, 'ether'))
+
+
+class CampaignIndexer:
+    """
+    Mirrors CampaignCreated, ContributionMade, FundsClaimed and FundsRefunded
+    events into the database, resuming from a persisted block cursor
+    """
+
+    def __init__(self, w3, contract, name=INDEXER_NAME):
+        self.w3 = w3
+        self.contract = contract
+        self.name = name
+
+        events = contract.events
+        self.handlers = {
+            events.CampaignCreated.topic: (events.CampaignCreated, self._on_campaign_created),
+            events.ContributionMade.topic: (events.ContributionMade, self._on_contribution_made),
+            events.FundsClaimed.topic: (events.FundsClaimed, self._on_funds_claimed),
+            events.FundsRefunded.topic: (events.FundsRefunded, self._on_funds_refunded),
+        }
+
+    def get_cursor(self):
+        """Return the last fully indexed block"""
+        state = db.session.get(IndexerState, self.name)
+        return state.last_block if state else INDEXER_START_BLOCK - 1
+
+    def run_once(self):
+        """Index every confirmed block past the cursor and return the number of events applied"""
+        head = self.w3.eth.block_number - INDEXER_CONFIRMATIONS
+        cursor = self.get_cursor()
+        applied = 0
+
+        while cursor < head:
+            to_block = min(cursor + INDEXER_BLOCK_CHUNK, head)
+            applied += self.index_range(cursor + 1, to_block)
+            cursor = to_block
+
+        return applied
+
+    def run_forever(self, poll_interval=INDEXER_POLL_INTERVAL):
+        """Keep the database in sync with the chain"""
+        while True:
+            try:
+                applied = self.run_once()
+                if applied:
+                    print(f"Indexed {applied} events up to block {self.get_cursor()}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Indexer error: {e}")
+
+            time.sleep(poll_interval)
+
+    def index_range(self, from_block, to_block):
+        """
+        Apply all contract events in [from_block, to_block]
+        Events and the cursor are committed in one transaction, so a crash
+        never applies a block range twice
+        """
+        logs = self.w3.eth.get_logs({
+            "address": self.contract.address,
+            "fromBlock": from_block,
+            "toBlock": to_block
+        })
+
+        events = []
+        for log in logs:
+            topic = Web3.to_hex(log["topics"][0])
+            if topic in self.handlers:
+                event_type, handler = self.handlers[topic]
+                events.append((event_type().process_log(log), handler))
+
+        timestamps = self._block_timestamps({event.blockNumber for event, _ in events})
+
+        # CampaignCreated does not carry description and image URL; these never
+        # change after creation, so read them from the current contract state
+        created_ids = [event.args.campaignId for event, handler in events
+                       if handler == self._on_campaign_created]
+        details = {c['id']: c for c in fetch_campaigns(self.w3, self.contract, created_ids)}
+
+        try:
+            for event, handler in events:
+                handler(event, timestamps[event.blockNumber], details)
+
+            self._save_cursor(to_block)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return len(events)
+
+    def _save_cursor(self, block_number):
+        stmt = insert_for(IndexerState).values(name=self.name, last_block=block_number)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IndexerState.name],
+            set_={"last_block": block_number, "updated_at": datetime.datetime.utcnow()}
+        )
+        db.session.execute(stmt)
+
+    def _block_timestamps(self, block_numbers):
+        """Fetch block timestamps in batched round trips"""
+        block_numbers = sorted(block_numbers)
+        timestamps = {}
+
+        for start in range(0, len(block_numbers), CAMPAIGN_BATCH_SIZE):
+            chunk = block_numbers[start:start + CAMPAIGN_BATCH_SIZE]
+
+            with self.w3.batch_requests() as batch:
+                for block_number in chunk:
+                    batch.add(self.w3.eth.get_block(block_number))
+                blocks = batch.execute()
+
+            for block_number, block in zip(chunk, blocks):
+                timestamps[block_number] = datetime.datetime.utcfromtimestamp(block["timestamp"])
+
+        return timestamps
+
+    def _on_campaign_created(self, event, timestamp, details):
+        args = event.args
+        campaign = details.get(args.campaignId, {})
+
+        stmt = insert_for(ChainCampaign).values(
+            chain_id=args.campaignId,
+            creator=args.creator.lower(),
+            title=args.title,
+            description=campaign.get('description'),
+            image_url=campaign.get('imageUrl'),
+            funding_goal=to_eth(self.w3, args.fundingGoal),
+            current_amount=0,
+            funding_ratio=0,
+            deadline=args.deadline,
+            claimed=False,
+            created_block=event.blockNumber,
+            updated_block=event.blockNumber
+        )
+        db.session.execute(stmt.on_conflict_do_nothing(index_elements=[ChainCampaign.chain_id]))
+
+    def _on_contribution_made(self, event, timestamp, details):
+        args = event.args
+        amount = to_eth(self.w3, args.amount)
+        contributor = args.contributor.lower()
+
+        db.session.execute(
+            db.update(ChainCampaign)
+            .where(ChainCampaign.chain_id == args.campaignId)
+            .values(
+                current_amount=ChainCampaign.current_amount + amount,
+                funding_ratio=(ChainCampaign.current_amount + amount) / ChainCampaign.funding_goal,
+                updated_block=event.blockNumber
+            )
+        )
+
+        stmt = insert_for(ContributionBalance).values(
+            campaign_id=args.campaignId,
+            contributor_address=contributor,
+            amount=amount,
+            updated_block=event.blockNumber
+        )
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[ContributionBalance.campaign_id, ContributionBalance.contributor_address],
+            set_={
+                "amount": ContributionBalance.amount + stmt.excluded.amount,
+                "updated_block": stmt.excluded.updated_block
+            }
+        ))
+
+        # A row recorded earlier through POST /api/contributions is this event: it only
+        # takes the event's log index (and was counted in the stats when it was recorded)
+        transaction_hash = Web3.to_hex(event.transactionHash)
+        claimed = db.session.execute(
+            db.update(Contribution)
+            .where(Contribution.transaction_hash == transaction_hash,
+                   Contribution.log_index == UNINDEXED_LOG_INDEX,
+                   Contribution.campaign_id == args.campaignId,
+                   Contribution.contributor_address == contributor)
+            .values(log_index=event.logIndex)
+        )
+        if claimed.rowcount:
+            return
+
+        new_contributor = is_new_contributor(args.campaignId, contributor)
+        stmt = insert_for(Contribution).values(
+            campaign_id=args.campaignId,
+            contributor_address=contributor,
+            amount=amount,
+            transaction_hash=transaction_hash,
+            log_index=event.logIndex,
+            timestamp=timestamp
+        )
+        result = db.session.execute(stmt.on_conflict_do_nothing(
+            index_elements=[Contribution.transaction_hash, Contribution.log_index]))
+        if result.rowcount:
+            apply_contribution_stats(args.campaignId, amount, timestamp, new_contributor)
+
+    def _on_funds_claimed(self, event, timestamp, details):
+        args = event.args
+
+        db.session.execute(
+            db.update(ChainCampaign)
+            .where(ChainCampaign.chain_id == args.campaignId)
+            .values(
+                claimed=True,
+                claimed_amount=to_eth(self.w3, args.amount),
+                claim_transaction_hash=Web3.to_hex(event.transactionHash),
+                updated_block=event.blockNumber
+            )
+        )
+        apply_claim_stats(args.campaignId)
+
+    def _on_funds_refunded(self, event, timestamp, details):
+        args = event.args
+        amount = to_eth(self.w3, args.amount)
+        contributor = args.contributor.lower()
+
+        # The contract zeroes the contribution but leaves currentAmount as is
+        db.session.execute(
+            db.update(ContributionBalance)
+            .where(ContributionBalance.campaign_id == args.campaignId,
+                   ContributionBalance.contributor_address == contributor)
+            .values(amount=0, updated_block=event.blockNumber)
+        )
+
+        stmt = insert_for(Refund).values(
+            campaign_id=args.campaignId,
+            contributor_address=contributor,
+            amount=amount,
+            transaction_hash=Web3.to_hex(event.transactionHash),
+            log_index=event.logIndex,
+            block_number=event.blockNumber,
+            timestamp=timestamp
+        )
+        result = db.session.execute(stmt.on_conflict_do_nothing(
+            index_elements=[Refund.transaction_hash, Refund.log_index]))
+        if result.rowcount:
+            apply_refund_stats(args.campaignId, amount)
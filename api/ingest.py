@@ -0,0 +1,172 @@
+import datetime
+import json
+import math
+import os
+from sqlalchemy import tuple_
+from models import db, User, UserActivity, Contribution
+from api.upserts import insert_for
+from api.stats import contribution_totals, apply_contribution_totals
+
+# Contributions written per transaction by POST /api/contributions/bulk
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+
+def validate_contribution(item):
+    """Return the normalized contribution row for a bulk item; raises ValueError"""
+    if isinstance(item, ValueError):
+        # An NDJSON line that failed to parse
+        raise item
+    if not isinstance(item, dict):
+        raise ValueError("Item must be an object")
+
+    campaign_id = item.get('campaign_id')
+    contributor_address = item.get('contributor_address')
+    amount = item.get('amount')
+    transaction_hash = item.get('transaction_hash')
+
+    if campaign_id is None or not contributor_address or not amount or not transaction_hash:
+        raise ValueError("Missing required fields")
+    if not isinstance(contributor_address, str) or not isinstance(transaction_hash, str):
+        raise ValueError("contributor_address and transaction_hash must be strings")
+    if not isinstance(campaign_id, int) or isinstance(campaign_id, bool) or campaign_id < 0:
+        raise ValueError("campaign_id must be a non-negative integer")
+    if not isinstance(amount, (int, float)) or isinstance(amount, bool):
+        raise ValueError("amount must be a positive number")
+    try:
+        amount = float(amount)
+    except OverflowError:
+        raise ValueError("amount is out of range")
+    # json accepts NaN and Infinity, which no comparison rejects
+    if not math.isfinite(amount) or amount <= 0:
+        raise ValueError("amount must be a positive number")
+
+    timestamp = item.get('timestamp')
+    if timestamp is not None:
+        if not isinstance(timestamp, (int, float)) or isinstance(timestamp, bool):
+            raise ValueError("timestamp must be a Unix timestamp")
+        try:
+            timestamp = datetime.datetime.utcfromtimestamp(timestamp)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError("timestamp is out of range")
+
+    return {
+        'campaign_id': campaign_id,
+        'wallet_address': contributor_address,
+        'contributor_address': contributor_address.lower(),
+        'amount': amount,
+        'transaction_hash': transaction_hash,
+        'timestamp': timestamp or datetime.datetime.utcnow()
+    }
+
+
+def _user_ids(wallet_addresses):
+    """Create missing users in one statement and return wallet address -> user ID"""
+    wallet_addresses = sorted(set(wallet_addresses))
+    stmt = insert_for(User).values([{'wallet_address': address} for address in wallet_addresses])
+    db.session.execute(stmt.on_conflict_do_nothing(index_elements=[User.wallet_address]))
+    rows = db.session.query(User.wallet_address, User.id).filter(User.wallet_address.in_(wallet_addresses))
+    return dict(rows)
+
+
+def _ingest_chunk(rows):
+    """Write one chunk of validated contributions in a single transaction; returns the inserted IDs by hash"""
+    # Transactions the indexer (or an earlier request) already recorded are duplicates
+    recorded_hashes = set(db.session.scalars(db.select(Contribution.transaction_hash).where(
+        Contribution.transaction_hash.in_([row['transaction_hash'] for row in rows])
+    )))
+    rows = [row for row in rows if row['transaction_hash'] not in recorded_hashes]
+    if not rows:
+        return {}
+
+    pairs = sorted({(row['campaign_id'], row['contributor_address']) for row in rows})
+    existing_pairs = set(db.session.query(Contribution.campaign_id, Contribution.contributor_address).filter(
+        tuple_(Contribution.campaign_id, Contribution.contributor_address).in_(pairs)
+    ).distinct())
+
+    stmt = insert_for(Contribution).values([
+        {name: row[name] for name in ('campaign_id', 'contributor_address', 'amount', 'transaction_hash', 'timestamp')}
+        for row in rows
+    ])
+    stmt = stmt.on_conflict_do_nothing(index_elements=[Contribution.transaction_hash, Contribution.log_index])
+    inserted = dict(db.session.execute(stmt.returning(Contribution.transaction_hash, Contribution.id)).all())
+
+    recorded = [row for row in rows if row['transaction_hash'] in inserted]
+    if recorded:
+        users = _user_ids(row['wallet_address'] for row in recorded)
+        db.session.execute(db.insert(UserActivity), [
+            {
+                'user_id': users[row['wallet_address']],
+                'activity_type': 'contribution',
+                'campaign_id': row['campaign_id'],
+                'activity_data': json.dumps({"amount": row['amount'], "transaction_hash": row['transaction_hash']}),
+                'created_at': row['timestamp']
+            }
+            for row in recorded
+        ])
+
+        totals = {}
+        for row in recorded:
+            campaign = totals.setdefault(row['campaign_id'], {'amount': 0.0, 'count': 0, 'new': set(), 'latest': None})
+            campaign['amount'] += row['amount']
+            campaign['count'] += 1
+            if (row['campaign_id'], row['contributor_address']) not in existing_pairs:
+                campaign['new'].add(row['contributor_address'])
+            campaign['latest'] = max(campaign['latest'] or row['timestamp'], row['timestamp'])
+
+        apply_contribution_totals([
+            contribution_totals(campaign_id, campaign['amount'], campaign['latest'], len(campaign['new']),
+                                count=campaign['count'])
+            for campaign_id, campaign in totals.items()
+        ])
+
+    db.session.commit()
+    return inserted
+
+
+def ingest_contributions(items, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Record contributions in set-based chunks and return one result per item, in order
+    Each chunk is its own transaction; a failing chunk is rolled back and reported
+    without affecting the chunks already written
+    """
+    results = []
+    chunk = []
+    seen = set()
+
+    def flush():
+        try:
+            inserted = _ingest_chunk([row for _, row in chunk])
+            for index, row in chunk:
+                if row['transaction_hash'] in inserted:
+                    results[index] = {"index": index, "status": "recorded",
+                                      "id": inserted[row['transaction_hash']]}
+                else:
+                    results[index] = {"index": index, "status": "duplicate"}
+        except Exception as e:
+            db.session.rollback()
+            for index, _ in chunk:
+                results[index] = {"index": index, "status": "error", "error": str(e)}
+        chunk.clear()
+
+    for index, item in enumerate(items):
+        results.append(None)
+        try:
+            row = validate_contribution(item)
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": str(e)}
+            continue
+
+        # A repeated hash within the request is a duplicate of its first occurrence
+        if row['transaction_hash'] in seen:
+            results[index] = {"index": index, "status": "duplicate"}
+            continue
+        seen.add(row['transaction_hash'])
+
+        chunk.append((index, row))
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+
+    return results
@@ -0,0 +1,185 @@
+import base64
+import json
+import math
+import time
+from sqlalchemy import tuple_
+from models import ChainCampaign
+from api.chain import serialize_chain_campaign
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+STATUSES = ('all', 'active', 'completed', 'funded', 'not_funded')
+
+# Sort name -> (response field, indexed column) pairs and direction
+# Every sort ends with the campaign ID so the keyset is unique
+SORTS = {
+    'newest': ([('id', ChainCampaign.chain_id)], True),
+    'oldest': ([('id', ChainCampaign.chain_id)], False),
+    'ending_soon': ([('deadline', ChainCampaign.deadline), ('id', ChainCampaign.chain_id)], False),
+    'most_funded': ([('currentAmount', ChainCampaign.current_amount), ('id', ChainCampaign.chain_id)], True),
+    'closest_to_goal': ([('fundingRatio', ChainCampaign.funding_ratio), ('id', ChainCampaign.chain_id)], True),
+}
+
+# Sorts that only list some campaigns: ending_soon the ones still running, closest_to_goal
+# the ones short of their goal. Combined with these statuses they could never return anything
+INCOMPATIBLE_SORTS = {
+    'completed': ('ending_soon',),
+    'funded': ('closest_to_goal',),
+}
+
+LISTING_ARGS = ('limit', 'cursor', 'status', 'sort', 'creator', 'q')
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last returned campaign as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    # Sort keys are numbers; anything else would fail (or overflow) when compared
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("Invalid cursor")
+        if abs(value) >= 2**63 or not math.isfinite(value):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_listing_args(args):
+    """Validate the query string of GET /api/campaigns; raises ValueError"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    status = args.get('status', 'all')
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(STATUSES)}")
+
+    sort = args.get('sort', 'newest')
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+    if sort in INCOMPATIBLE_SORTS.get(status, ()):
+        raise ValueError(f"sort={sort} cannot be combined with status={status}")
+
+    keys, _ = SORTS[sort]
+    cursor = args.get('cursor')
+
+    return {
+        'limit': limit,
+        'status': status,
+        'sort': sort,
+        'cursor': decode_cursor(cursor, len(keys)) if cursor else None,
+        'creator': args.get('creator', '').lower() or None,
+        'q': args.get('q', '').strip() or None
+    }
+
+
+def wants_listing(args):
+    """Whether a request asked for a filtered/paginated campaign list"""
+    return any(name in args for name in LISTING_ARGS)
+
+
+def query_campaigns(params, now=None):
+    """
+    Evaluate a listing against the indexed chain_campaigns table
+    Returns (campaigns, next_cursor); cost depends on the page size, not the table size
+    """
+    now = now or int(time.time())
+    keys, descending = SORTS[params['sort']]
+    columns = [column for _, column in keys]
+
+    query = ChainCampaign.query
+
+    if params['status'] == 'active' or params['sort'] == 'ending_soon':
+        query = query.filter(ChainCampaign.deadline > now)
+    if params['status'] == 'completed':
+        query = query.filter(ChainCampaign.deadline <= now)
+
+    if params['status'] == 'funded':
+        query = query.filter(ChainCampaign.current_amount >= ChainCampaign.funding_goal)
+    if params['status'] == 'not_funded' or params['sort'] == 'closest_to_goal':
+        query = query.filter(ChainCampaign.current_amount < ChainCampaign.funding_goal)
+
+    if params['creator']:
+        query = query.filter(ChainCampaign.creator == params['creator'])
+
+    if params['q']:
+        pattern = f"%{params['q']}%"
+        query = query.filter(ChainCampaign.title.ilike(pattern) | ChainCampaign.description.ilike(pattern))
+
+    if params['cursor']:
+        position = tuple_(*columns)
+        values = tuple_(*params['cursor'])
+        query = query.filter(position < values if descending else position > values)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order).limit(params['limit'] + 1).all()
+
+    campaigns = [serialize_chain_campaign(row) for row in rows[:params['limit']]]
+    next_cursor = None
+    if len(rows) > params['limit']:
+        last = rows[params['limit'] - 1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+
+    return campaigns, next_cursor
+
+
+def _sort_value(campaign, field):
+    if field == 'fundingRatio':
+        goal = float(campaign['fundingGoal'])
+        return float(campaign['currentAmount']) / goal if goal > 0 else 0.0
+    if field == 'currentAmount':
+        return float(campaign['currentAmount'])
+    return campaign[field]
+
+
+def filter_campaign_list(campaigns, params, now=None):
+    """
+    Apply the same listing semantics to an already fetched list
+    (used when the API is not reading from the index)
+    """
+    now = now or int(time.time())
+    keys, descending = SORTS[params['sort']]
+    fields = [field for field, _ in keys]
+
+    def matches(c):
+        if (params['status'] == 'active' or params['sort'] == 'ending_soon') and c['deadline'] <= now:
+            return False
+        if params['status'] == 'completed' and c['deadline'] > now:
+            return False
+        funded = float(c['currentAmount']) >= float(c['fundingGoal'])
+        if params['status'] == 'funded' and not funded:
+            return False
+        if (params['status'] == 'not_funded' or params['sort'] == 'closest_to_goal') and funded:
+            return False
+        if params['creator'] and c['creator'].lower() != params['creator']:
+            return False
+        if params['q']:
+            term = params['q'].lower()
+            # Stale or indexed campaigns served during a chain outage may lack either
+            if term not in (c['title'] or '').lower() and term not in (c['description'] or '').lower():
+                return False
+        return True
+
+    def key(c):
+        return [_sort_value(c, field) for field in fields]
+
+    selected = sorted(filter(matches, campaigns), key=key, reverse=descending)
+
+    if params['cursor']:
+        position = params['cursor']
+        selected = [c for c in selected if (key(c) < position if descending else key(c) > position)]
+
+    page = selected[:params['limit']]
+    next_cursor = encode_cursor(key(page[-1])) if len(selected) > params['limit'] else None
+    return page, next_cursor
@@ -0,0 +1,220 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import aiohttp
+import requests
+from web3 import HTTPProvider, AsyncHTTPProvider
+from web3.exceptions import TimeExhausted
+from web3.providers.base import JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+# Seconds before a single RPC request to one endpoint is abandoned (and the next endpoint tried)
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "5"))
+# Seconds a failed endpoint is skipped; doubles on each consecutive failure up to RPC_MAX_COOLDOWN
+RPC_COOLDOWN = float(os.getenv("RPC_COOLDOWN", "5"))
+RPC_MAX_COOLDOWN = float(os.getenv("RPC_MAX_COOLDOWN", "300"))
+# Weight of the newest sample in the latency and error rate moving averages
+RPC_EWMA_ALPHA = float(os.getenv("RPC_EWMA_ALPHA", "0.2"))
+# Share of requests sent to a random healthy endpoint so that its latency estimate stays current
+RPC_EXPLORE_RATE = float(os.getenv("RPC_EXPLORE_RATE", "0.05"))
+
+# Transport failures that make a request move on to the next endpoint; JSON-RPC errors
+# (such as a reverted call) are answers and are returned as they are
+SYNC_FAILOVER_ERRORS = (requests.RequestException, TimeoutError, TimeExhausted)
+ASYNC_FAILOVER_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, TimeExhausted)
+
+
+class ProvidersUnavailable(Exception):
+    """Every RPC endpoint failed the request"""
+
+
+def rpc_urls_from_env(infura_key=""):
+    """RPC_URLS (comma-separated), else RPC_URL, else the Infura Sepolia endpoint for infura_key"""
+    urls = os.getenv("RPC_URLS") or os.getenv("RPC_URL")
+    if urls:
+        return [url.strip() for url in urls.split(',') if url.strip()]
+    return [f"https://sepolia.infura.io/v3/{infura_key}"] if infura_key else []
+
+
+class Endpoint:
+    """Health of one RPC endpoint as seen by this process"""
+
+    def __init__(self, url):
+        self.url = url
+        self.latency = None  # EWMA of successful request durations in seconds
+        self.error_rate = 0.0  # EWMA of failures, 0..1
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.last_error = None
+
+    def score(self):
+        # Unmeasured endpoints sort first so that each one gets tried
+        latency = self.latency if self.latency is not None else 0.0
+        return latency * (1 + 4 * self.error_rate)
+
+
+class ProviderPool:
+    """
+    Tracks latency and errors per RPC endpoint and decides the order in which to try them
+    A failing endpoint is skipped for a cooldown and then tried again with live traffic,
+    so it rejoins the pool without a restart once it recovers
+    """
+
+    def __init__(self, urls, cooldown=RPC_COOLDOWN, max_cooldown=RPC_MAX_COOLDOWN,
+                 alpha=RPC_EWMA_ALPHA, explore_rate=RPC_EXPLORE_RATE):
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self.explore_rate = explore_rate
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self):
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def candidates(self):
+        """Endpoints in the order a request should try them: healthy by score, then cooling down"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted((e for e in self.endpoints if e.down_until <= now), key=Endpoint.score)
+            # Endpoints still cooling down are a last resort, soonest back first
+            cooling = sorted((e for e in self.endpoints if e.down_until > now), key=lambda e: e.down_until)
+
+        if len(healthy) > 1 and random.random() < self.explore_rate:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        return healthy + cooling
+
+    def record_success(self, endpoint, elapsed):
+        with self._lock:
+            endpoint.requests += 1
+            if endpoint.latency is None:
+                endpoint.latency = elapsed
+            else:
+                endpoint.latency += self.alpha * (elapsed - endpoint.latency)
+            endpoint.error_rate *= 1 - self.alpha
+            endpoint.consecutive_failures = 0
+            endpoint.down_until = 0.0
+
+    def record_failure(self, endpoint, error):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.error_rate += self.alpha * (1 - endpoint.error_rate)
+            endpoint.consecutive_failures += 1
+            endpoint.last_error = f"{type(error).__name__}: {error}"
+            cooldown = min(self.cooldown * 2 ** (endpoint.consecutive_failures - 1), self.max_cooldown)
+            endpoint.down_until = time.monotonic() + cooldown
+
+        print(f"RPC endpoint {endpoint.url} failed ({endpoint.last_error}); skipping it for {cooldown:g}s")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": endpoint.url,
+                    "healthy": endpoint.down_until <= now,
+                    "latency_ms": round(endpoint.latency * 1000, 1) if endpoint.latency is not None else None,
+                    "error_rate": round(endpoint.error_rate, 4),
+                    "requests": endpoint.requests,
+                    "errors": endpoint.errors,
+                    "last_error": endpoint.last_error
+                }
+                for endpoint in self.endpoints
+            ]
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """
+    Web3 provider that sends each request to the best endpoint of a ProviderPool,
+    failing over to the next one on transport errors
+    Every endpoint keeps its own HTTPProvider and therefore its own keep-alive session
+    """
+
+    def __init__(self, pool, timeout=RPC_TIMEOUT, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+        # Retries happen across endpoints here, not against the same endpoint
+        self._providers = {
+            url: HTTPProvider(url, request_kwargs={"timeout": timeout}, exception_retry_configuration=None)
+            for url in pool.urls
+        }
+
+    def __str__(self):
+        return f"Pooled RPC connection {', '.join(self.pool.urls)}"
+
+    def _route(self, send):
+        error = None
+        for endpoint in self.pool.candidates():
+            started = time.monotonic()
+            try:
+                response = send(self._providers[endpoint.url])
+            except SYNC_FAILOVER_ERRORS as e:
+                self.pool.record_failure(endpoint, e)
+                error = e
+                continue
+            self.pool.record_success(endpoint, time.monotonic() - started)
+            return response
+        raise ProvidersUnavailable(f"All RPC endpoints failed, last error: {error}") from error
+
+    def make_request(self, method, params):
+        return self._route(lambda provider: provider.make_request(method, params))
+
+    def make_batch_request(self, batch_requests):
+        return self._route(lambda provider: provider.make_batch_request(batch_requests))
+
+    def is_connected(self, show_traceback=False):
+        return any(provider.is_connected() for provider in self._providers.values())
+
+
+class PooledAsyncHTTPProvider(AsyncJSONBaseProvider):
+    """Async counterpart of PooledHTTPProvider (keeps one aiohttp session per endpoint)"""
+
+    def __init__(self, pool, timeout=RPC_TIMEOUT, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+        self._providers = {
+            url: AsyncHTTPProvider(url, request_kwargs={"timeout": aiohttp.ClientTimeout(total=timeout)},
+                                   exception_retry_configuration=None)
+            for url in pool.urls
+        }
+
+    def __str__(self):
+        return f"Pooled async RPC connection {', '.join(self.pool.urls)}"
+
+    async def _route(self, send):
+        error = None
+        for endpoint in self.pool.candidates():
+            started = time.monotonic()
+            try:
+                response = await send(self._providers[endpoint.url])
+            except ASYNC_FAILOVER_ERRORS as e:
+                self.pool.record_failure(endpoint, e)
+                error = e
+                continue
+            self.pool.record_success(endpoint, time.monotonic() - started)
+            return response
+        raise ProvidersUnavailable(f"All RPC endpoints failed, last error: {error}") from error
+
+    async def make_request(self, method, params):
+        return await self._route(lambda provider: provider.make_request(method, params))
+
+    async def make_batch_request(self, batch_requests):
+        return await self._route(lambda provider: provider.make_batch_request(batch_requests))
+
+    async def is_connected(self, show_traceback=False):
+        for provider in self._providers.values():
+            if await provider.is_connected():
+                return True
+        return False
+
+    async def disconnect(self):
+        for provider in self._providers.values():
+            await provider.disconnect()
@@ -0,0 +1,85 @@
+import re
+from sqlalchemy import func, literal_column, or_, and_, text
+from models import db, OffChainCampaign
+from api.listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+
+# Words beyond this are ignored, so a pasted paragraph cannot build an arbitrarily large query
+MAX_SEARCH_TERMS = 8
+# Relative weight of each FTS5 column (title, description, category, tags) in the SQLite ranking;
+# PostgreSQL uses the A/B/C weights of the search_vector column (see models.py)
+FTS5_WEIGHTS = (10.0, 1.0, 4.0, 4.0)
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def parse_search_args(args):
+    """Validate the query string of GET /api/campaigns/search; raises ValueError"""
+    terms = WORD.findall(args.get('q', '').lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        raise ValueError("q must contain at least one word")
+
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    cursor = args.get('cursor')
+    return {
+        'terms': terms,
+        'limit': limit,
+        'cursor': decode_cursor(cursor, 2) if cursor else None
+    }
+
+
+def _postgresql_hits(terms):
+    """(campaign ID, rank) of the metadata rows matching every term as a prefix"""
+    query = func.to_tsquery('english', ' & '.join(f"{term}:*" for term in terms))
+    vector = literal_column('campaigns.search_vector')
+    # ts_rank_cd() is a real; as a double it survives the round trip through the cursor unchanged
+    rank = db.cast(func.ts_rank_cd(vector, query), db.Float)
+    return db.select(OffChainCampaign.id.label('id'), rank.label('rank')).where(vector.op('@@')(query)).subquery()
+
+
+def _sqlite_hits(terms):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    # bm25() is lower for better matches
+    rank = -func.bm25(literal_column('campaigns_fts'), *FTS5_WEIGHTS)
+    return db.select(
+        literal_column('campaigns_fts.rowid').label('id'), rank.label('rank')
+    ).select_from(text('campaigns_fts')).where(
+        text('campaigns_fts MATCH :match').bindparams(match=match)
+    ).subquery()
+
+
+def search_campaigns(params):
+    """
+    Rank campaign metadata against the search terms (each one matched as a word prefix)
+    Returns ([(OffChainCampaign, rank)], next_cursor), best match first; the cursor
+    is the (rank, chain ID) of the last row, so pages stay stable as rows are added
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        hits = _postgresql_hits(params['terms'])
+    elif dialect == 'sqlite':
+        hits = _sqlite_hits(params['terms'])
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    query = db.session.query(OffChainCampaign, hits.c.rank).join(hits, hits.c.id == OffChainCampaign.id)
+
+    if params['cursor']:
+        rank, chain_id = params['cursor']
+        query = query.filter(or_(
+            hits.c.rank < rank,
+            and_(hits.c.rank == rank, OffChainCampaign.chain_id > chain_id)
+        ))
+
+    rows = query.order_by(hits.c.rank.desc(), OffChainCampaign.chain_id).limit(params['limit'] + 1).all()
+
+    next_cursor = None
+    if len(rows) > params['limit']:
+        campaign, rank = rows[params['limit'] - 1]
+        next_cursor = encode_cursor([rank, campaign.chain_id])
+    return rows[:params['limit']], next_cursor
@@ -0,0 +1,281 @@
+import bisect
+import os
+import random
+import threading
+import time
+from array import array
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+from api.chain import ChainBackend, format_campaign
+from api.async_chain import CHAIN_CALL_TIMEOUT
+from api.providers import ProvidersUnavailable
+
+# Campaigns generated at startup when the API runs on the simulator (CHAIN_BACKEND=sim)
+SIM_CAMPAIGNS = int(os.getenv("SIM_CAMPAIGNS", "100"))
+SIM_SEED = int(os.getenv("SIM_SEED", "1"))
+# Seconds added to every read, and share of reads that fail as if the node were unreachable
+SIM_LATENCY = float(os.getenv("SIM_LATENCY", "0"))
+SIM_FAIL_RATE = float(os.getenv("SIM_FAIL_RATE", "0"))
+
+GWEI = 10**9
+DAY = 24 * 60 * 60
+
+
+def _address_bytes(address):
+    address = address[2:] if address.startswith(('0x', '0X')) else address
+    if len(address) != 40:
+        raise ValueError(f"Invalid address: {address}")
+    return bytes.fromhex(address)
+
+
+def _revert(reason):
+    raise ContractLogicError(f"execution reverted: {reason}")
+
+
+class SimulatedChain(ChainBackend):
+    """
+    In-memory CrowdfundingPlatform (contracts/Campaign.sol) on a simulated chain
+
+    Transactions run with the contract's checks and revert reasons (as ContractLogicError),
+    each one is mined in its own block and emits the contract's events
+    Campaign state is kept in flat arrays (amounts in gwei, 20-byte creators) so that
+    millions of campaigns fit in memory; generated campaigns derive their text from
+    their ID instead of storing it, and have no contribution records behind their amounts
+    Reads always see the latest state, whatever block they ask for, and each one can be
+    slowed down or failed (latency, fail_rate) like a call to a remote node
+    """
+
+    def __init__(self, campaigns=0, seed=SIM_SEED, latency=SIM_LATENCY, fail_rate=SIM_FAIL_RATE,
+                 call_timeout=CHAIN_CALL_TIMEOUT):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.call_timeout = call_timeout
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+        self._creators = bytearray()
+        self._funding_goals = array('Q')  # gwei
+        self._current_amounts = array('Q')  # gwei
+        self._deadlines = array('q')
+        self._claimed = bytearray()
+        self._texts = {}  # campaign ID -> (title, description, image URL) of created campaigns
+        self._contributions = {}  # (campaign ID, contributor bytes) -> gwei
+
+        self._time_offset = 0
+        self._block_timestamps = array('q', [int(time.time())])
+        self.events = []
+
+        if campaigns:
+            self.generate_campaigns(campaigns)
+
+    # Chain
+
+    def now(self):
+        """Timestamp the next block will have"""
+        return int(time.time()) + self._time_offset
+
+    def advance_time(self, seconds):
+        """Move the simulated clock forward (e.g. past a deadline) and mine a block"""
+        with self._lock:
+            self._time_offset += seconds
+            self._mine()
+
+    def _mine(self):
+        self._block_timestamps.append(max(self.now(), self._block_timestamps[-1]))
+        return len(self._block_timestamps) - 1
+
+    def get_block(self, block_number):
+        with self._lock:
+            return {"number": block_number, "timestamp": self._block_timestamps[block_number]}
+
+    def get_events(self, from_block, to_block):
+        """Events emitted in [from_block, to_block], oldest first"""
+        with self._lock:
+            start = bisect.bisect_left(self.events, from_block, key=lambda event: event["blockNumber"])
+            end = bisect.bisect_right(self.events, to_block, key=lambda event: event["blockNumber"])
+            return self.events[start:end]
+
+    def _transact(self, event, args):
+        """Mine a block for a transaction that emitted event(args) and return its hash"""
+        block_number = self._mine()
+        transaction_hash = Web3.to_hex(Web3.keccak(f"{block_number}:{event}".encode()))
+        self.events.append({
+            "event": event,
+            "args": args,
+            "blockNumber": block_number,
+            "transactionHash": transaction_hash,
+            "logIndex": 0
+        })
+        return transaction_hash
+
+    # Contract
+
+    @property
+    def campaign_count(self):
+        return len(self._funding_goals)
+
+    def generate_campaigns(self, count, min_goal=0.1, max_goal=10.0):
+        """
+        Append count random campaigns, seeded by the constructor's seed
+        Deadlines fall between 30 days ago and 60 days ahead; about half of the
+        ended campaigns that reached their goal are claimed
+        """
+        rng = self._rng
+        now = self.now()
+        with self._lock:
+            self._creators += rng.randbytes(20 * count)
+            goals = array('Q', (int(rng.uniform(min_goal, max_goal) * 10**9) for _ in range(count)))
+            amounts = array('Q', (int(goal * rng.random() * 1.5) for goal in goals))
+            deadlines = array('q', (now + rng.randrange(-30 * DAY, 60 * DAY) for _ in range(count)))
+            self._claimed += bytes(
+                deadline <= now and amount >= goal and rng.random() < 0.5
+                for goal, amount, deadline in zip(goals, amounts, deadlines)
+            )
+            self._funding_goals += goals
+            self._current_amounts += amounts
+            self._deadlines += deadlines
+
+    def _require_campaign(self, campaign_id):
+        if not 0 <= campaign_id < self.campaign_count:
+            _revert("Campaign does not exist")
+
+    def create_campaign(self, sender, title, description, image_url, funding_goal, duration_in_days):
+        """createCampaign(); funding_goal in wei. Returns (campaign ID, transaction hash)"""
+        with self._lock:
+            if funding_goal <= 0:
+                _revert("Funding goal must be greater than 0")
+            if duration_in_days <= 0:
+                _revert("Duration must be greater than 0")
+            if funding_goal % GWEI:
+                raise ValueError("The simulator tracks amounts in whole gwei")
+
+            campaign_id = self.campaign_count
+            deadline = self.now() + duration_in_days * DAY
+            self._creators += _address_bytes(sender)
+            self._funding_goals.append(funding_goal // GWEI)
+            self._current_amounts.append(0)
+            self._deadlines.append(deadline)
+            self._claimed.append(0)
+            self._texts[campaign_id] = (title, description, image_url)
+
+            return campaign_id, self._transact("CampaignCreated", {
+                "campaignId": campaign_id, "creator": Web3.to_checksum_address(sender), "title": title,
+                "fundingGoal": funding_goal, "deadline": deadline
+            })
+
+    def contribute(self, sender, campaign_id, value):
+        """contribute() with value wei attached. Returns the transaction hash"""
+        with self._lock:
+            self._require_campaign(campaign_id)
+            if self.now() >= self._deadlines[campaign_id]:
+                _revert("Campaign has ended")
+            if value <= 0:
+                _revert("Contribution must be greater than 0")
+            if value % GWEI:
+                raise ValueError("The simulator tracks amounts in whole gwei")
+
+            key = (campaign_id, _address_bytes(sender))
+            self._current_amounts[campaign_id] += value // GWEI
+            self._contributions[key] = self._contributions.get(key, 0) + value // GWEI
+
+            return self._transact("ContributionMade", {
+                "campaignId": campaign_id, "contributor": Web3.to_checksum_address(sender), "amount": value
+            })
+
+    def claim_funds(self, sender, campaign_id):
+        """claimFunds(). Returns the transaction hash"""
+        with self._lock:
+            self._require_campaign(campaign_id)
+            if _address_bytes(sender) != self._creator_bytes(campaign_id):
+                _revert("Only creator can claim funds")
+            if self.now() < self._deadlines[campaign_id]:
+                _revert("Campaign has not ended yet")
+            if self._current_amounts[campaign_id] < self._funding_goals[campaign_id]:
+                _revert("Funding goal not reached")
+            if self._claimed[campaign_id]:
+                _revert("Funds already claimed")
+
+            self._claimed[campaign_id] = 1
+            return self._transact("FundsClaimed", {
+                "campaignId": campaign_id, "creator": Web3.to_checksum_address(sender),
+                "amount": self._current_amounts[campaign_id] * GWEI
+            })
+
+    def request_refund(self, sender, campaign_id):
+        """requestRefund(). Returns the transaction hash"""
+        with self._lock:
+            self._require_campaign(campaign_id)
+            if self.now() < self._deadlines[campaign_id]:
+                _revert("Campaign has not ended yet")
+            if self._current_amounts[campaign_id] >= self._funding_goals[campaign_id]:
+                _revert("Funding goal reached, cannot refund")
+
+            key = (campaign_id, _address_bytes(sender))
+            amount = self._contributions.get(key, 0)
+            if amount <= 0:
+                _revert("No contribution to refund")
+
+            # Like the contract, the contribution is zeroed but currentAmount is left as is
+            self._contributions[key] = 0
+            return self._transact("FundsRefunded", {
+                "campaignId": campaign_id, "contributor": Web3.to_checksum_address(sender), "amount": amount * GWEI
+            })
+
+    def _creator_bytes(self, campaign_id):
+        return bytes(self._creators[20 * campaign_id:20 * campaign_id + 20])
+
+    def _raw_campaign(self, campaign_id):
+        """getCampaign() result tuple"""
+        if not 0 <= campaign_id < self.campaign_count:
+            return ("0x" + "00" * 20, "", "", "", 0, 0, 0, False, False)
+        title, description, image_url = self._texts.get(campaign_id) or (
+            f"Campaign {campaign_id}",
+            f"Simulated campaign {campaign_id}",
+            f"https://picsum.photos/seed/{campaign_id}/800/500"
+        )
+        return (
+            Web3.to_checksum_address(self._creator_bytes(campaign_id)), title, description, image_url,
+            self._funding_goals[campaign_id] * GWEI, self._current_amounts[campaign_id] * GWEI,
+            self._deadlines[campaign_id], bool(self._claimed[campaign_id]), True
+        )
+
+    # Reads (ChainBackend)
+
+    def _round_trip(self):
+        """Apply the injected latency and failures of one call to the node"""
+        if self.latency >= self.call_timeout:
+            time.sleep(self.call_timeout)
+            raise TimeoutError(f"Simulated read took longer than {self.call_timeout:g}s")
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise ProvidersUnavailable("Simulated RPC failure")
+
+    def block_number(self):
+        self._round_trip()
+        return len(self._block_timestamps) - 1
+
+    def get_campaigns(self, campaign_ids, block_identifier='latest'):
+        self._round_trip()
+        with self._lock:
+            return [format_campaign(Web3, campaign_id, self._raw_campaign(campaign_id)) for campaign_id in campaign_ids]
+
+    def get_all_campaigns(self, block_identifier='latest'):
+        return self.get_campaigns(range(self.campaign_count), block_identifier)
+
+    def get_campaign(self, campaign_id, block_identifier='latest'):
+        self._round_trip()
+        with self._lock:
+            return format_campaign(Web3, campaign_id, self._raw_campaign(campaign_id))
+
+    def get_contribution(self, campaign_id, address, block_identifier='latest'):
+        self._round_trip()
+        amount = self._contributions.get((campaign_id, _address_bytes(address)), 0)
+        return float(Web3.from_wei(amount * GWEI, 'ether'))
+
+    def get_campaign_page(self, campaign_id, viewer=None, block_identifier='latest'):
+        self._round_trip()
+        with self._lock:
+            campaign = format_campaign(Web3, campaign_id, self._raw_campaign(campaign_id))
+            amount = self._contributions.get((campaign_id, _address_bytes(viewer)), 0) if viewer else None
+        return campaign, float(Web3.from_wei(amount * GWEI, 'ether')) if viewer else None
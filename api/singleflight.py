@@ -0,0 +1,62 @@
+import threading
+
+
+class _Call:
+    """One in-flight call and the outcome shared with every caller waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls across threads
+    The first caller for a key runs the function; callers arriving with the same key
+    while it runs wait for it and receive the same result (or the same exception)
+    Nothing is kept once the call finishes, so this is not a cache
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Return fn(), sharing the call with any concurrent caller using the same key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls)
+            }
@@ -0,0 +1,202 @@
+import datetime
+import math
+import os
+from models import db, CampaignStats, Contribution, Refund, Comment, OffChainCampaign, ChainCampaign
+from api.upserts import insert_for
+
+# Seconds between reconciliation passes of run_reconcile.py
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+
+COUNTERS = ('contribution_count', 'unique_contributors', 'backer_count', 'comment_count')
+AMOUNTS = ('total_raised', 'total_refunded')
+
+
+def serialize_stats(stats):
+    return {
+        "total_raised": stats.total_raised,
+        "contribution_count": stats.contribution_count,
+        "unique_contributors": stats.unique_contributors,
+        "backer_count": stats.backer_count,
+        "last_contribution_at": stats.last_contribution_at,
+        "comment_count": stats.comment_count,
+        "total_refunded": stats.total_refunded,
+        "claimed": stats.claimed
+    }
+
+
+def zero_values():
+    """Column values of a campaign nothing has been recorded for yet"""
+    return {name: 0 for name in COUNTERS} | {name: 0.0 for name in AMOUNTS} | {
+        'last_contribution_at': None, 'claimed': False}
+
+
+def empty_stats():
+    return serialize_stats(CampaignStats(**zero_values()))
+
+
+def load_stats(campaign_ids):
+    """Load the stats of several campaigns in one primary key lookup, keyed by chain ID"""
+    campaign_ids = sorted(set(campaign_ids))
+    rows = CampaignStats.query.filter(CampaignStats.campaign_id.in_(campaign_ids)).all() if campaign_ids else []
+    stats = {row.campaign_id: serialize_stats(row) for row in rows}
+    return {campaign_id: stats.get(campaign_id) or empty_stats() for campaign_id in campaign_ids}
+
+
+def _upsert(campaign_id, values, set_):
+    """Create the stats row with values, or apply set_ to the existing one"""
+    _upsert_many([{'campaign_id': campaign_id, **values}], set_)
+
+
+def _upsert_many(rows, set_):
+    """_upsert() for several campaigns (at most one row each) in one statement"""
+    # A consistent lock order keeps concurrent writers from deadlocking on each other's rows
+    stmt = insert_for(CampaignStats).values(sorted(rows, key=lambda row: row['campaign_id']))
+    set_ = set_(stmt.excluded)
+    set_['updated_at'] = datetime.datetime.utcnow()
+    db.session.execute(stmt.on_conflict_do_update(index_elements=[CampaignStats.campaign_id], set_=set_))
+
+
+def is_new_contributor(campaign_id, address):
+    """Whether an address has no recorded contribution to a campaign yet (call before inserting one)"""
+    return not db.session.query(db.exists().where(
+        Contribution.contributor_address == address.lower(),
+        Contribution.campaign_id == campaign_id
+    )).scalar()
+
+
+def _increment_contributions(excluded):
+    latest = CampaignStats.last_contribution_at
+    return {
+        'total_raised': CampaignStats.total_raised + excluded.total_raised,
+        'contribution_count': CampaignStats.contribution_count + excluded.contribution_count,
+        'unique_contributors': CampaignStats.unique_contributors + excluded.unique_contributors,
+        'backer_count': CampaignStats.backer_count + excluded.backer_count,
+        # Events can be applied out of order (indexer replay vs. POST /api/contributions)
+        'last_contribution_at': db.case(
+            (latest.is_(None), excluded.last_contribution_at),
+            (excluded.last_contribution_at > latest, excluded.last_contribution_at),
+            else_=latest
+        )
+    }
+
+
+def contribution_totals(campaign_id, amount, timestamp, new_contributors, count=1):
+    """Stats row values counting newly inserted contributions to a campaign (see apply_contribution_stats)"""
+    new = int(new_contributors)
+    return {
+        'campaign_id': campaign_id,
+        'total_raised': amount,
+        'contribution_count': count,
+        'unique_contributors': new,
+        'backer_count': new,
+        'last_contribution_at': timestamp
+    }
+
+
+def apply_contribution_stats(campaign_id, amount, timestamp, new_contributors, count=1):
+    """
+    Count newly inserted contributions; runs in the caller's transaction
+    amount is their total and timestamp the latest; new_contributors is the number
+    (or, for a single contribution, whether) of addresses contributing for the first time
+    """
+    apply_contribution_totals([contribution_totals(campaign_id, amount, timestamp, new_contributors, count)])
+
+
+def apply_contribution_totals(totals):
+    """Count the contributions of several campaigns (contribution_totals() rows) in one statement"""
+    if totals:
+        _upsert_many(totals, _increment_contributions)
+
+
+def apply_comment_stats(campaign_id):
+    """Count a new comment on a campaign; runs in the caller's transaction"""
+    _upsert(campaign_id, {'comment_count': 1}, lambda excluded: {
+        'comment_count': CampaignStats.comment_count + 1
+    })
+
+
+def apply_refund_stats(campaign_id, amount):
+    """Count a newly inserted refund; the refunded address no longer backs the campaign"""
+    _upsert(campaign_id, {'total_refunded': amount}, lambda excluded: {
+        'total_refunded': CampaignStats.total_refunded + excluded.total_refunded,
+        'backer_count': db.case((CampaignStats.backer_count > 0, CampaignStats.backer_count - 1), else_=0)
+    })
+
+
+def apply_claim_stats(campaign_id):
+    _upsert(campaign_id, {'claimed': True}, lambda excluded: {'claimed': True})
+
+
+def compute_stats():
+    """Recompute every campaign's stats from the source tables, keyed by chain ID"""
+    stats = {}
+
+    def row(campaign_id):
+        return stats.setdefault(campaign_id, zero_values())
+
+    contributions = db.session.query(
+        Contribution.campaign_id,
+        db.func.sum(Contribution.amount),
+        db.func.count(Contribution.id),
+        db.func.count(db.distinct(Contribution.contributor_address)),
+        db.func.max(Contribution.timestamp)
+    ).group_by(Contribution.campaign_id)
+    for campaign_id, total, count, unique, latest in contributions:
+        stats_row = row(campaign_id)
+        stats_row.update(total_raised=total or 0.0, contribution_count=count, unique_contributors=unique,
+                         backer_count=unique, last_contribution_at=latest)
+
+    refunds = db.session.query(
+        Refund.campaign_id,
+        db.func.sum(Refund.amount),
+        db.func.count(db.distinct(Refund.contributor_address))
+    ).group_by(Refund.campaign_id)
+    for campaign_id, total, refunded in refunds:
+        stats_row = row(campaign_id)
+        stats_row.update(total_refunded=total or 0.0, backer_count=max(stats_row['backer_count'] - refunded, 0))
+
+    comments = db.session.query(OffChainCampaign.chain_id, db.func.count(Comment.id)).join(
+        Comment, Comment.campaign_id == OffChainCampaign.id
+    ).group_by(OffChainCampaign.chain_id)
+    for campaign_id, count in comments:
+        row(campaign_id)['comment_count'] = count
+
+    for (campaign_id,) in db.session.query(ChainCampaign.chain_id).filter(ChainCampaign.claimed.is_(True)):
+        row(campaign_id)['claimed'] = True
+
+    return stats
+
+
+def _drifted(stored, expected):
+    if stored is None:
+        return True
+    if any(getattr(stored, name) != expected[name] for name in COUNTERS + ('last_contribution_at', 'claimed')):
+        return True
+    return any(not math.isclose(getattr(stored, name), expected[name], abs_tol=1e-12) for name in AMOUNTS)
+
+
+def reconcile_stats():
+    """
+    Correct stats rows that drifted from the source tables and return how many were rewritten
+    An increment committed while the pass runs may be overwritten; the next pass restores it
+    """
+    expected = compute_stats()
+    stored = {row.campaign_id: row for row in CampaignStats.query}
+
+    # Campaigns whose source rows are gone go back to zero
+    for campaign_id in stored.keys() - expected.keys():
+        expected[campaign_id] = zero_values()
+
+    corrected = 0
+    try:
+        for campaign_id, values in expected.items():
+            if not _drifted(stored.get(campaign_id), values):
+                continue
+            _upsert(campaign_id, values, lambda excluded: {name: getattr(excluded, name) for name in values})
+            corrected += 1
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return corrected
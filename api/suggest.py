@@ -0,0 +1,203 @@
+import bisect
+import datetime
+import os
+import sys
+import threading
+import time
+from array import array
+from models import db, OffChainCampaign
+from api.search import WORD
+
+# Seconds between checks for metadata written by other processes (each API worker has its own index)
+SUGGEST_REFRESH_INTERVAL = float(os.getenv("SUGGEST_REFRESH_INTERVAL", "5"))
+# How far before the newest row already seen a refresh looks again, for writes that committed late
+SUGGEST_REFRESH_LAG = float(os.getenv("SUGGEST_REFRESH_LAG", "60"))
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+
+# Field an index entry was taken from
+TITLE, CATEGORY, TAG = 0, 1, 2
+FIELDS = ('title', 'category', 'tag')
+
+
+def entry_terms(title, category, tags):
+    """
+    (term, field) pairs a campaign is found under: its whole title and each word of it,
+    its category and each of its comma-separated tags, lower-cased
+    """
+    terms = {}
+    if title:
+        title = ' '.join(title.lower().split())
+        terms[title] = TITLE
+        for word in WORD.findall(title):
+            terms.setdefault(word, TITLE)
+    if category and category.strip():
+        terms.setdefault(category.strip().lower(), CATEGORY)
+    for tag in (tags or '').split(','):
+        if tag.strip():
+            terms.setdefault(tag.strip().lower(), TAG)
+    return terms.items()
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index from terms to campaigns, for search-as-you-type
+    Entries are ordered by (term, chain ID) and split into buckets by the first two
+    characters of the term; each bucket holds three parallel arrays (interned term
+    strings, chain IDs and the field each term came from). A lookup is a binary search
+    plus a scan of the matching range, and an update only shifts one bucket's arrays
+    """
+
+    def __init__(self, rows=()):
+        self._lock = threading.RLock()
+        self.build(rows)
+
+    def build(self, rows):
+        """Replace the contents with rows of (chain ID, title, category, tags)"""
+        campaigns = {}
+        entries = []
+        for chain_id, title, category, tags in rows:
+            campaigns[chain_id] = (title, category, tags)
+            entries.extend((sys.intern(term), chain_id, field) for term, field in entry_terms(title, category, tags))
+        entries.sort()
+
+        buckets = {}
+        for term, chain_id, field in entries:
+            bucket = buckets.get(term[:2])
+            if bucket is None:
+                bucket = buckets[term[:2]] = ([], array('i'), bytearray())
+            bucket[0].append(term)
+            bucket[1].append(chain_id)
+            bucket[2].append(field)
+
+        with self._lock:
+            self._campaigns = campaigns
+            self._buckets = buckets
+            self._keys = sorted(buckets)
+            self._size = len(entries)
+
+    def __len__(self):
+        return self._size
+
+    def _bucket(self, term):
+        bucket = self._buckets.get(term[:2])
+        if bucket is None:
+            bucket = self._buckets[term[:2]] = ([], array('i'), bytearray())
+            bisect.insort(self._keys, term[:2])
+        return bucket
+
+    @staticmethod
+    def _position(bucket, term, chain_id):
+        terms, ids, _ = bucket
+        start = bisect.bisect_left(terms, term)
+        end = bisect.bisect_right(terms, term, start)
+        return bisect.bisect_left(ids, chain_id, start, end)
+
+    def update(self, chain_id, title, category, tags):
+        """Index a new or changed campaign (no-op if its indexed fields did not change)"""
+        with self._lock:
+            previous = self._campaigns.get(chain_id)
+            if previous == (title, category, tags):
+                return
+            if previous:
+                for term, _ in entry_terms(*previous):
+                    bucket = self._buckets[term[:2]]
+                    position = self._position(bucket, term, chain_id)
+                    for column in bucket:
+                        del column[position]
+                    self._size -= 1
+
+            self._campaigns[chain_id] = (title, category, tags)
+            for term, field in entry_terms(title, category, tags):
+                bucket = self._bucket(term)
+                position = self._position(bucket, term, chain_id)
+                bucket[0].insert(position, sys.intern(term))
+                bucket[1].insert(position, chain_id)
+                bucket[2].insert(position, field)
+                self._size += 1
+
+    def suggest(self, prefix, limit=DEFAULT_SUGGESTIONS):
+        """
+        Up to limit distinct terms starting with prefix, and up to limit campaigns
+        indexed under them, in term order (so shorter completions come first)
+        """
+        prefix = ' '.join(prefix.lower().split())
+        terms, campaigns, seen = [], [], set()
+        if not prefix:
+            return terms, campaigns
+
+        with self._lock:
+            # Only one bucket can match a prefix of two or more characters
+            key = bisect.bisect_left(self._keys, prefix[:2])
+            while key < len(self._keys) and self._keys[key].startswith(prefix[:2]):
+                bucket_terms, ids, fields = self._buckets[self._keys[key]]
+                position = bisect.bisect_left(bucket_terms, prefix)
+                while position < len(bucket_terms) and (len(terms) < limit or len(campaigns) < limit):
+                    term = bucket_terms[position]
+                    if not term.startswith(prefix):
+                        break
+                    if len(terms) < limit and (not terms or terms[-1] != term):
+                        terms.append(term)
+                    chain_id = ids[position]
+                    if len(campaigns) < limit and chain_id not in seen:
+                        seen.add(chain_id)
+                        campaigns.append({
+                            "chain_id": chain_id,
+                            "title": self._campaigns[chain_id][0],
+                            "matched": FIELDS[fields[position]]
+                        })
+                    # Once the campaigns are found, only new terms are wanted: skip the rest of this one
+                    position = position + 1 if len(campaigns) < limit else bisect.bisect_right(
+                        bucket_terms, term, position)
+                key += 1
+        return terms, campaigns
+
+
+class CampaignSuggestions:
+    """
+    PrefixIndex over OffChainCampaign rows, built on first use in each process
+    Writes handled by this process are applied right away with update(); writes made by
+    other processes are picked up every SUGGEST_REFRESH_INTERVAL seconds from updated_at
+    """
+
+    def __init__(self, refresh_interval=SUGGEST_REFRESH_INTERVAL, refresh_lag=SUGGEST_REFRESH_LAG):
+        self.refresh_interval = refresh_interval
+        self.refresh_lag = datetime.timedelta(seconds=refresh_lag)
+        self.index = None
+        self._newest = None
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+
+    def _load(self, query):
+        rows = query.with_entities(
+            OffChainCampaign.chain_id, OffChainCampaign.title, OffChainCampaign.category,
+            OffChainCampaign.tags, OffChainCampaign.updated_at
+        ).all()
+        newest = max((row.updated_at for row in rows if row.updated_at), default=None)
+        if newest and (self._newest is None or newest > self._newest):
+            self._newest = newest
+        return [row[:4] for row in rows]
+
+    def get(self):
+        """The index, built or refreshed from the database if due"""
+        if self.index is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return self.index
+
+        with self._lock:
+            if self.index is None:
+                started = time.monotonic()
+                self.index = PrefixIndex(self._load(OffChainCampaign.query))
+                print(f"Built the suggestion index: {len(self.index)} entries in {time.monotonic() - started:.1f}s")
+            elif time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                query = OffChainCampaign.query
+                if self._newest:
+                    query = query.filter(OffChainCampaign.updated_at >= self._newest - self.refresh_lag)
+                for row in self._load(query):
+                    self.index.update(*row)
+            self._refreshed_at = time.monotonic()
+        return self.index
+
+    def update(self, campaign):
+        """Apply a metadata write made by this process (ignored until the index is first built)"""
+        if self.index is not None:
+            self.index.update(campaign.chain_id, campaign.title, campaign.category, campaign.tags)
@@ -0,0 +1,31 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+
+def insert_for(model):
+    """
+    Return an INSERT for the model that supports ON CONFLICT clauses
+    (PostgreSQL and SQLite share the same on_conflict_* API)
+    """
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+
+def upsert_returning(model, values, index_elements, set_=None):
+    """
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING and return the final row as a model instance
+    Without set_ the conflicting row is returned unchanged (get-or-create in one statement)
+    """
+    stmt = insert_for(model).values(**values)
+    if not set_:
+        # DO NOTHING returns no row on conflict; a no-op update makes RETURNING see the existing one
+        key = index_elements[0].key
+        set_ = {key: getattr(stmt.excluded, key)}
+    stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_).returning(model)
+    return db.session.scalars(stmt, execution_options={"populate_existing": True}).one()
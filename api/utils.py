@@ -373,6 +373,15 @@ def load_contract():
         }
     ]
 
+# Contract functions the campaign details page calls from the browser
+PAGE_CONTRACT_FUNCTIONS = ('contribute', 'claimFunds', 'requestRefund')
+
+def load_contract_functions(names):
+    """
+    Return the ABI entries for the given function names only
+    """
+    return [entry for entry in load_contract() if entry["type"] == "function" and entry["name"] in names]
+
 def get_contract_address():
     """
     Return the deployed contract address
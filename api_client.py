@@ -0,0 +1,133 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# Base URL of the Flask API (run_api.py)
+API_URL = os.getenv("API_URL", "http://localhost:8000").rstrip('/')
+# Seconds to connect to the API and to wait for a response
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "15"))
+# Seconds a GET response is reused by every session before it is fetched again
+API_CACHE_TTL = int(os.getenv("API_CACHE_TTL", "15"))
+# Keep-alive connections held open to the API, and threads for concurrent page loads, shared by all sessions
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+
+
+class APIResponse:
+    """Status and decoded body of an API call (picklable, so it can be cached)"""
+
+    def __init__(self, status_code, text, data):
+        self.status_code = status_code
+        self.text = text
+        self.data = data
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300
+
+    def json(self):
+        return self.data
+
+
+@st.cache_resource
+def get_session():
+    """One requests session for the whole Streamlit server, so connections to the API are reused"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _send(method, path, params=None, json=None, timeout=None):
+    response = get_session().request(method, API_URL + path, params=params, json=json,
+                                     timeout=timeout or (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    return APIResponse(response.status_code, response.text, data)
+
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def _cached_get(path, params, timeout):
+    response = _send("GET", path, params, timeout=timeout)
+    if response.status_code >= 500:
+        # Raising keeps server errors out of the cache; the next rerun tries again
+        raise requests.HTTPError(f"{response.status_code} from {path}: {response.text}")
+    return response
+
+
+def get(path, params=None, cache=True, timeout=None):
+    """
+    GET an API path (e.g. "/api/campaigns"); responses are cached for API_CACHE_TTL
+    seconds across all sessions unless cache=False
+    Server errors and unreachable API raise requests exceptions
+    """
+    if not cache:
+        response = _send("GET", path, params, timeout=timeout)
+        if response.status_code >= 500:
+            raise requests.HTTPError(f"{response.status_code} from {path}: {response.text}")
+        return response
+    return _cached_get(path, params or {}, timeout)
+
+
+def post(path, json=None, timeout=None):
+    """POST to an API path; a successful write invalidates every cached GET"""
+    response = _send("POST", path, json=json, timeout=timeout)
+    if response.ok:
+        invalidate()
+    return response
+
+
+def invalidate():
+    """Drop every cached GET, e.g. after a transaction the API cannot see being sent"""
+    _cached_get.clear()
+
+
+class PageData:
+    """Results of load_page(): the response of each call, and the error of each call that raised"""
+
+    def __init__(self):
+        self.responses = {}
+        self.errors = {}
+
+    def result(self, name):
+        """Response of a call, re-raising its error if it failed"""
+        if name in self.errors:
+            raise self.errors[name]
+        return self.responses[name]
+
+    def json(self, name, default=None):
+        """Decoded body of a call that succeeded with a 2xx status, else default"""
+        response = self.responses.get(name)
+        return response.json() if response is not None and response.ok else default
+
+
+@st.cache_resource
+def get_executor():
+    """Threads shared by every session's load_page(); one per pooled connection"""
+    return ThreadPoolExecutor(max_workers=API_POOL_SIZE, thread_name_prefix="api-client")
+
+
+def load_page(**calls):
+    """
+    Issue a page's independent GETs concurrently and wait for all of them
+    Each keyword names a call: path or (path, params), e.g.
+        load_page(campaigns=("/api/campaigns", {"limit": 20}), contract="/api/contract")
+    A failing call does not fail the others: its exception is kept in errors
+    """
+    futures = {}
+    for name, call in calls.items():
+        path, params = (call, None) if isinstance(call, str) else call
+        futures[name] = get_executor().submit(get, path, params)
+
+    page = PageData()
+    for name, future in futures.items():
+        try:
+            page.responses[name] = future.result()
+        except Exception as e:
+            page.errors[name] = e
+    return page
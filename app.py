@@ -1,5 +1,5 @@
 import streamlit as st
-import requests
+import api_client
 import json
 from utils import initialize_session_state, format_address, format_deadline
 from components import MetaMaskConnector, Header, Footer
@@ -30,23 +30,19 @@ if st.session_state.wallet_connected:
     # Fetch some recent campaigns to display on the home page
     try:
         # Use the development mode API to fetch some sample campaigns
-        response = requests.get("http://localhost:8000/api/campaigns")
+        response = api_client.get("/api/campaigns",
+                                  params={"sort": "newest", "limit": 3, "include": "metadata"})
         if response.status_code == 200:
             data = response.json()
-            recent_campaigns = data["campaigns"][-3:] if len(data["campaigns"]) > 3 else data["campaigns"]
+            recent_campaigns = data["campaigns"]
             
-            # Fetch additional metadata for each campaign
+            # Enhance campaigns with the metadata returned alongside them
             for campaign in recent_campaigns:
-                try:
-                    metadata_response = requests.get(f"http://localhost:8000/api/campaign-metadata/{campaign['id']}")
-                    if metadata_response.status_code == 200:
-                        metadata = metadata_response.json()["campaign"]
-                        # Enhance campaign with metadata
-                        campaign["title"] = metadata.get("title", f"Campaign {campaign['id']}")
-                        campaign["description"] = metadata.get("description", "No description available")
-                        campaign["image_url"] = metadata.get("image_url", "")
-                except Exception as e:
-                    print(f"Error fetching campaign metadata: {e}")
+                metadata = campaign.get("metadata")
+                if metadata:
+                    campaign["title"] = metadata.get("title") or f"Campaign {campaign['id']}"
+                    campaign["description"] = metadata.get("description") or "No description available"
+                    campaign["image_url"] = metadata.get("image_url", "")
             
             if recent_campaigns:
                 st.subheader("Recent Campaigns")
@@ -85,7 +81,7 @@ if st.session_state.wallet_connected:
             
     except Exception as e:
         st.error(f"Error connecting to the backend: {str(e)}")
-        st.info("Make sure the backend API is running at http://localhost:8000")
+        st.info(f"Make sure the backend API is running at {api_client.API_URL}")
 else:
     # Introduction for users who haven't connected their wallet
     st.info("👆 Connect your MetaMask wallet to get started")
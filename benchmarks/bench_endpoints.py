@@ -0,0 +1,199 @@
+"""
+Time every API endpoint at several dataset sizes
+
+For each scale (number of contributions, see scripts/generate_dataset.py) every
+table is dropped and regenerated, then each endpoint is called --requests times
+through the Flask test client (in-process, so no network time is included) with
+targets drawn from the dataset. Latency percentiles and the number of SQL
+statements per request are reported per endpoint, for reads served from the
+indexed tables and from the chain backend (the simulator unless CHAIN_BACKEND=rpc).
+
+Usage:
+    DATABASE_URL=... python benchmarks/bench_endpoints.py [--scales 10000,100000,1000000]
+        [--requests 200] [--sources index,chain] [--output results.json]
+
+Drops every table for each scale; only use it on a scratch database.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+# Campaigns are added to the simulated chain to match each generated dataset
+os.environ.setdefault("SIM_CAMPAIGNS", "0")
+
+from sqlalchemy import event
+import api.app as api
+from models import db, User, Contribution, ChainCampaign
+from scripts.generate_dataset import generate
+
+WARMUP_REQUESTS = 5
+
+
+def sample_targets(rng, count=200):
+    """Campaign IDs and addresses to send requests for, plus the busiest campaign"""
+    chain_ids = [row[0] for row in db.session.query(ChainCampaign.chain_id)]
+    addresses = [row[0] for row in db.session.query(User.wallet_address).order_by(db.func.random()).limit(count)]
+    busiest = db.session.query(Contribution.campaign_id).group_by(Contribution.campaign_id).order_by(
+        db.func.count(Contribution.id).desc()).limit(1).scalar()
+    return {
+        "chain_ids": rng.sample(chain_ids, min(count, len(chain_ids))),
+        "addresses": addresses,
+        "busiest": busiest or 0
+    }
+
+
+def endpoints():
+    """(name, method, build(targets, rng, index) -> (url, json body or None))"""
+    def campaign(t, rng):
+        return rng.choice(t["chain_ids"])
+
+    def address(t, rng):
+        return rng.choice(t["addresses"])
+
+    def new_hash(index):
+        return '0x' + random.Random(f"{time.time_ns()}:{index}").randbytes(32).hex()
+
+    return [
+        ("campaigns (all)", "GET", lambda t, rng, i: ("/api/campaigns", None)),
+        ("campaigns newest", "GET", lambda t, rng, i: ("/api/campaigns?limit=20&sort=newest", None)),
+        ("campaigns ending_soon", "GET", lambda t, rng, i: ("/api/campaigns?limit=20&sort=ending_soon&status=active",
+                                                           None)),
+        ("campaigns most_funded", "GET", lambda t, rng, i: ("/api/campaigns?limit=20&sort=most_funded", None)),
+        ("campaigns closest_to_goal", "GET", lambda t, rng, i: ("/api/campaigns?limit=20&sort=closest_to_goal",
+                                                               None)),
+        ("campaigns by creator", "GET", lambda t, rng, i: (f"/api/campaigns?limit=20&creator={address(t, rng)}",
+                                                          None)),
+        ("campaigns search", "GET", lambda t, rng, i: ("/api/campaigns?limit=20&q=campaign", None)),
+        ("campaigns full-text search", "GET", lambda t, rng, i: ("/api/campaigns/search?limit=20&q=lib", None)),
+        ("campaigns with metadata,stats", "GET",
+         lambda t, rng, i: ("/api/campaigns?limit=20&include=metadata,stats", None)),
+        ("campaign", "GET", lambda t, rng, i: (f"/api/campaigns/{campaign(t, rng)}", None)),
+        ("contribution", "GET",
+         lambda t, rng, i: (f"/api/campaigns/{campaign(t, rng)}/contribution/{address(t, rng)}", None)),
+        ("campaign page", "GET",
+         lambda t, rng, i: (f"/api/campaigns/{campaign(t, rng)}/page?viewer={address(t, rng)}", None)),
+        ("campaign page (busiest)", "GET",
+         lambda t, rng, i: (f"/api/campaigns/{t['busiest']}/page?viewer={address(t, rng)}", None)),
+        ("comments", "GET", lambda t, rng, i: (f"/api/campaigns/{campaign(t, rng)}/comments", None)),
+        ("comments (busiest)", "GET", lambda t, rng, i: (f"/api/campaigns/{t['busiest']}/comments", None)),
+        ("campaign metadata", "GET", lambda t, rng, i: (f"/api/campaign-metadata/{campaign(t, rng)}", None)),
+        ("contract", "GET", lambda t, rng, i: ("/api/contract", None)),
+        ("metrics", "GET", lambda t, rng, i: ("/api/metrics", None)),
+        ("user", "GET", lambda t, rng, i: (f"/api/users/{address(t, rng)}", None)),
+        ("user contributions", "GET",
+         lambda t, rng, i: (f"/api/users/{address(t, rng)}/contributions?include=stats", None)),
+        ("create user", "POST", lambda t, rng, i: ("/api/users", {"wallet_address": address(t, rng),
+                                                                  "bio": f"Benchmark {i}"})),
+        ("update campaign metadata", "POST", lambda t, rng, i: ("/api/campaign-metadata", {
+            "chain_id": campaign(t, rng), "wallet_address": address(t, rng), "website": f"https://example.com/{i}"
+        })),
+        ("create comment", "POST", lambda t, rng, i: (f"/api/campaigns/{campaign(t, rng)}/comments", {
+            "wallet_address": address(t, rng), "content": f"Benchmark comment {i}"
+        })),
+        ("record contribution", "POST", lambda t, rng, i: ("/api/contributions", {
+            "campaign_id": campaign(t, rng), "contributor_address": address(t, rng), "amount": 0.01,
+            "transaction_hash": new_hash(i)
+        })),
+        ("record contributions (bulk of 100)", "POST", lambda t, rng, i: ("/api/contributions/bulk", [
+            {"campaign_id": campaign(t, rng), "contributor_address": address(t, rng), "amount": 0.01,
+             "transaction_hash": new_hash(i * 1000 + item)}
+            for item in range(100)
+        ])),
+    ]
+
+
+def percentile(quantiles, p):
+    return round(quantiles[p - 1] * 1000, 2)
+
+
+def measure(client, engine, method, build, targets, requests, seed):
+    """Call an endpoint and return (latency percentiles in ms, SQL statements per request)"""
+    rng = random.Random(seed)
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    durations, queries, errors = [], [], 0
+    # Some handlers print debug output; keep it out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            for index in range(WARMUP_REQUESTS + requests):
+                url, body = build(targets, rng, index)
+                statements[0] = 0
+                started = time.perf_counter()
+                response = client.open(url, method=method, json=body)
+                elapsed = time.perf_counter() - started
+                if index < WARMUP_REQUESTS:
+                    continue
+                errors += response.status_code >= 500
+                durations.append(elapsed)
+                queries.append(statements[0])
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+    quantiles = statistics.quantiles(durations, n=100, method='inclusive')
+    return {
+        "p50_ms": percentile(quantiles, 50),
+        "p95_ms": percentile(quantiles, 95),
+        "p99_ms": percentile(quantiles, 99),
+        "queries_median": statistics.median(queries),
+        "queries_max": max(queries),
+        "server_errors": errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint at several dataset sizes")
+    parser.add_argument("--scales", default="10000,100000,1000000", help="Contribution counts, comma-separated")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint")
+    parser.add_argument("--sources", default="index,chain", help="Read paths to time: index, chain or both")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    client = api.app.test_client()
+
+    for scale in (int(value) for value in args.scales.split(',')):
+        with api.app.app_context():
+            db.drop_all()
+            db.create_all()
+            started = time.monotonic()
+            counts = generate(scale, args.seed)
+            print(f"\n{scale} contributions: generated {counts} in {time.monotonic() - started:.1f}s")
+
+            # Give the simulated chain the same campaigns the index has
+            missing = counts["chain_campaigns"] - getattr(api.chain, "campaign_count", counts["chain_campaigns"])
+            if missing > 0:
+                api.chain.generate_campaigns(missing)
+            api.chain_cache.clear()
+
+            targets = sample_targets(random.Random(args.seed))
+            engine = db.engine
+
+        print(f"{'source':<6} {'endpoint':<36} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+        for source in args.sources.split(','):
+            api.READ_FROM_INDEX = source == "index"
+            for name, method, build in endpoints():
+                result = measure(client, engine, method, build, targets, args.requests, args.seed)
+                results.append({"scale": scale, "source": source, "endpoint": name, "method": method, **result})
+                errors = f"  ({result['server_errors']} server errors)" if result["server_errors"] else ""
+                print(f"{source:<6} {name:<36} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} "
+                      f"{result['queries_median']:>8}{errors}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"requests": args.requests, "seed": args.seed, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
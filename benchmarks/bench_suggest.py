@@ -0,0 +1,107 @@
+"""
+Measure the memory and lookup time of the suggestion index (api/suggest.py)
+
+Builds a PrefixIndex from synthetic campaign metadata (titles, categories and tags
+drawn like scripts/generate_dataset.py) until it holds --entries entries, without
+a database, and reports the memory it allocated, build time, lookup latency for
+1-4 character prefixes and the latency of incremental updates.
+
+Usage:
+    python benchmarks/bench_suggest.py [--entries 1000000] [--lookups 10000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from api.suggest import PrefixIndex, entry_terms
+from scripts.generate_dataset import WORDS, CATEGORIES
+
+
+def campaign_rows(entries, rng):
+    """Synthetic (chain ID, title, category, tags) rows adding up to about this many index entries"""
+    rows, total = [], 0
+    while total < entries:
+        chain_id = len(rows)
+        row = (
+            chain_id,
+            f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {chain_id}",
+            rng.choice(CATEGORIES),
+            ",".join(rng.sample(WORDS, 3))
+        )
+        rows.append(row)
+        total += len(entry_terms(*row[1:]))
+    return rows
+
+
+def percentiles(durations):
+    quantiles = statistics.quantiles(durations, n=100, method='inclusive')
+    return {"p50_us": round(quantiles[49] * 1e6, 1), "p99_us": round(quantiles[98] * 1e6, 1),
+            "max_us": round(max(durations) * 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory suggestion index")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Index entries to build")
+    parser.add_argument("--lookups", type=int, default=10000, help="Timed prefix lookups")
+    parser.add_argument("--updates", type=int, default=1000, help="Timed incremental updates")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = campaign_rows(args.entries, rng)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = PrefixIndex(rows)
+    build_seconds = time.perf_counter() - started
+    # Memory still held once the build's temporary lists are freed
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    vocabulary = sorted({term for _, title, category, tags in rows for term, _ in entry_terms(title, category, tags)})
+    lookups = []
+    for _ in range(args.lookups):
+        term = rng.choice(vocabulary)
+        prefix = term[:rng.randint(1, min(4, len(term)))]
+        started = time.perf_counter()
+        index.suggest(prefix)
+        lookups.append(time.perf_counter() - started)
+
+    updates = []
+    for _ in range(args.updates):
+        chain_id = rng.randrange(len(rows))
+        started = time.perf_counter()
+        index.update(chain_id, f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {chain_id}",
+                     rng.choice(CATEGORIES), ",".join(rng.sample(WORDS, 3)))
+        updates.append(time.perf_counter() - started)
+
+    results = {
+        "entries": len(index),
+        "campaigns": len(rows),
+        "build_s": round(build_seconds, 2),
+        "memory_mb": round(memory / 2**20, 1),
+        "bytes_per_entry": round(memory / len(index), 1),
+        "lookup": percentiles(lookups),
+        "update": percentiles(updates)
+    }
+    print(f"{results['entries']} entries ({results['campaigns']} campaigns) built in {results['build_s']}s, "
+          f"{results['memory_mb']} MB ({results['bytes_per_entry']} bytes/entry)")
+    print(f"lookup p50 {results['lookup']['p50_us']}us p99 {results['lookup']['p99_us']}us, "
+          f"update p50 {results['update']['p50_us']}us p99 {results['update']['p99_us']}us")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+Replay a weighted mix of API calls over HTTP at fixed request rates
+
+Requests are sent open-loop: arrivals are scheduled at the target rate
+(Poisson, seeded) and handed to a pool of --concurrency workers, each with its
+own keep-alive session. Latency is measured from the scheduled arrival, so
+time spent queued behind a saturated server counts, as it would for users.
+Each rate in --rps is one step; the steps together form the throughput
+saturation curve.
+
+Default mix (relative weights, override with --mix):
+    list 30, details 25, contribution 20, comments_read 15, comments_write 5, contribution_post 5
+
+Usage:
+    python benchmarks/load_test.py --url http://localhost:8000 --rps 50,100,200,400 --duration 30
+    DATABASE_URL=... python benchmarks/load_test.py --serve [--generate 10000] --rps 50,100,200
+
+--serve runs the API in this process on a local port (on the simulated chain unless
+CHAIN_BACKEND=rpc); --generate first resets its database with scripts/generate_dataset.py.
+Writes (comments, contributions) add rows; only point it at a scratch deployment.
+"""
+import argparse
+import bisect
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+DEFAULT_MIX = {
+    "list": 30,
+    "details": 25,
+    "contribution": 20,
+    "comments_read": 15,
+    "comments_write": 5,
+    "contribution_post": 5
+}
+LIST_SORTS = ("newest", "ending_soon", "most_funded", "closest_to_goal")
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+REQUEST_TIMEOUT = 30
+
+
+def parse_mix(value):
+    """'list=30,details=25' -> {'list': 30.0, 'details': 25.0}"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation {name!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def discover_targets(base_url, rng, addresses=1000):
+    """Campaign IDs to hit (ranked by funding, so the first ones are the popular ones) and a pool of addresses"""
+    response = requests.get(f"{base_url}/api/campaigns", params={
+        "limit": 100, "sort": "most_funded", "include": "metadata"
+    }, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    campaigns = response.json()["campaigns"]
+    if not campaigns:
+        sys.exit("The API has no campaigns to load test against")
+
+    chain_ids = [c["id"] for c in campaigns]
+    # Comments can only be written to campaigns with off-chain metadata
+    commentable = [c["id"] for c in campaigns if c.get("metadata")] or chain_ids
+    return {
+        "chain_ids": chain_ids,
+        "chain_weights": list(itertools.accumulate(1 / rank for rank in range(1, len(chain_ids) + 1))),
+        "commentable": commentable,
+        "addresses": ['0x' + rng.randbytes(20).hex() for _ in range(addresses)]
+    }
+
+
+def plan_request(operation, targets, rng, run_id, index):
+    """(method, path, params, json body) of one request"""
+    chain_id = rng.choices(targets["chain_ids"], cum_weights=targets["chain_weights"])[0]
+    address = rng.choice(targets["addresses"])
+
+    if operation == "list":
+        return "GET", "/api/campaigns", {"limit": 20, "sort": rng.choice(LIST_SORTS)}, None
+    if operation == "details":
+        return "GET", f"/api/campaigns/{chain_id}/page", {"viewer": address}, None
+    if operation == "contribution":
+        return "GET", f"/api/campaigns/{chain_id}/contribution/{address}", None, None
+    if operation == "comments_read":
+        return "GET", f"/api/campaigns/{chain_id}/comments", None, None
+    if operation == "comments_write":
+        return "POST", f"/api/campaigns/{rng.choice(targets['commentable'])}/comments", None, {
+            "wallet_address": address, "content": f"Load test comment {index}"
+        }
+    return "POST", "/api/contributions", None, {
+        "campaign_id": chain_id, "contributor_address": address, "amount": 0.01,
+        "transaction_hash": '0x' + random.Random(f"{run_id}:{index}").randbytes(32).hex()
+    }
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(latencies)
+
+    def at(p):
+        return round(ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)], 2)
+
+    return {"p50": at(50), "p95": at(95), "p99": at(99), "max": round(ordered[-1], 2),
+            "mean": round(statistics.fmean(ordered), 2)}
+
+
+def histogram(latencies):
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for latency in latencies:
+        counts[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, latency)] += 1
+    return [{"le_ms": bound, "count": count} for bound, count in zip(HISTOGRAM_BOUNDS_MS + (None,), counts)]
+
+
+def run_step(base_url, rps, duration, concurrency, mix, targets, seed):
+    """Send rps * duration requests at the given rate and return the step's report"""
+    rng = random.Random(f"{seed}:{rps}")
+    run_id = f"{seed}:{rps}:{time.time_ns()}"
+    operations, weights = zip(*mix.items())
+
+    # Arrival times and requests are drawn up front, so a run is the same for the same seed
+    total = int(rps * duration)
+    arrivals = list(itertools.accumulate(rng.expovariate(rps) for _ in range(total)))
+    plans = []
+    for index in range(total):
+        operation = rng.choices(operations, weights=weights)[0]
+        plans.append((operation, plan_request(operation, targets, rng, run_id, index)))
+
+    local = threading.local()
+    results = []
+    results_lock = threading.Lock()
+
+    def send(operation, plan, scheduled):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        method, path, params, body = plan
+        sent = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, params=params, json=body, timeout=REQUEST_TIMEOUT)
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        finished = time.perf_counter()
+        with results_lock:
+            results.append((operation, status, (finished - scheduled) * 1000, (finished - sent) * 1000, finished))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for arrival, (operation, plan) in zip(arrivals, plans):
+            delay = started + arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, operation, plan, started + arrival)
+    elapsed = max((finished for *_, finished in results), default=started) - started
+
+    def report(rows):
+        latencies = [latency for _, _, latency, _, _ in rows]
+        errors = sum(1 for _, status, *_ in rows if status is None or status >= 500)
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "client_errors": sum(1 for _, status, *_ in rows if status is not None and 400 <= status < 500),
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "latency_ms": latency_summary(latencies),
+            "service_time_ms": latency_summary([service for _, _, _, service, _ in rows])
+        }
+
+    return {
+        "target_rps": rps,
+        "achieved_rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "duration_s": round(elapsed, 2),
+        **report(results),
+        "histogram": histogram([latency for _, _, latency, _, _ in results]),
+        "operations": {
+            operation: report([row for row in results if row[0] == operation])
+            for operation in mix
+        }
+    }
+
+
+def saturation(steps, slo_ms):
+    """Highest rate that was both sustained (90% of target) and within the p99 objective"""
+    sustained = [
+        step["target_rps"] for step in steps
+        if step["achieved_rps"] >= 0.9 * step["target_rps"] and step["latency_ms"]["p99"] is not None
+        and step["latency_ms"]["p99"] <= slo_ms and step["error_rate"] < 0.01
+    ]
+    return max(sustained, default=None)
+
+
+def serve(port):
+    """Run the API in a background thread and return its base URL"""
+    from werkzeug.serving import make_server
+    import api.app as api
+
+    # One access log line per request would slow the server down more than the requests do
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", port, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with a weighted traffic mix")
+    parser.add_argument("--url", help="Base URL of a running API")
+    parser.add_argument("--serve", action="store_true", help="Run the API in this process instead")
+    parser.add_argument("--port", type=int, default=0, help="Port for --serve (default: any free port)")
+    parser.add_argument("--generate", type=int, help="With --serve, reset the database with this many contributions")
+    parser.add_argument("--rps", default="25,50,100,200", help="Target request rates, comma-separated (one step each)")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per step")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum requests in flight")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. list=30,details=25,...")
+    parser.add_argument("--slo-ms", type=float, default=500, help="p99 latency objective for the saturation point")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if bool(args.url) == args.serve:
+        parser.error("Give either --url or --serve")
+
+    if args.serve:
+        if args.generate:
+            # Campaigns are added to the simulated chain to match the generated dataset
+            os.environ.setdefault("SIM_CAMPAIGNS", "0")
+            import api.app as api
+            from models import db
+            from scripts.generate_dataset import generate
+            with api.app.app_context():
+                db.drop_all()
+                db.create_all()
+                counts = generate(args.generate, args.seed)
+            missing = counts["chain_campaigns"] - getattr(api.chain, "campaign_count", counts["chain_campaigns"])
+            if missing > 0:
+                api.chain.generate_campaigns(missing)
+        base_url = serve(args.port)
+    else:
+        base_url = args.url.rstrip('/')
+
+    targets = discover_targets(base_url, random.Random(args.seed))
+    print(f"Load testing {base_url} with {len(targets['chain_ids'])} campaigns, mix {args.mix}")
+    print(f"{'target':>8} {'achieved':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+
+    steps = []
+    for rps in (float(value) for value in args.rps.split(',')):
+        step = run_step(base_url, rps, args.duration, args.concurrency, args.mix, targets, args.seed)
+        steps.append(step)
+        latency = step["latency_ms"]
+        print(f"{rps:>8g} {step['achieved_rps']:>9} {latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} "
+              f"{step['error_rate']:>8.2%}")
+
+    report = {
+        "url": base_url,
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "seed": args.seed,
+        "slo_p99_ms": args.slo_ms,
+        "saturation_rps": saturation(steps, args.slo_ms),
+        "steps": steps
+    }
+    print(f"Highest rate sustained within a {args.slo_ms:g}ms p99: {report['saturation_rps']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""Helpers shared by the migrations in versions/"""
+from alembic import op
+import sqlalchemy as sa
+
+
+def is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def drop_invalid_index(name: str) -> None:
+    """Drop an index left INVALID by an interrupted concurrent build"""
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def constraint_exists(name: str) -> bool:
+    return op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": name}
+    ).first() is not None
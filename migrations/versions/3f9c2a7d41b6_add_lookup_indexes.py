@@ -0,0 +1,91 @@
+"""add lookup indexes
+
+Indexes the columns every endpoint filters on and makes campaigns.chain_id
+unique. On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY
+outside the migration transaction, so the tables stay writable while they
+build. An interrupted concurrent build leaves an INVALID index behind;
+rerunning the migration drops and rebuilds it.
+
+Revision ID: 3f9c2a7d41b6
+Revises: 4a7c1e9b3d20
+Create Date: 2026-10-17 09:12:44.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import is_postgresql, drop_invalid_index, constraint_exists
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b6'
+down_revision: Union[str, None] = '4a7c1e9b3d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_comments_campaign_id_parent_id_id', 'comments', ['campaign_id', 'parent_id', 'id']),
+    ('ix_comments_parent_id', 'comments', ['parent_id']),
+    ('ix_contributions_campaign_id', 'contributions', ['campaign_id']),
+    ('ix_contributions_contributor_address_campaign_id', 'contributions', ['contributor_address', 'campaign_id']),
+    ('ix_user_activities_user_id_created_at', 'user_activities', ['user_id', 'created_at']),
+]
+
+UNIQUE_CHAIN_ID = 'uq_campaigns_chain_id'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    duplicates = bind.execute(sa.text(
+        "SELECT chain_id FROM campaigns GROUP BY chain_id HAVING COUNT(*) > 1 LIMIT 5"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"campaigns.chain_id has duplicates ({duplicates}); resolve them before upgrading")
+
+    # Contribution addresses are looked up lower-cased
+    op.execute(
+        "UPDATE contributions SET contributor_address = LOWER(contributor_address) "
+        "WHERE contributor_address <> LOWER(contributor_address)"
+    )
+
+    if not is_postgresql():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+        # SQLite cannot add a constraint to an existing table; a unique index is equivalent
+        op.create_index(UNIQUE_CHAIN_ID, 'campaigns', ['chain_id'], unique=True, if_not_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            drop_invalid_index(name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+        if not constraint_exists(UNIQUE_CHAIN_ID):
+            drop_invalid_index(UNIQUE_CHAIN_ID)
+            op.create_index(UNIQUE_CHAIN_ID, 'campaigns', ['chain_id'], unique=True,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+            # Promoting the prebuilt index only needs a brief lock; give up rather than queue behind long transactions
+            op.execute("SET lock_timeout = '5s'")
+            op.execute(f"ALTER TABLE campaigns ADD CONSTRAINT {UNIQUE_CHAIN_ID} UNIQUE USING INDEX {UNIQUE_CHAIN_ID}")
+            op.execute("RESET lock_timeout")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not is_postgresql():
+        op.drop_index(UNIQUE_CHAIN_ID, table_name='campaigns', if_exists=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE campaigns DROP CONSTRAINT IF EXISTS {UNIQUE_CHAIN_ID}")
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
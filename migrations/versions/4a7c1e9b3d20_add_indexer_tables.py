@@ -0,0 +1,178 @@
+"""add indexer tables
+
+Creates the tables the on-chain event indexer (run_indexer.py) writes and
+READ_FROM_INDEX reads: chain_campaigns with one (key, chain_id) index per
+sort order of GET /api/campaigns, contribution_balances, refunds and
+indexer_state. Tables that already exist (built by db.create_all()) are
+left alone; a chain_campaigns table from before the funding_ratio column
+gets the column, filled from its amounts.
+
+One transaction can emit several ContributionMade events, so contributions
+(and refunds) are keyed by (transaction_hash, log_index) instead of the
+transaction hash alone. Existing contributions get log_index -1, as if
+reported through the API; the indexer fills in the log index when it
+sees their events. On PostgreSQL the new unique index is built
+concurrently and then promoted to a constraint.
+
+Revision ID: 4a7c1e9b3d20
+Revises: eba5109fbdc8
+Create Date: 2026-10-17 16:02:37.214905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import is_postgresql, drop_invalid_index, constraint_exists
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7c1e9b3d20'
+down_revision: Union[str, None] = 'eba5109fbdc8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_chain_campaigns_creator', 'chain_campaigns', ['creator']),
+    ('ix_chain_campaigns_deadline_chain_id', 'chain_campaigns', ['deadline', 'chain_id']),
+    ('ix_chain_campaigns_current_amount_chain_id', 'chain_campaigns', ['current_amount', 'chain_id']),
+    ('ix_chain_campaigns_funding_ratio_chain_id', 'chain_campaigns', ['funding_ratio', 'chain_id']),
+    ('ix_contribution_balances_contributor_address', 'contribution_balances', ['contributor_address']),
+    ('ix_refunds_campaign_id', 'refunds', ['campaign_id']),
+    ('ix_refunds_contributor_address_campaign_id', 'refunds', ['contributor_address', 'campaign_id']),
+]
+
+# Names SQLite's unnamed UNIQUE (transaction_hash) so batch mode can drop it
+NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def unique_on_log_index(table: str) -> str:
+    """Name of the unique constraint on (transaction_hash, log_index)"""
+    return f'uq_{table}_transaction_hash_log_index'
+
+
+def transaction_hash_constraint(table: str) -> str:
+    """Name of the unique constraint on transaction_hash alone"""
+    for constraint in sa.inspect(op.get_bind()).get_unique_constraints(table):
+        if constraint['column_names'] == ['transaction_hash'] and constraint['name']:
+            return constraint['name']
+    return NAMING_CONVENTION['uq'] % {'table_name': table, 'column_0_name': 'transaction_hash'}
+
+
+def key_on_log_index(table: str) -> None:
+    """Replace the unique transaction_hash of a table from before log_index with (transaction_hash, log_index)"""
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+    if 'log_index' in columns:
+        return
+
+    old_constraint = transaction_hash_constraint(table)
+    new_constraint = unique_on_log_index(table)
+
+    if not is_postgresql():
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch:
+            batch.add_column(sa.Column('log_index', sa.Integer(), nullable=False, server_default='-1'))
+            batch.drop_constraint(old_constraint, type_='unique')
+            batch.create_unique_constraint(new_constraint, ['transaction_hash', 'log_index'])
+        return
+
+    op.add_column(table, sa.Column('log_index', sa.Integer(), nullable=False, server_default='-1'))
+    with op.get_context().autocommit_block():
+        drop_invalid_index(new_constraint)
+        op.create_index(new_constraint, table, ['transaction_hash', 'log_index'], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+        # Swapping the constraints only needs brief locks; give up rather than queue behind long transactions
+        op.execute("SET lock_timeout = '5s'")
+        if not constraint_exists(new_constraint):
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {new_constraint} UNIQUE USING INDEX {new_constraint}")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {old_constraint}")
+        op.execute("RESET lock_timeout")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'chain_campaigns',
+        sa.Column('chain_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('creator', sa.String(length=42), nullable=False),
+        sa.Column('title', sa.Text(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('image_url', sa.Text(), nullable=True),
+        sa.Column('funding_goal', sa.Float(), nullable=False),
+        sa.Column('current_amount', sa.Float(), nullable=False),
+        sa.Column('funding_ratio', sa.Float(), nullable=False),
+        sa.Column('deadline', sa.BigInteger(), nullable=False),
+        sa.Column('claimed', sa.Boolean(), nullable=False),
+        sa.Column('claimed_amount', sa.Float(), nullable=True),
+        sa.Column('claim_transaction_hash', sa.String(length=66), nullable=True),
+        sa.Column('created_block', sa.BigInteger(), nullable=False),
+        sa.Column('updated_block', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('chain_id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'contribution_balances',
+        sa.Column('campaign_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('contributor_address', sa.String(length=42), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('updated_block', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('campaign_id', 'contributor_address'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'refunds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('contributor_address', sa.String(length=42), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('transaction_hash', sa.String(length=66), nullable=False),
+        sa.Column('log_index', sa.Integer(), nullable=False),
+        sa.Column('block_number', sa.BigInteger(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('transaction_hash', 'log_index', name=unique_on_log_index('refunds')),
+        if_not_exists=True
+    )
+    op.create_table(
+        'indexer_state',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('last_block', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+        if_not_exists=True
+    )
+
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('chain_campaigns')}
+    if 'funding_ratio' not in columns:
+        op.add_column('chain_campaigns', sa.Column('funding_ratio', sa.Float(), nullable=False, server_default='0'))
+        op.execute(
+            "UPDATE chain_campaigns SET funding_ratio = current_amount / funding_goal WHERE funding_goal > 0"
+        )
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+    for table in ('contributions', 'refunds'):
+        key_on_log_index(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if a transaction has several contributions; they cannot be keyed by its hash alone
+    if not is_postgresql():
+        with op.batch_alter_table('contributions', naming_convention=NAMING_CONVENTION) as batch:
+            batch.drop_constraint(unique_on_log_index('contributions'), type_='unique')
+            batch.drop_column('log_index')
+            batch.create_unique_constraint(transaction_hash_constraint('contributions'), ['transaction_hash'])
+    else:
+        op.create_unique_constraint('contributions_transaction_hash_key', 'contributions', ['transaction_hash'])
+        op.drop_constraint(unique_on_log_index('contributions'), 'contributions', type_='unique')
+        op.drop_column('contributions', 'log_index')
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+    for table in ('indexer_state', 'refunds', 'contribution_balances', 'chain_campaigns'):
+        op.drop_table(table, if_exists=True)
@@ -0,0 +1,45 @@
+"""add campaign stats
+
+Creates the campaign_stats rollup. Existing campaigns are backfilled by
+the first reconciliation pass (python run_reconcile.py --once).
+
+Revision ID: 8b1d5e0c92a4
+Revises: 3f9c2a7d41b6
+Create Date: 2026-10-17 11:40:27.118930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1d5e0c92a4'
+down_revision: Union[str, None] = '3f9c2a7d41b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'campaign_stats',
+        sa.Column('campaign_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('total_raised', sa.Float(), nullable=False),
+        sa.Column('contribution_count', sa.Integer(), nullable=False),
+        sa.Column('unique_contributors', sa.Integer(), nullable=False),
+        sa.Column('backer_count', sa.Integer(), nullable=False),
+        sa.Column('last_contribution_at', sa.DateTime(), nullable=True),
+        sa.Column('comment_count', sa.Integer(), nullable=False),
+        sa.Column('total_refunded', sa.Float(), nullable=False),
+        sa.Column('claimed', sa.Boolean(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('campaign_id'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('campaign_stats', if_exists=True)
@@ -0,0 +1,81 @@
+"""add campaign search
+
+Full-text search over campaign metadata (GET /api/campaigns/search). On
+PostgreSQL, campaigns gets a generated search_vector column, which rewrites
+the table under an exclusive lock, and a GIN index built concurrently. On
+SQLite an FTS5 table is created, kept in sync by triggers and filled from
+the existing rows.
+
+Revision ID: c5a9e2f7d013
+Revises: 8b1d5e0c92a4
+Create Date: 2026-10-17 14:05:51.630214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import is_postgresql, drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a9e2f7d013'
+down_revision: Union[str, None] = '8b1d5e0c92a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_INDEX = 'ix_campaigns_search_vector'
+
+FTS5_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_insert AFTER INSERT ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts (rowid, title, description, category, tags) "
+    "VALUES (new.id, new.title, new.description, new.category, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_delete AFTER DELETE ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts (campaigns_fts, rowid, title, description, category, tags) "
+    "VALUES ('delete', old.id, old.title, old.description, old.category, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_update AFTER UPDATE ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts (campaigns_fts, rowid, title, description, category, tags) "
+    "VALUES ('delete', old.id, old.title, old.description, old.category, old.tags); "
+    "INSERT INTO campaigns_fts (rowid, title, description, category, tags) "
+    "VALUES (new.id, new.title, new.description, new.category, new.tags); END",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not is_postgresql():
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5("
+            "title, description, category, tags, content='campaigns', content_rowid='id', "
+            "tokenize='porter unicode61', prefix='2 3')"
+        )
+        for trigger in FTS5_TRIGGERS:
+            op.execute(trigger)
+        op.execute("INSERT INTO campaigns_fts (campaigns_fts) VALUES ('rebuild')")
+        return
+
+    op.execute(
+        "ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(category, '') || ' ' || coalesce(tags, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index(SEARCH_INDEX)
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {SEARCH_INDEX} ON campaigns USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not is_postgresql():
+        for trigger in ('campaigns_fts_insert', 'campaigns_fts_delete', 'campaigns_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS campaigns_fts")
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {SEARCH_INDEX}")
+    op.execute("ALTER TABLE campaigns DROP COLUMN IF EXISTS search_vector")
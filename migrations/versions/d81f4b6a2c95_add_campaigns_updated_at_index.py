@@ -0,0 +1,49 @@
+"""add campaigns updated_at index
+
+API workers poll campaigns for metadata changed since they last looked, to
+keep their in-memory suggestion index current. On PostgreSQL the index is
+built concurrently, so the table stays writable.
+
+Revision ID: d81f4b6a2c95
+Revises: c5a9e2f7d013
+Create Date: 2026-10-17 15:22:08.417552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import is_postgresql, drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4b6a2c95'
+down_revision: Union[str, None] = 'c5a9e2f7d013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UPDATED_AT_INDEX = 'ix_campaigns_updated_at'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not is_postgresql():
+        op.create_index(UPDATED_AT_INDEX, 'campaigns', ['updated_at'], if_not_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        drop_invalid_index(UPDATED_AT_INDEX)
+        op.create_index(UPDATED_AT_INDEX, 'campaigns', ['updated_at'], postgresql_concurrently=True,
+                        if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not is_postgresql():
+        op.drop_index(UPDATED_AT_INDEX, table_name='campaigns', if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(UPDATED_AT_INDEX, table_name='campaigns', postgresql_concurrently=True, if_exists=True)
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 import datetime
 
 db = SQLAlchemy()
@@ -49,10 +50,53 @@ class OffChainCampaign(db.Model):
     # Relationships
     comments = db.relationship('Comment', backref='campaign', lazy='dynamic')
 
+    __table_args__ = (
+        db.UniqueConstraint('chain_id', name='uq_campaigns_chain_id'),
+        # API workers poll for metadata changed since they last looked (api/suggest.py)
+        db.Index('ix_campaigns_updated_at', 'updated_at'),
+    )
+
     def __repr__(self):
         return f'<Campaign {self.title}>'
 
 
+# Full-text search over campaign metadata (queried by api/search.py), maintained by the database
+# on every write: a weighted tsvector column with a GIN index on PostgreSQL, an FTS5 table kept
+# in sync by triggers on SQLite. Tags are comma-separated, which both tokenizers split on
+CAMPAIGN_SEARCH_DDL = {
+    'postgresql': [
+        "ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(category, '') || ' ' || coalesce(tags, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_campaigns_search_vector ON campaigns USING GIN (search_vector)"
+    ],
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5("
+        "title, description, category, tags, content='campaigns', content_rowid='id', "
+        "tokenize='porter unicode61', prefix='2 3')",
+        "CREATE TRIGGER IF NOT EXISTS campaigns_fts_insert AFTER INSERT ON campaigns BEGIN "
+        "INSERT INTO campaigns_fts (rowid, title, description, category, tags) "
+        "VALUES (new.id, new.title, new.description, new.category, new.tags); END",
+        "CREATE TRIGGER IF NOT EXISTS campaigns_fts_delete AFTER DELETE ON campaigns BEGIN "
+        "INSERT INTO campaigns_fts (campaigns_fts, rowid, title, description, category, tags) "
+        "VALUES ('delete', old.id, old.title, old.description, old.category, old.tags); END",
+        "CREATE TRIGGER IF NOT EXISTS campaigns_fts_update AFTER UPDATE ON campaigns BEGIN "
+        "INSERT INTO campaigns_fts (campaigns_fts, rowid, title, description, category, tags) "
+        "VALUES ('delete', old.id, old.title, old.description, old.category, old.tags); "
+        "INSERT INTO campaigns_fts (rowid, title, description, category, tags) "
+        "VALUES (new.id, new.title, new.description, new.category, new.tags); END"
+    ]
+}
+
+for dialect, statements in CAMPAIGN_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(OffChainCampaign.__table__, 'after_create', DDL(statement).execute_if(dialect=dialect))
+# The FTS5 table is not part of the metadata; drop it with the table its content comes from
+event.listen(OffChainCampaign.__table__, 'before_drop',
+             DDL("DROP TABLE IF EXISTS campaigns_fts").execute_if(dialect='sqlite'))
+
+
 class Comment(db.Model):
     """Comment model for storing user comments on campaigns"""
     __tablename__ = 'comments'
@@ -68,6 +112,13 @@ class Comment(db.Model):
     # Relationships for nested comments
     replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
 
+    __table_args__ = (
+        # Top-level comments of a campaign, in keyset order
+        db.Index('ix_comments_campaign_id_parent_id_id', 'campaign_id', 'parent_id', 'id'),
+        # Reply tree walks
+        db.Index('ix_comments_parent_id', 'parent_id'),
+    )
+
     def __repr__(self):
         return f'<Comment {self.id}>'
 
@@ -83,14 +134,24 @@ class UserActivity(db.Model):
     activity_data = db.Column(db.Text)  # JSON string with activity-specific data (renamed from metadata)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_user_activities_user_id_created_at', 'user_id', 'created_at'),
+    )
+
     def __repr__(self):
         return f'<UserActivity {self.activity_type}>'
 
 
+# log_index of a contribution reported through the API, until the indexer sees its event
+UNINDEXED_LOG_INDEX = -1
+
+
 class Contribution(db.Model):
     """
     Contribution model for storing contribution records 
     (mirror of blockchain data for faster querying)
+    One transaction can emit several ContributionMade events, so a row is keyed
+    by its transaction hash and the log index of its event
     """
     __tablename__ = 'contributions'
 
@@ -98,8 +159,121 @@ class Contribution(db.Model):
     campaign_id = db.Column(db.Integer, nullable=False)  # References chain_id from blockchain
     contributor_address = db.Column(db.String(42), nullable=False)
     amount = db.Column(db.Float, nullable=False)  # Amount in ETH
-    transaction_hash = db.Column(db.String(66), nullable=False, unique=True)
+    transaction_hash = db.Column(db.String(66), nullable=False)
+    log_index = db.Column(db.Integer, nullable=False, server_default=str(UNINDEXED_LOG_INDEX))
+    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('transaction_hash', 'log_index', name='uq_contributions_transaction_hash_log_index'),
+        db.Index('ix_contributions_campaign_id', 'campaign_id'),
+        # Per-address lookups, grouped by campaign
+        db.Index('ix_contributions_contributor_address_campaign_id', 'contributor_address', 'campaign_id'),
+    )
+
+    def __repr__(self):
+        return f'<Contribution {self.transaction_hash}>'
+
+class ChainCampaign(db.Model):
+    """
+    Mirror of on-chain campaign state built by the event indexer
+    (lets read endpoints avoid calling the RPC node)
+    """
+    __tablename__ = 'chain_campaigns'
+
+    chain_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Blockchain campaign ID
+    creator = db.Column(db.String(42), nullable=False, index=True)  # Lower-cased address
+    title = db.Column(db.Text, nullable=False)  # The contract puts no limit on its length
+    description = db.Column(db.Text)
+    image_url = db.Column(db.Text)
+    funding_goal = db.Column(db.Float, nullable=False)  # Amount in ETH
+    current_amount = db.Column(db.Float, nullable=False, default=0)  # Amount in ETH
+    funding_ratio = db.Column(db.Float, nullable=False, default=0)  # current_amount / funding_goal
+    deadline = db.Column(db.BigInteger, nullable=False)  # Unix timestamp
+    claimed = db.Column(db.Boolean, nullable=False, default=False)
+    claimed_amount = db.Column(db.Float)  # Amount in ETH
+    claim_transaction_hash = db.Column(db.String(66))
+    created_block = db.Column(db.BigInteger, nullable=False)
+    updated_block = db.Column(db.BigInteger, nullable=False)
+
+    # Keyset pagination indexes, one per sort order of GET /api/campaigns
+    __table_args__ = (
+        db.Index('ix_chain_campaigns_deadline_chain_id', 'deadline', 'chain_id'),
+        db.Index('ix_chain_campaigns_current_amount_chain_id', 'current_amount', 'chain_id'),
+        db.Index('ix_chain_campaigns_funding_ratio_chain_id', 'funding_ratio', 'chain_id'),
+    )
+
+    def __repr__(self):
+        return f'<ChainCampaign {self.chain_id}>'
+
+
+class ContributionBalance(db.Model):
+    """
+    Current contribution of an address to a campaign, as tracked by the indexer
+    (mirrors the contract's contributions mapping)
+    """
+    __tablename__ = 'contribution_balances'
+
+    campaign_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # References chain_id from blockchain
+    contributor_address = db.Column(db.String(42), primary_key=True, index=True)  # Lower-cased address
+    amount = db.Column(db.Float, nullable=False, default=0)  # Amount in ETH
+    updated_block = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<ContributionBalance {self.campaign_id} {self.contributor_address}>'
+
+
+class Refund(db.Model):
+    """Refund records mirrored from FundsRefunded events"""
+    __tablename__ = 'refunds'
+
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer, nullable=False, index=True)  # References chain_id from blockchain
+    contributor_address = db.Column(db.String(42), nullable=False)  # Lower-cased address
+    amount = db.Column(db.Float, nullable=False)  # Amount in ETH
+    transaction_hash = db.Column(db.String(66), nullable=False)
+    log_index = db.Column(db.Integer, nullable=False)  # Position of the FundsRefunded event in its block
+    block_number = db.Column(db.BigInteger, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
+    __table_args__ = (
+        db.UniqueConstraint('transaction_hash', 'log_index', name='uq_refunds_transaction_hash_log_index'),
+        # Refunded amounts of an address, per campaign
+        db.Index('ix_refunds_contributor_address_campaign_id', 'contributor_address', 'campaign_id'),
+    )
+
+    def __repr__(self):
+        return f'<Refund {self.transaction_hash}>'
+
+
+class CampaignStats(db.Model):
+    """
+    Per-campaign aggregates, updated in the same transaction as the rows they count
+    (reconciled periodically against the source tables by run_reconcile.py)
+    """
+    __tablename__ = 'campaign_stats'
+
+    campaign_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # References chain_id from blockchain
+    total_raised = db.Column(db.Float, nullable=False, default=0)  # Sum of all contributions in ETH
+    contribution_count = db.Column(db.Integer, nullable=False, default=0)
+    unique_contributors = db.Column(db.Integer, nullable=False, default=0)  # Addresses that ever contributed
+    backer_count = db.Column(db.Integer, nullable=False, default=0)  # Contributors that have not been refunded
+    last_contribution_at = db.Column(db.DateTime)
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    total_refunded = db.Column(db.Float, nullable=False, default=0)  # Amount in ETH
+    claimed = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CampaignStats {self.campaign_id}>'
+
+
+class IndexerState(db.Model):
+    """Persisted block cursor for the on-chain event indexer"""
+    __tablename__ = 'indexer_state'
+
+    name = db.Column(db.String(64), primary_key=True)
+    last_block = db.Column(db.BigInteger, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
     def __repr__(self):
-        return f'<Contribution {self.transaction_hash}>'
\ No newline at end of file
+        return f'<IndexerState {self.name} @ {self.last_block}>'
@@ -1,5 +1,5 @@
 import streamlit as st
-import requests
+import api_client
 import json
 from utils import initialize_session_state, format_address, format_deadline, calculate_time_left, format_timestamp
 from components import MetaMaskConnector, Header, Footer
@@ -22,9 +22,19 @@ Header()
 wallet_connector = MetaMaskConnector()
 wallet_connector.render()
 
+def render_comment(comment, depth=0):
+    """Render a comment and its replies, indenting one step per level"""
+    author = comment["user"]["username"] or format_address(comment["user"]["wallet_address"])
+    indent = "&nbsp;&nbsp;&nbsp;&nbsp;" * depth
+    arrow = "↳ " if depth else ""
+    st.markdown(f"{indent}{arrow}**{author}**: {comment['content']}")
+    
+    for reply in comment["replies"]:
+        render_comment(reply, depth + 1)
+
 # Get campaign ID from URL parameter or session state
 if "campaign_id" in st.query_params:
-    campaign_id = st.query_params["campaign_id"][0]
+    campaign_id = st.query_params["campaign_id"]
     st.session_state.campaign_id = campaign_id
 elif "campaign_id" in st.session_state:
     campaign_id = st.session_state.campaign_id
@@ -33,12 +43,18 @@ else:
     st.button("Go to Explore", on_click=lambda: st.switch_page("pages/explore.py"))
     st.stop()
 
-# Fetch campaign details
+# Fetch everything the page needs in a single request
 try:
-    response = requests.get(f"http://localhost:8000/api/campaigns/{campaign_id}")
+    params = {"viewer": st.session_state.wallet_address} if st.session_state.wallet_connected else {}
+    response = api_client.get(f"/api/campaigns/{campaign_id}/page", params=params)
     if response.status_code == 200:
         data = response.json()
         campaign = data["campaign"]
+        viewer_contribution = data["viewer_contribution"] or 0
+        
+        # Contract details used by the transaction scripts below
+        st.session_state.contract_address = data["contract_address"]
+        st.session_state.contract_abi = data["abi"]
         
         # Main content
         st.title(campaign["title"])
@@ -70,14 +86,6 @@ try:
                                      key="claim_funds_button")
                             
                             # Add JavaScript for claiming funds
-                            if "contract_address" not in st.session_state or not st.session_state.contract_address:
-                                # Get contract information
-                                contract_response = requests.get("http://localhost:8000/api/contract")
-                                if contract_response.status_code == 200:
-                                    contract_data = contract_response.json()
-                                    st.session_state.contract_address = contract_data["address"]
-                                    st.session_state.contract_abi = contract_data["abi"]
-                            
                             st.components.v1.html(f"""
                             <script src="https://cdn.jsdelivr.net/npm/web3@latest/dist/web3.min.js"></script>
                             <script>
@@ -162,14 +170,6 @@ try:
                         contribute_button = st.button("Contribute", type="primary", use_container_width=True)
                         
                         # Add JavaScript for contribution
-                        if "contract_address" not in st.session_state or not st.session_state.contract_address:
-                            # Get contract information
-                            contract_response = requests.get("http://localhost:8000/api/contract")
-                            if contract_response.status_code == 200:
-                                contract_data = contract_response.json()
-                                st.session_state.contract_address = contract_data["address"]
-                                st.session_state.contract_abi = contract_data["abi"]
-                        
                         st.components.v1.html(f"""
                         <script src="https://cdn.jsdelivr.net/npm/web3@latest/dist/web3.min.js"></script>
                         <script>
@@ -219,83 +219,61 @@ try:
                         st.divider()
                         
                         # If user has contributed, show their contribution
-                        if st.session_state.wallet_connected:
-                            try:
-                                contribution_response = requests.get(
-                                    f"http://localhost:8000/api/campaigns/{campaign_id}/contribution/{st.session_state.wallet_address}"
-                                )
-                                if contribution_response.status_code == 200:
-                                    contribution_data = contribution_response.json()
-                                    contribution = contribution_data["contribution"]
-                                    
-                                    if float(contribution) > 0:
-                                        st.success(f"You have contributed {contribution} ETH to this campaign")
-                            except Exception as e:
-                                st.error(f"Error getting contribution data: {str(e)}")
+                        if float(viewer_contribution) > 0:
+                            st.success(f"You have contributed {viewer_contribution} ETH to this campaign")
                     else:
                         if campaign["currentAmount"] < campaign["fundingGoal"]:
                             st.warning("This campaign has ended without reaching its funding goal.")
                             
                             # Check if user has contributed
-                            if st.session_state.wallet_connected:
-                                try:
-                                    contribution_response = requests.get(
-                                        f"http://localhost:8000/api/campaigns/{campaign_id}/contribution/{st.session_state.wallet_address}"
-                                    )
-                                    if contribution_response.status_code == 200:
-                                        contribution_data = contribution_response.json()
-                                        contribution = contribution_data["contribution"]
-                                        
-                                        if float(contribution) > 0:
-                                            st.info(f"You contributed {contribution} ETH to this campaign. You can request a refund.")
-                                            
-                                            # Refund button
-                                            st.button("Request Refund", type="primary", use_container_width=True, 
-                                                    key="refund_button")
-                                            
-                                            # Add JavaScript for refund
-                                            st.components.v1.html(f"""
-                                            <script src="https://cdn.jsdelivr.net/npm/web3@latest/dist/web3.min.js"></script>
-                                            <script>
-                                            async function requestRefund() {{
-                                                if (typeof window.ethereum !== 'undefined') {{
-                                                    const web3 = new Web3(window.ethereum);
+                            if float(viewer_contribution) > 0:
+                                st.info(f"You contributed {viewer_contribution} ETH to this campaign. You can request a refund.")
+                                
+                                # Refund button
+                                st.button("Request Refund", type="primary", use_container_width=True, 
+                                        key="refund_button")
+                                
+                                # Add JavaScript for refund
+                                st.components.v1.html(f"""
+                                <script src="https://cdn.jsdelivr.net/npm/web3@latest/dist/web3.min.js"></script>
+                                <script>
+                                async function requestRefund() {{
+                                    if (typeof window.ethereum !== 'undefined') {{
+                                        const web3 = new Web3(window.ethereum);
                                                     
-                                                    const contractAddress = "{st.session_state.contract_address}";
-                                                    const contractABI = {json.dumps(st.session_state.contract_abi)};
+                                        const contractAddress = "{st.session_state.contract_address}";
+                                        const contractABI = {json.dumps(st.session_state.contract_abi)};
                                                     
-                                                    const contract = new web3.eth.Contract(contractABI, contractAddress);
+                                        const contract = new web3.eth.Contract(contractABI, contractAddress);
                                                     
-                                                    try {{
-                                                        const accounts = await ethereum.request({{ method: 'eth_requestAccounts' }});
-                                                        const account = accounts[0];
+                                        try {{
+                                            const accounts = await ethereum.request({{ method: 'eth_requestAccounts' }});
+                                            const account = accounts[0];
                                                         
-                                                        const result = await contract.methods.requestRefund({campaign_id}).send({{ from: account }});
+                                            const result = await contract.methods.requestRefund({campaign_id}).send({{ from: account }});
                                                         
-                                                        console.log("Transaction successful:", result);
-                                                        alert("Refund requested successfully! Transaction hash: " + result.transactionHash);
+                                            console.log("Transaction successful:", result);
+                                            alert("Refund requested successfully! Transaction hash: " + result.transactionHash);
                                                         
-                                                        // Refresh page
-                                                        window.location.reload();
-                                                    }} catch (error) {{
-                                                        console.error("Error requesting refund:", error);
-                                                        alert("Failed to request refund: " + error.message);
-                                                    }}
-                                                }}
-                                            }}
-                                            
-                                            // Set up listener for the refund button
-                                            const streamlitDoc = window.parent.document;
-                                            const buttons = streamlitDoc.querySelectorAll('button');
-                                            for (const button of buttons) {{
-                                                if (button.innerText === 'Request Refund') {{
-                                                    button.addEventListener('click', requestRefund);
-                                                }}
-                                            }}
-                                            </script>
-                                            """, height=0)
-                                except Exception as e:
-                                    st.error(f"Error getting contribution data: {str(e)}")
+                                            // Refresh page
+                                            window.location.reload();
+                                        }} catch (error) {{
+                                            console.error("Error requesting refund:", error);
+                                            alert("Failed to request refund: " + error.message);
+                                        }}
+                                    }}
+                                }}
+                                
+                                // Set up listener for the refund button
+                                const streamlitDoc = window.parent.document;
+                                const buttons = streamlitDoc.querySelectorAll('button');
+                                for (const button of buttons) {{
+                                    if (button.innerText === 'Request Refund') {{
+                                        button.addEventListener('click', requestRefund);
+                                    }}
+                                }}
+                                </script>
+                                """, height=0)
                         else:
                             st.success("This campaign has successfully reached its funding goal!")
                 else:
@@ -317,15 +295,25 @@ try:
                     st.metric("Days Left", f"{days_left}")
                 
                 with col2:
-                    contributors = 0  # This would come from the blockchain in a real implementation
-                    st.metric("Contributors", f"{contributors}")
+                    st.metric("Contributors", f"{data['contributor_count']}")
+                
+                # Transactions are sent from the browser, so cached pages are only refreshed on request
+                st.button("Refresh after a transaction", use_container_width=True, on_click=api_client.invalidate)
+            
+            # Comments
+            if data["comments"]:
+                with st.container(border=True):
+                    st.subheader("Comments")
+                    
+                    for comment in data["comments"]:
+                        render_comment(comment)
     else:
         st.error(f"Failed to fetch campaign details: {response.text}")
         st.button("Go to Explore", on_click=lambda: st.switch_page("pages/explore.py"))
 
 except Exception as e:
     st.error(f"Error connecting to the backend: {str(e)}")
-    st.info("Make sure the backend API is running at http://localhost:8000")
+    st.info(f"Make sure the backend API is running at {api_client.API_URL}")
     st.button("Go to Explore", on_click=lambda: st.switch_page("pages/explore.py"))
 
 # Display Footer
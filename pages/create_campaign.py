@@ -1,5 +1,5 @@
 import streamlit as st
-import requests
+import api_client
 import json
 import datetime
 from utils import initialize_session_state
@@ -68,7 +68,7 @@ else:
                 # For now, we'll just display what would happen
                 try:
                     # Get contract information
-                    contract_response = requests.get("http://localhost:8000/api/contract")
+                    contract_response = api_client.get("/api/contract")
                     if contract_response.status_code == 200:
                         contract_data = contract_response.json()
                         
@@ -179,7 +179,7 @@ else:
                         st.error("Failed to get contract information from the API")
                 except Exception as e:
                     st.error(f"Error connecting to the backend: {str(e)}")
-                    st.info("Make sure the backend API is running at http://localhost:8000")
+                    st.info(f"Make sure the backend API is running at {api_client.API_URL}")
 
 # Display Footer
 Footer()
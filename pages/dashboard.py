@@ -1,8 +1,8 @@
 import streamlit as st
-import requests
+import api_client
 import pandas as pd
 import plotly.express as px
-from utils import initialize_session_state, format_address, format_deadline, get_address_campaigns
+from utils import initialize_session_state, format_address, format_deadline
 from components import MetaMaskConnector, Header, Footer
 
 # Initialize session
@@ -30,33 +30,40 @@ if not st.session_state.wallet_connected:
     st.warning("Please connect your wallet to view your dashboard")
     st.stop()
 
-# Fetch campaigns
+# The user's campaigns, a page of 100 (the API's largest) at a time
+CREATOR_PARAMS = {"creator": st.session_state.wallet_address, "limit": 100}
+
+# Fetch the user's campaigns and the campaigns they backed at the same time
 try:
-    response = requests.get("http://localhost:8000/api/campaigns")
+    page_data = api_client.load_page(
+        campaigns=("/api/campaigns", CREATOR_PARAMS),
+        contributions=f"/api/users/{st.session_state.wallet_address}/contributions"
+    )
+    response = page_data.result("campaigns")
     if response.status_code == 200:
         data = response.json()
-        all_campaigns = data["campaigns"]
         
-        # Filter campaigns created by the user
-        user_campaigns = [c for c in all_campaigns if c["creator"].lower() == st.session_state.wallet_address.lower()]
+        # Campaigns created by the user; a prolific creator has further pages
+        user_campaigns = list(data["campaigns"])
+        next_cursor = data.get("next_cursor")
+        while next_cursor:
+            more = api_client.get("/api/campaigns", params={**CREATOR_PARAMS, "cursor": next_cursor})
+            if more.status_code != 200:
+                st.warning(f"Only your first {len(user_campaigns)} campaigns could be loaded")
+                break
+            user_campaigns.extend(more.json()["campaigns"])
+            next_cursor = more.json().get("next_cursor")
         
-        # For the demo, we'll show backed campaigns as any campaign that is not created by the user
-        # In a real implementation, we would query the blockchain for contributions by this user
+        # Campaigns the user has backed; the dashboard still renders if they failed to load
         backed_campaigns = []
-        for campaign in all_campaigns:
-            if campaign["creator"].lower() != st.session_state.wallet_address.lower():
-                # Check if user has contributed to this campaign
-                try:
-                    contribution_response = requests.get(
-                        f"http://localhost:8000/api/campaigns/{campaign['id']}/contribution/{st.session_state.wallet_address}"
-                    )
-                    if contribution_response.status_code == 200:
-                        contribution_data = contribution_response.json()
-                        if float(contribution_data["contribution"]) > 0:
-                            campaign["contribution"] = contribution_data["contribution"]
-                            backed_campaigns.append(campaign)
-                except:
-                    pass
+        if "contributions" in page_data.errors:
+            st.warning(f"Could not load the campaigns you backed: {page_data.errors['contributions']}")
+        elif not page_data.responses["contributions"].ok:
+            st.warning("Could not load the campaigns you backed")
+        for contribution in page_data.json("contributions", {"contributions": []})["contributions"]:
+            campaign = contribution["campaign"]
+            if campaign and campaign["creator"].lower() != st.session_state.wallet_address.lower():
+                backed_campaigns.append({**campaign, "contribution": contribution["amount"]})
         
         # Display tabs for different dashboard sections
         tab1, tab2, tab3 = st.tabs(["Overview", "My Campaigns", "Backed Campaigns"])
@@ -66,6 +73,7 @@ try:
             
             # Account info
             st.write(f"**Account:** {format_address(st.session_state.wallet_address)}")
+            st.button("Refresh", on_click=api_client.invalidate)
             
             # Summary metrics
             col1, col2, col3 = st.columns(3)
@@ -211,7 +219,7 @@ try:
         
 except Exception as e:
     st.error(f"Error connecting to the backend: {str(e)}")
-    st.info("Make sure the backend API is running at http://localhost:8000")
+    st.info(f"Make sure the backend API is running at {api_client.API_URL}")
 
 # Display Footer
 Footer()
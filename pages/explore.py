@@ -1,5 +1,5 @@
 import streamlit as st
-import requests
+import api_client
 from utils import initialize_session_state, format_address, format_deadline, calculate_time_left
 from components import MetaMaskConnector, Header, Footer
 
@@ -27,100 +27,165 @@ st.title("Explore Campaigns")
 if not st.session_state.wallet_connected:
     st.warning("Please connect your wallet to interact with campaigns")
 
-# Fetch campaigns
+# Campaigns shown per page; filtering, sorting and paging happen in the API
+PAGE_SIZE = 24
+
+STATUS_OPTIONS = {
+    "All": "all",
+    "Active": "active",
+    "Completed": "completed",
+    "Funded": "funded",
+    "Not Funded": "not_funded"
+}
+
+SORT_OPTIONS = {
+    "Newest": "newest",
+    "Oldest": "oldest",
+    "Most Funded": "most_funded",
+    "Ending Soon": "ending_soon",
+    "Closest to Goal": "closest_to_goal"
+}
+
+# Sorts the API rejects with a status, since they would never match (see api/listing.py)
+INCOMPATIBLE_SORTS = {
+    "Completed": ("Ending Soon",),
+    "Funded": ("Closest to Goal",)
+}
+
+# Filters and the current page live in the URL, so a link reopens the same view
+query = st.query_params
+if "explore_q" not in st.session_state:
+    st.session_state.explore_q = query.get("q", "")
+    st.session_state.explore_status = next(
+        (label for label, value in STATUS_OPTIONS.items() if value == query.get("status")), "All")
+    st.session_state.explore_sort = next(
+        (label for label, value in SORT_OPTIONS.items() if value == query.get("sort")), "Newest")
+
+# Add search and filter options
+search_col, filter_col, sort_col = st.columns([2, 1, 1])
+
+with search_col:
+    search_term = st.text_input("Search campaigns", placeholder="Search titles, descriptions, categories and tags", key="explore_q")
+
+# Search results are ranked by relevance, so filtering and sorting only apply to browsing
+with filter_col:
+    filter_option = st.selectbox("Filter by", list(STATUS_OPTIONS), key="explore_status", disabled=bool(search_term))
+
+with sort_col:
+    sort_labels = [label for label in SORT_OPTIONS if label not in INCOMPATIBLE_SORTS.get(filter_option, ())]
+    if st.session_state.explore_sort not in sort_labels:
+        st.session_state.explore_sort = "Newest"
+    sort_option = st.selectbox("Sort by", sort_labels, key="explore_sort", disabled=bool(search_term))
+
+if search_term:
+    endpoint = "/api/campaigns/search"
+    params = {"limit": PAGE_SIZE, "q": search_term}
+else:
+    endpoint = "/api/campaigns"
+    params = {
+        "limit": PAGE_SIZE,
+        "include": "metadata",
+        "status": STATUS_OPTIONS[filter_option],
+        "sort": SORT_OPTIONS[sort_option]
+    }
+
+def linked_page(value):
+    """Page number of a deep link; a cursor is never the first page, so anything unusable counts as 2"""
+    try:
+        return max(int(value), 2)
+    except (TypeError, ValueError):
+        return 2
+
+
+# Keyset cursors of the pages visited so far, starting at page explore_first_page;
+# reset whenever the filters change. A deep link only carries the cursor of its own page
+if st.session_state.get("explore_params") != params:
+    linked = st.session_state.get("explore_params") is None and query.get("cursor")
+    st.session_state.explore_params = params
+    st.session_state.explore_cursors = [query["cursor"]] if linked else [None]
+    st.session_state.explore_first_page = linked_page(query.get("page")) if linked else 1
+
+cursor = st.session_state.explore_cursors[-1]
+page_number = st.session_state.explore_first_page + len(st.session_state.explore_cursors) - 1
+if cursor:
+    params = {**params, "cursor": cursor}
+
+link = {name: value for name, value in (
+    ("q", search_term),
+    ("status", params.get("status") if params.get("status") != "all" else None),
+    ("sort", params.get("sort") if params.get("sort") != "newest" else None),
+    ("page", str(page_number) if cursor else None),
+    ("cursor", cursor)
+) if value}
+if query.to_dict() != link:
+    query.from_dict(link)
+
+
+def first_page():
+    st.session_state.explore_cursors = [None]
+    st.session_state.explore_first_page = 1
+
+
+def render_card(campaign):
+    """One campaign card; kept to a few elements, since every element is sent to the browser"""
+    metadata = campaign.get("metadata") or {}
+    description = campaign["description"]
+    if len(description) > 150:
+        description = description[:150] + "..."
+    category = f"🏷️ {metadata['category']}  \n" if metadata.get("category") else ""
+    
+    with st.container(border=True):
+        st.markdown(
+            f"#### {metadata.get('title') or campaign['title']}\n"
+            f"{category}{description}"
+        )
+        
+        # Progress bar
+        progress = campaign["currentAmount"] / campaign["fundingGoal"] if campaign["fundingGoal"] > 0 else 0
+        st.progress(min(progress, 1.0))
+        
+        st.markdown(
+            f"💰 {campaign['currentAmount']} / {campaign['fundingGoal']} ETH · "
+            f"⏱️ {calculate_time_left(campaign['deadline'])}  \n"
+            f"🧑‍💻 Creator: {format_address(campaign['creator'])}"
+        )
+        
+        if st.button("View Details", key=f"view_{campaign['id']}"):
+            st.session_state.campaign_id = campaign["id"]
+            st.switch_page("pages/campaign_details.py")
+
+
+# Fetch only the page being shown
 try:
-    response = requests.get("http://localhost:8000/api/campaigns")
+    response = api_client.get(endpoint, params=params)
     if response.status_code == 200:
         data = response.json()
-        campaigns = data["campaigns"]
-        
-        # Add search and filter options
-        search_col, filter_col = st.columns([2, 1])
-        
-        with search_col:
-            search_term = st.text_input("Search campaigns", placeholder="Search by title or description")
-        
-        with filter_col:
-            filter_option = st.selectbox("Filter by", 
-                                      ["All", "Active", "Completed", "Funded", "Not Funded"])
-        
-        # Apply filters
-        filtered_campaigns = campaigns
-        
-        if search_term:
-            filtered_campaigns = [c for c in filtered_campaigns 
-                               if search_term.lower() in c["title"].lower() 
-                               or search_term.lower() in c["description"].lower()]
-        
-        if filter_option == "Active":
-            import time
-            current_time = int(time.time())
-            filtered_campaigns = [c for c in filtered_campaigns if c["deadline"] > current_time]
-        
-        elif filter_option == "Completed":
-            import time
-            current_time = int(time.time())
-            filtered_campaigns = [c for c in filtered_campaigns if c["deadline"] <= current_time]
-        
-        elif filter_option == "Funded":
-            filtered_campaigns = [c for c in filtered_campaigns 
-                               if float(c["currentAmount"]) >= float(c["fundingGoal"])]
-        
-        elif filter_option == "Not Funded":
-            filtered_campaigns = [c for c in filtered_campaigns 
-                               if float(c["currentAmount"]) < float(c["fundingGoal"])]
-        
-        # Sort campaigns
-        sort_option = st.selectbox("Sort by", 
-                                ["Newest", "Oldest", "Most Funded", "Ending Soon"])
-        
-        if sort_option == "Newest":
-            # Assuming campaign IDs are sequential
-            filtered_campaigns = sorted(filtered_campaigns, key=lambda c: c["id"], reverse=True)
-        
-        elif sort_option == "Oldest":
-            filtered_campaigns = sorted(filtered_campaigns, key=lambda c: c["id"])
-        
-        elif sort_option == "Most Funded":
-            filtered_campaigns = sorted(filtered_campaigns, key=lambda c: float(c["currentAmount"]), reverse=True)
-        
-        elif sort_option == "Ending Soon":
-            import time
-            current_time = int(time.time())
-            # Filter active campaigns and sort by time remaining
-            active_campaigns = [c for c in filtered_campaigns if c["deadline"] > current_time]
-            filtered_campaigns = sorted(active_campaigns, key=lambda c: c["deadline"])
+        filtered_campaigns = data["campaigns"]
+        next_cursor = data.get("next_cursor")
         
         # Display campaigns
         if filtered_campaigns:
-            st.write(f"Found {len(filtered_campaigns)} campaigns")
+            st.write(f"Page {page_number}")
+            
+            # Display campaigns in a grid layout, one row of three at a time
+            for row in range(0, len(filtered_campaigns), 3):
+                for col, campaign in zip(st.columns(3), filtered_campaigns[row:row + 3]):
+                    with col:
+                        render_card(campaign)
+            
+            prev_col, next_col = st.columns(2)
             
-            # Display campaigns in a grid layout
-            cols = st.columns(3)
+            with prev_col:
+                if len(st.session_state.explore_cursors) > 1:
+                    st.button("Previous Page", use_container_width=True,
+                              on_click=lambda: st.session_state.explore_cursors.pop())
+                elif page_number > 1:
+                    st.button("First Page", use_container_width=True, on_click=first_page)
             
-            for i, campaign in enumerate(filtered_campaigns):
-                with cols[i % 3]:
-                    with st.container(border=True):
-                        st.subheader(campaign["title"])
-                        st.write(campaign["description"][:150] + "..." if len(campaign["description"]) > 150 else campaign["description"])
-                        
-                        # Progress bar
-                        progress = campaign["currentAmount"] / campaign["fundingGoal"] if campaign["fundingGoal"] > 0 else 0
-                        st.progress(min(progress, 1.0))
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.write(f"💰 {campaign['currentAmount']} / {campaign['fundingGoal']} ETH")
-                        
-                        with col2:
-                            time_left = calculate_time_left(campaign["deadline"])
-                            st.write(f"⏱️ {time_left}")
-                        
-                        st.write(f"🧑‍💻 Creator: {format_address(campaign['creator'])}")
-                        
-                        st.button("View Details", key=f"view_{campaign['id']}", 
-                                 on_click=lambda id=campaign['id']: st.switch_page("pages/campaign_details.py"))
+            with next_col:
+                if next_cursor:
+                    st.button("Next Page", use_container_width=True,
+                              on_click=lambda c=next_cursor: st.session_state.explore_cursors.append(c))
         else:
             st.info("No campaigns found matching your criteria")
             
@@ -129,7 +194,7 @@ try:
         
 except Exception as e:
     st.error(f"Error connecting to the backend: {str(e)}")
-    st.info("Make sure the backend API is running at http://localhost:8000")
+    st.info(f"Make sure the backend API is running at {api_client.API_URL}")
 
 # Display Footer
 Footer()
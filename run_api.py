@@ -1,4 +1,88 @@
-from api.app import app
+"""
+Serve the API
+
+By default the API runs under gunicorn: the app is imported once in the master
+(preload) and forked into --workers processes, each serving --threads requests
+at a time. Missing tables are created once in the master before forking.
+On SIGTERM workers stop accepting connections and finish in-flight requests
+for up to --graceful-timeout seconds.
+
+Usage:
+    python run_api.py [--workers 4] [--threads 8] [--port 8000]
+    python run_api.py --dev     # Flask development server with debugger and reloader
+"""
+import argparse
+import os
+from gunicorn.app.base import BaseApplication
+from api.app import create_app, create_schema
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# Worker processes (defaults to gunicorn's recommended 2 per core + 1) and request threads per worker
+API_WORKERS = int(os.getenv("API_WORKERS", str(2 * (os.cpu_count() or 1) + 1)))
+API_THREADS = int(os.getenv("API_THREADS", "4"))
+# Seconds an idle keep-alive connection is held open; keep it above the idle timeout of any proxy in front
+API_KEEPALIVE = int(os.getenv("API_KEEPALIVE", "5"))
+# Seconds workers get to finish in-flight requests on shutdown or restart
+API_GRACEFUL_TIMEOUT = int(os.getenv("API_GRACEFUL_TIMEOUT", "30"))
+# Seconds a worker may go silent (stuck on one request) before it is killed and replaced
+API_WORKER_TIMEOUT = int(os.getenv("API_WORKER_TIMEOUT", "60"))
+# Restart each worker after this many requests (plus up to 10% jitter); 0 never restarts
+API_MAX_REQUESTS = int(os.getenv("API_MAX_REQUESTS", "0"))
+
+
+class APIServer(BaseApplication):
+    """gunicorn serving the app built by create_app(), configured from options instead of the command line"""
+
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Serve the API")
+    parser.add_argument("--dev", action="store_true", help="Run the Flask development server instead")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=API_THREADS, help="Request threads per worker")
+    parser.add_argument("--keepalive", type=int, default=API_KEEPALIVE, help="Idle keep-alive seconds")
+    parser.add_argument("--graceful-timeout", type=int, default=API_GRACEFUL_TIMEOUT,
+                        help="Seconds to finish in-flight requests on shutdown")
+    parser.add_argument("--timeout", type=int, default=API_WORKER_TIMEOUT,
+                        help="Seconds before a stuck worker is replaced")
+    parser.add_argument("--max-requests", type=int, default=API_MAX_REQUESTS,
+                        help="Restart workers after this many requests (0 = never)")
+    parser.add_argument("--no-create-schema", action="store_true",
+                        help="Don't create missing tables at startup (schema managed with alembic)")
+    args = parser.parse_args()
+
+    app = create_app()
+    if not args.no_create_schema:
+        create_schema(app)
+
+    if args.dev:
+        app.run(host=args.host, port=args.port, debug=True)
+    else:
+        print(f"Serving the API on {args.host}:{args.port} with {args.workers} worker(s) x {args.threads} thread(s)")
+        APIServer(app, {
+            "bind": f"{args.host}:{args.port}",
+            "workers": args.workers,
+            "worker_class": "gthread",
+            "threads": args.threads,
+            "preload_app": True,
+            "keepalive": args.keepalive,
+            "graceful_timeout": args.graceful_timeout,
+            "timeout": args.timeout,
+            "max_requests": args.max_requests,
+            "max_requests_jitter": args.max_requests // 10,
+            "accesslog": "-"
+        }).run()
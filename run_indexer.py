@@ -0,0 +1,20 @@
+import argparse
+import sys
+from api.app import app, w3, contract, DEV_MODE
+from api.indexer import CampaignIndexer
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mirror Campaign.sol events into the database")
+    parser.add_argument("--once", action="store_true", help="Index up to the current head and exit")
+    args = parser.parse_args()
+
+    if DEV_MODE:
+        print("The indexer reads events from a JSON-RPC node; set INFURA_KEY or RPC_URLS (CHAIN_BACKEND=rpc)")
+        sys.exit(1)
+
+    with app.app_context():
+        indexer = CampaignIndexer(w3, contract)
+        if args.once:
+            print(f"Indexed {indexer.run_once()} events up to block {indexer.get_cursor()}")
+        else:
+            indexer.run_forever()
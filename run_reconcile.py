@@ -0,0 +1,26 @@
+import argparse
+import time
+from api.app import app
+from api.stats import reconcile_stats, STATS_RECONCILE_INTERVAL
+from models import db
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Correct drift in the campaign_stats rollup")
+    parser.add_argument("--once", action="store_true", help="Run a single reconciliation pass and exit")
+    parser.add_argument("--interval", type=float, default=STATS_RECONCILE_INTERVAL,
+                        help="Seconds between passes")
+    args = parser.parse_args()
+
+    with app.app_context():
+        while True:
+            try:
+                print(f"Reconciled campaign stats: {reconcile_stats()} row(s) corrected")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Reconciliation error: {e}")
+                if args.once:
+                    raise
+
+            if args.once:
+                break
+            time.sleep(args.interval)
@@ -0,0 +1,105 @@
+"""
+Check that chain reads degrade to stale data instead of failing when the node does
+
+Runs the API against a local stub RPC server and verifies that:
+- reads are fresh while the node is healthy
+- when the node becomes slow, reads time out and serve the last cached result, marked stale
+- once the circuit is open, reads are answered without waiting on the node
+- reads never cached before fall back to the indexed tables (or 503 without an index)
+- when the node recovers, the circuit closes and reads are fresh again
+
+Usage:
+    python scripts/check_chain_fallback.py
+
+Uses a temporary SQLite database unless DATABASE_URL is set (only use a scratch database).
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.stub_rpc import StubRPCServer
+
+stub = StubRPCServer(campaigns=20).start()
+os.environ["RPC_URLS"] = stub.url
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/fallback.db")
+os.environ.setdefault("CONTRACT_ADDRESS", "0x8123D34f5B52E8852cdA1accaC646B34DD4C77B5")
+os.environ["CHAIN_CALL_TIMEOUT"] = "0.5"
+os.environ["BLOCK_NUMBER_TTL"] = "0"
+os.environ["BREAKER_FAILURE_THRESHOLD"] = "2"
+os.environ["BREAKER_RESET_TIMEOUT"] = "1"
+os.environ["RPC_COOLDOWN"] = "0.1"
+os.environ["RPC_MAX_COOLDOWN"] = "0.1"
+
+import api.app as api
+from models import db, ChainCampaign, IndexerState
+
+
+def get(client, url):
+    started = time.monotonic()
+    response = client.get(url)
+    return response.status_code, response.get_json(), time.monotonic() - started
+
+
+def main():
+    client = api.app.test_client()
+    passed = True
+
+    def check(name, condition, detail=""):
+        nonlocal passed
+        passed &= bool(condition)
+        print(f"[{'ok' if condition else 'FAIL'}] {name}{': ' + detail if detail else ''}")
+
+    with api.app.app_context():
+        db.create_all()
+
+    status, body, _ = get(client, '/api/campaigns/3')
+    check("fresh read while the node is healthy", status == 200 and "stale" not in body, f"{status} {body}")
+
+    stub.latency = 2
+    status, body, elapsed = get(client, '/api/campaigns/3')
+    check("slow node: last cached result served stale", status == 200 and body.get("stale") is True
+          and body.get("as_of_block") == stub.block_number, f"{status} in {elapsed:.2f}s, {body}")
+
+    get(client, '/api/campaigns/3')
+    check("circuit opens after repeated failures", api.chain_breaker.state == "open", api.chain_breaker.state)
+
+    status, body, elapsed = get(client, '/api/campaigns/3')
+    check("open circuit answers without waiting on the node", status == 200 and body.get("stale") is True
+          and elapsed < 0.2, f"{status} in {elapsed:.3f}s")
+
+    status, body, _ = get(client, '/api/campaigns/7')
+    check("uncached read without an index returns 503", status == 503, f"{status} {body}")
+
+    with api.app.app_context():
+        db.session.add(IndexerState(name=api.INDEXER_NAME, last_block=990))
+        db.session.add(ChainCampaign(chain_id=7, creator="0x" + "07" * 20, title="Indexed 7", funding_goal=8.0,
+                                     current_amount=0.5, deadline=1900000007, created_block=900, updated_block=980))
+        db.session.commit()
+
+    status, body, _ = get(client, '/api/campaigns/7')
+    check("uncached read falls back to the index", status == 200 and body.get("stale") is True
+          and body.get("as_of_block") == 990 and body["campaign"]["title"] == "Indexed 7", f"{status} {body}")
+
+    status, body, _ = get(client, '/api/campaigns')
+    check("listing falls back to the index", status == 200 and body.get("stale") is True
+          and [c["id"] for c in body["campaigns"]] == [7], f"{status} {body}")
+
+    stub.latency = 0
+    time.sleep(1.1)
+    status, body, _ = get(client, '/api/campaigns/7')
+    check("recovered node: circuit closes and reads are fresh", status == 200 and "stale" not in body
+          and api.chain_breaker.state == "closed", f"{status} {body}, circuit {api.chain_breaker.state}")
+
+    print(f"    {client.get('/api/metrics').get_json()['breaker']}")
+    api.chain.close()
+    stub.stop()
+    if not passed:
+        sys.exit(1)
+    print("Chain reads degrade to stale data and recover as expected")
+
+
+if __name__ == '__main__':
+    main()
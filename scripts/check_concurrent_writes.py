@@ -0,0 +1,117 @@
+"""
+Fire parallel duplicate writes at the single-row write endpoints
+
+Each round sends the same request from many threads at once (released
+together by a barrier) and then checks that exactly one row was written
+and that no request failed with a server error. Meant for PostgreSQL,
+where the workers really run concurrently; on SQLite the writes are
+serialized by the database lock.
+
+Usage:
+    DATABASE_URL=... python scripts/check_concurrent_writes.py [--workers 16] [--rounds 5]
+
+Writes rows with random addresses and hashes; only use it on a scratch database.
+"""
+import argparse
+import os
+import secrets
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+import api.app as api
+from models import db, User, OffChainCampaign, Comment, Contribution
+
+
+def fire(url, payload, workers):
+    """POST the same payload from every worker at once and return the responses"""
+    barrier = threading.Barrier(workers)
+    responses = [None] * workers
+
+    def worker(index):
+        client = api.app.test_client()
+        barrier.wait()
+        response = client.post(url, json=payload)
+        responses[index] = (response.status_code, response.get_json())
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+def check(name, responses, ok, rows):
+    """ok is the number of responses expected to succeed; rows the number of rows that must exist"""
+    server_errors = [body for status, body in responses if status >= 500]
+    succeeded = sum(1 for status, _ in responses if status == 200)
+    passed = not server_errors and succeeded == ok and rows == 1
+
+    print(f"[{'ok' if passed else 'FAIL'}] {name}: {succeeded}/{len(responses)} succeeded, {rows} row(s)")
+    for body in server_errors[:3]:
+        print(f"    {body.get('error', '').splitlines()[0]}")
+    return passed
+
+
+def run_round(workers):
+    address = '0x' + secrets.token_hex(20)
+    chain_id = secrets.randbelow(2**31 - 1)
+    transaction_hash = '0x' + secrets.token_hex(32)
+    passed = True
+
+    # Every request creates or updates the same user; all of them succeed
+    responses = fire('/api/users', {"wallet_address": address, "bio": "concurrent"}, workers)
+    with api.app.app_context():
+        rows = User.query.filter_by(wallet_address=address).count()
+    passed &= check("create user", responses, workers, rows)
+
+    responses = fire('/api/campaign-metadata', {
+        "chain_id": chain_id, "wallet_address": '0x' + secrets.token_hex(20),
+        "title": "Concurrent", "description": "Parallel metadata writes", "image_url": ""
+    }, workers)
+    with api.app.app_context():
+        rows = OffChainCampaign.query.filter_by(chain_id=chain_id).count()
+    passed &= check("create campaign metadata", responses, workers, rows)
+
+    # New commenters race to create their user; every comment is kept
+    commenter = '0x' + secrets.token_hex(20)
+    responses = fire(f'/api/campaigns/{chain_id}/comments', {"wallet_address": commenter, "content": "hi"}, workers)
+    with api.app.app_context():
+        rows = User.query.filter_by(wallet_address=commenter).count()
+        comments = Comment.query.join(OffChainCampaign).filter(OffChainCampaign.chain_id == chain_id).count()
+    passed &= check("create comment (user)", responses, workers, rows)
+    if comments != workers:
+        print(f"[FAIL] create comment: {comments}/{workers} comments stored")
+        passed = False
+
+    # Only the first recording of a transaction succeeds; the others are rejected as duplicates
+    responses = fire('/api/contributions', {
+        "campaign_id": chain_id, "contributor_address": '0x' + secrets.token_hex(20),
+        "amount": 0.1, "transaction_hash": transaction_hash
+    }, workers)
+    with api.app.app_context():
+        rows = Contribution.query.filter_by(transaction_hash=transaction_hash).count()
+    passed &= check("record contribution", responses, 1, rows)
+
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the write endpoints under parallel duplicate requests")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with api.app.app_context():
+        db.create_all()
+
+    passed = all([run_round(args.workers) for _ in range(args.rounds)])
+    if not passed:
+        sys.exit(1)
+    print("All concurrent writes were idempotent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Check RPC routing, failover and recovery against local stub servers
+
+Starts a fast, a slow and an unreachable endpoint, then verifies that:
+- reads keep working while one endpoint refuses connections
+- most requests go to the fastest endpoint
+- when the fast endpoint starts failing, reads fail over without errors
+- once it recovers, it is used again after its cooldown, without a restart
+
+Usage:
+    python scripts/check_provider_pool.py
+"""
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from web3 import Web3
+from api.async_chain import AsyncChainClient, SyncChainClient
+from api.providers import ProviderPool, PooledHTTPProvider
+from api.utils import load_contract, get_contract_address
+from scripts.stub_rpc import StubRPCServer
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read(chain, w3, rounds):
+    """Issue async and sync reads; return the number that failed"""
+    failures = 0
+    for _ in range(rounds):
+        try:
+            chain.get_campaigns(range(5))
+            w3.eth.block_number
+        except Exception as e:
+            print(f"    read failed: {e}")
+            failures += 1
+    return failures
+
+
+def main():
+    fast = StubRPCServer(latency=0.005, campaigns=20).start()
+    slow = StubRPCServer(latency=0.05, campaigns=20).start()
+    dead = f"http://127.0.0.1:{unused_port()}"
+
+    pool = ProviderPool([dead, slow.url, fast.url], cooldown=0.5, max_cooldown=1.0, explore_rate=0.1)
+    address = Web3.to_checksum_address(get_contract_address())
+    chain = SyncChainClient(AsyncChainClient(pool, address, load_contract(), concurrency=4))
+    w3 = Web3(PooledHTTPProvider(pool))
+    passed = True
+
+    def check(name, condition, detail=""):
+        nonlocal passed
+        passed &= bool(condition)
+        print(f"[{'ok' if condition else 'FAIL'}] {name}{': ' + detail if detail else ''}")
+
+    failures = read(chain, w3, 40)
+    check("reads succeed with one endpoint refusing connections", failures == 0, f"{failures} failed")
+    check("fastest endpoint preferred", fast.requests > 2 * slow.requests,
+          f"fast {fast.requests} vs slow {slow.requests} requests")
+
+    fast.down = True
+    before = slow.requests
+    failures = read(chain, w3, 20)
+    check("fail over when the fastest endpoint returns errors", failures == 0 and slow.requests > before,
+          f"{failures} failed, slow served {slow.requests - before}")
+
+    fast.down = False
+    time.sleep(1.1)
+    before = fast.requests
+    failures = read(chain, w3, 40)
+    check("recovered endpoint used again after its cooldown", failures == 0 and fast.requests - before > 20,
+          f"fast served {fast.requests - before}")
+
+    for endpoint in pool.stats():
+        print(f"    {endpoint}")
+
+    chain.close()
+    fast.stop()
+    slow.stop()
+    if not passed:
+        sys.exit(1)
+    print("Provider pool routes, fails over and recovers as expected")
+
+
+if __name__ == '__main__':
+    main()
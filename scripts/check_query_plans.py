@@ -0,0 +1,196 @@
+"""
+Check that the read endpoints are served by index scans
+
+Every endpoint below is called through the Flask test client; each SQL
+statement it emits is captured and run again under EXPLAIN. A statement
+fails the check if its plan scans one of the hot tables sequentially.
+On PostgreSQL sequential scans are disabled for the check, so small
+tables report whether an index *can* serve the query rather than whether
+the planner prefers one at the current size.
+
+Usage:
+    DATABASE_URL=... python scripts/check_query_plans.py [--seed]
+
+--seed inserts a small fixture first; only use it on a scratch database.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+os.environ.setdefault("READ_FROM_INDEX", "true")
+
+from sqlalchemy import event
+import api.app as api
+from models import (db, User, OffChainCampaign, Comment, UserActivity, Contribution,
+                    ChainCampaign, ContributionBalance)
+
+HOT_TABLES = {
+    'users', 'campaigns', 'comments', 'contributions', 'user_activities',
+    'chain_campaigns', 'contribution_balances', 'refunds'
+}
+
+
+def seed():
+    """Insert a minimal fixture covering every checked endpoint"""
+    user = User(wallet_address='0x00000000000000000000000000000000000000a1')
+    db.session.add(user)
+    db.session.flush()
+
+    db.session.add(OffChainCampaign(chain_id=0, creator_id=user.id, title='Plan check',
+                                    description='Fixture', image_url=''))
+    db.session.add(ChainCampaign(chain_id=0, creator=user.wallet_address, title='Plan check',
+                                 funding_goal=1.0, current_amount=0.5, funding_ratio=0.5,
+                                 deadline=2**40, created_block=1, updated_block=1))
+    db.session.add(ContributionBalance(campaign_id=0, contributor_address=user.wallet_address,
+                                       amount=0.5, updated_block=1))
+    db.session.add(Contribution(campaign_id=0, contributor_address=user.wallet_address,
+                                amount=0.5, transaction_hash='0x' + 'a1' * 32))
+    db.session.add(UserActivity(user_id=user.id, activity_type='contribution', campaign_id=0))
+    db.session.commit()
+
+    campaign = OffChainCampaign.query.filter_by(chain_id=0).first()
+    comment = Comment(user_id=user.id, campaign_id=campaign.id, content='Top level')
+    db.session.add(comment)
+    db.session.flush()
+    db.session.add(Comment(user_id=user.id, campaign_id=campaign.id, content='Reply', parent_id=comment.id))
+    db.session.commit()
+
+
+def sample_ids():
+    """Pick existing rows to build endpoint URLs from"""
+    campaign = OffChainCampaign.query.first()
+    user = User.query.first()
+    if not campaign or not user:
+        sys.exit("No campaigns or users to check against; run with --seed on a scratch database")
+    return campaign.chain_id, user.wallet_address, user.id
+
+
+def endpoint_urls(chain_id, address):
+    return [
+        "/api/campaigns?limit=20&sort=newest",
+        "/api/campaigns?limit=20&sort=ending_soon",
+        "/api/campaigns?limit=20&sort=most_funded",
+        "/api/campaigns?limit=20&sort=closest_to_goal",
+        f"/api/campaigns?limit=20&creator={address}",
+        f"/api/campaigns/{chain_id}",
+        f"/api/campaigns/{chain_id}/contribution/{address}",
+        f"/api/campaigns/{chain_id}/comments",
+        f"/api/campaigns/{chain_id}/page?viewer={address}",
+        f"/api/campaign-metadata/{chain_id}",
+        f"/api/users/{address}",
+        f"/api/users/{address}/contributions",
+    ]
+
+
+def capture_statements(client, url):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    if response.status_code >= 500:
+        raise RuntimeError(f"{url} failed: {response.get_json()}")
+    return statements
+
+
+def sequential_scans(connection, statement, parameters):
+    """Return the hot tables the plan of a statement scans without an index"""
+    cursor = connection.cursor()
+    try:
+        if db.engine.dialect.name == 'postgresql':
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return sorted(_pg_seq_scans(plan[0]["Plan"]))
+
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        details = [row[-1] for row in cursor.fetchall()]
+        # An unfiltered statement (e.g. the newest page of a list) walks the table
+        # in primary key order by design; any filtered one must use an index
+        if not re.search(r"\bWHERE\b", statement, re.IGNORECASE):
+            return []
+        scans = set()
+        for detail in details:
+            words = detail.split()
+            if words[:1] == ["SCAN"] and "USING" not in words and words[1] in HOT_TABLES:
+                scans.add(words[1])
+        return sorted(scans)
+    finally:
+        cursor.close()
+
+
+def _pg_seq_scans(node):
+    scans = set()
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in HOT_TABLES:
+        scans.add(node["Relation Name"])
+    for child in node.get("Plans", []):
+        scans |= _pg_seq_scans(child)
+    return scans
+
+
+def check_activity_feed(connection, user_id):
+    """user_activities has no endpoint yet; check the feed query it will use"""
+    query = UserActivity.query.filter_by(user_id=user_id).order_by(UserActivity.created_at.desc()).limit(20)
+    compiled = query.statement.compile(db.engine)
+    params = compiled.params
+    if db.engine.dialect.name == 'postgresql':
+        statement = str(compiled)
+    else:
+        statement = str(compiled)
+        params = tuple(params[name] for name in compiled.positiontup)
+    return sequential_scans(connection, statement, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify that read endpoints use index scans")
+    parser.add_argument("--seed", action="store_true", help="Insert a small fixture first (scratch databases only)")
+    args = parser.parse_args()
+
+    failures = 0
+    with api.app.app_context():
+        db.create_all()
+        if args.seed:
+            seed()
+
+        chain_id, address, user_id = sample_ids()
+        client = api.app.test_client()
+        connection = db.engine.raw_connection()
+
+        try:
+            # Index-backed and table-backed variants of the same endpoints
+            for read_from_index in (True, False):
+                api.READ_FROM_INDEX = read_from_index
+                for url in endpoint_urls(chain_id, address):
+                    for statement, parameters in capture_statements(client, url):
+                        scans = sequential_scans(connection, statement, parameters)
+                        status = "FAIL" if scans else "ok"
+                        failures += bool(scans)
+                        detail = f" (sequential scan on {', '.join(scans)})" if scans else ""
+                        print(f"[{status}] index={read_from_index} {url}{detail}")
+
+            scans = check_activity_feed(connection, user_id)
+            failures += bool(scans)
+            print(f"[{'FAIL' if scans else 'ok'}] user activity feed" +
+                  (f" (sequential scan on {', '.join(scans)})" if scans else ""))
+        finally:
+            connection.close()
+
+    if failures:
+        print(f"{failures} statement(s) are not served by an index")
+        sys.exit(1)
+    print("All checked statements use indexes")
+
+
+if __name__ == '__main__':
+    main()
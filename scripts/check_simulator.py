@@ -0,0 +1,113 @@
+"""
+Check the simulated contract against the rules of contracts/Campaign.sol
+
+Runs create / contribute / claim / refund scenarios on a SimulatedChain and
+verifies state, revert reasons, events and block numbers, then that injected
+latency and failures behave like a slow or unreachable node.
+
+Usage:
+    python scripts/check_simulator.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from web3.exceptions import ContractLogicError
+from api.providers import ProvidersUnavailable
+from api.simulator import SimulatedChain, DAY
+
+ETH = 10**18
+CREATOR = "0x" + "c1" * 20
+ALICE = "0x" + "a1" * 20
+BOB = "0x" + "b0" * 20
+
+
+def main():
+    passed = True
+
+    def check(name, condition, detail=""):
+        nonlocal passed
+        passed &= bool(condition)
+        print(f"[{'ok' if condition else 'FAIL'}] {name}{': ' + detail if detail else ''}")
+
+    def reverts(name, reason, fn, *args):
+        try:
+            fn(*args)
+        except ContractLogicError as e:
+            check(name, reason in str(e), str(e))
+            return
+        check(name, False, "did not revert")
+
+    chain = SimulatedChain(campaigns=1000, seed=7)
+    check("generated campaigns exist", chain.get_campaign(999)["exists"] and not chain.get_campaign(1000)["exists"])
+    check("generation is seeded", chain.get_campaign(5) == SimulatedChain(campaigns=1000, seed=7).get_campaign(5))
+
+    reverts("zero funding goal reverts", "Funding goal must be greater than 0",
+            chain.create_campaign, CREATOR, "t", "d", "i", 0, 1)
+    start_block = chain.block_number()
+    funded, _ = chain.create_campaign(CREATOR, "Funded", "d", "i", 1 * ETH, 1)
+    failed, _ = chain.create_campaign(CREATOR, "Failed", "d", "i", 5 * ETH, 1)
+    check("each transaction mines a block", chain.block_number() == start_block + 2)
+
+    chain.contribute(ALICE, funded, 6 * ETH // 10)
+    chain.contribute(BOB, funded, 6 * ETH // 10)
+    chain.contribute(ALICE, failed, 1 * ETH)
+    check("contributions add up", chain.get_campaign(funded)["currentAmount"] == 1.2
+          and chain.get_contribution(funded, ALICE) == 0.6, str(chain.get_campaign(funded)))
+    reverts("missing campaign reverts", "Campaign does not exist", chain.contribute, ALICE, 10**6, ETH)
+    reverts("claim before the deadline reverts", "Campaign has not ended yet", chain.claim_funds, CREATOR, funded)
+    reverts("refund before the deadline reverts", "Campaign has not ended yet", chain.request_refund, ALICE, failed)
+
+    chain.advance_time(2 * DAY)
+    reverts("contribution after the deadline reverts", "Campaign has ended", chain.contribute, BOB, funded, ETH)
+    reverts("only the creator can claim", "Only creator can claim funds", chain.claim_funds, ALICE, funded)
+    reverts("claim below the goal reverts", "Funding goal not reached", chain.claim_funds, CREATOR, failed)
+    chain.claim_funds(CREATOR, funded)
+    check("claim marks the campaign claimed", chain.get_campaign(funded)["claimed"])
+    reverts("second claim reverts", "Funds already claimed", chain.claim_funds, CREATOR, funded)
+    reverts("refund of a funded campaign reverts", "Funding goal reached, cannot refund",
+            chain.request_refund, ALICE, funded)
+
+    chain.request_refund(ALICE, failed)
+    check("refund zeroes the contribution but not currentAmount",
+          chain.get_contribution(failed, ALICE) == 0 and chain.get_campaign(failed)["currentAmount"] == 1.0)
+    reverts("second refund reverts", "No contribution to refund", chain.request_refund, ALICE, failed)
+
+    events = [event["event"] for event in chain.get_events(start_block + 1, chain.block_number())]
+    check("events emitted in block order", events == [
+        "CampaignCreated", "CampaignCreated", "ContributionMade", "ContributionMade", "ContributionMade",
+        "FundsClaimed", "FundsRefunded"
+    ], str(events))
+    check("block timestamps follow the simulated clock",
+          chain.get_block(chain.block_number())["timestamp"] >= time.time() + 2 * DAY - 5)
+
+    chain.latency = 0.05
+    started = time.monotonic()
+    chain.get_campaign(1)
+    check("injected latency delays reads", time.monotonic() - started >= 0.05)
+
+    chain.latency, chain.call_timeout = 0.2, 0.1
+    try:
+        chain.block_number()
+        check("latency beyond the call timeout raises TimeoutError", False)
+    except TimeoutError:
+        check("latency beyond the call timeout raises TimeoutError", True)
+
+    chain.latency, chain.fail_rate = 0, 0.5
+    failures = 0
+    for _ in range(1000):
+        try:
+            chain.block_number()
+        except ProvidersUnavailable:
+            failures += 1
+    check("injected failures follow fail_rate", 400 < failures < 600, f"{failures}/1000 failed")
+
+    if not passed:
+        sys.exit(1)
+    print("Simulated contract follows Campaign.sol")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Check that identical concurrent chain reads share one RPC call
+
+Sends the same campaign request from many threads at once against a slow stub
+RPC server and verifies that the node sees one block number poll and one
+getCampaign call, that every request gets the same answer, and that the
+coalesced count shows up in /api/metrics.
+
+Usage:
+    python scripts/check_singleflight.py [--workers 100] [--latency 0.2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.stub_rpc import StubRPCServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check coalescing of identical concurrent chain reads")
+    parser.add_argument("--workers", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the stub node takes per request")
+    args = parser.parse_args()
+
+    stub = StubRPCServer(campaigns=20, latency=args.latency).start()
+    os.environ["RPC_URLS"] = stub.url
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/singleflight.db")
+    os.environ.setdefault("CONTRACT_ADDRESS", "0x8123D34f5B52E8852cdA1accaC646B34DD4C77B5")
+
+    import api.app as api
+
+    barrier = threading.Barrier(args.workers)
+    responses = [None] * args.workers
+
+    def worker(index):
+        client = api.app.test_client()
+        barrier.wait()
+        response = client.get('/api/campaigns/3')
+        responses[index] = (response.status_code, response.get_json())
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    metrics = api.app.test_client().get('/api/metrics').get_json()
+    flight = metrics["singleflight"]
+    passed = True
+
+    def check(name, condition, detail=""):
+        nonlocal passed
+        passed &= bool(condition)
+        print(f"[{'ok' if condition else 'FAIL'}] {name}{': ' + detail if detail else ''}")
+
+    check("every request succeeded with the same campaign",
+          all(status == 200 for status, _ in responses) and len({str(body) for _, body in responses}) == 1)
+    calls = stub.calls["eth_blockNumber"], stub.calls["getCampaign"]
+    check("node saw one block number poll and one getCampaign call", calls == (1, 1),
+          f"{calls[0]} eth_blockNumber and {calls[1]} getCampaign calls for {args.workers} API requests")
+    check("coalesced requests reported in /api/metrics", flight["coalesced"] >= args.workers - 1,
+          str(flight))
+
+    api.chain.close()
+    stub.stop()
+    if not passed:
+        sys.exit(1)
+    print("Identical concurrent reads were coalesced")
+
+
+if __name__ == '__main__':
+    main()
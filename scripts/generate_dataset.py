@@ -0,0 +1,309 @@
+"""
+Fill a scratch database with a seeded synthetic dataset at production scale
+
+The size is given as a number of contributions; the other tables follow from it:
+    campaigns        contributions / 50
+    users            contributions / 4
+    comments         contributions / 2
+    user_activities  one per contribution and per comment
+
+Distributions:
+- contributions and comments per campaign follow a power law (a few campaigns
+  get most of the traffic, most get a handful), with the same campaigns popular in both
+- contributors and campaign creators are drawn from a long-tail user population:
+  most users act once, a few act thousands of times
+- 60% of comments are replies, mostly to the latest comments of their campaign,
+  which builds long reply chains
+- amounts are log-normal, timestamps spread over the last 180 days
+
+The indexer tables (chain_campaigns, contribution_balances, indexer_state) and the
+campaign_stats rollup are filled as well, so every endpoint has data to serve.
+
+Usage:
+    DATABASE_URL=... python scripts/generate_dataset.py --contributions 100000 [--seed 1] [--reset]
+
+Only use it on a scratch database; --reset drops and recreates every table first.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from models import (db, User, OffChainCampaign, Comment, UserActivity, Contribution, ChainCampaign,
+                    ContributionBalance, IndexerState)
+
+# Power law exponents of campaign popularity and user activity
+CAMPAIGN_EXPONENT = 1.1
+USER_EXPONENT = 1.2
+# Share of comments that reply to another comment, and how many recent comments a reply picks from
+REPLY_SHARE = 0.6
+REPLY_WINDOW = 8
+HISTORY_DAYS = 180
+CATEGORIES = ['Technology', 'Art', 'Community', 'Education', 'Environment', 'Health', 'Games', 'Music']
+WORDS = ['open', 'solar', 'garden', 'library', 'protocol', 'studio', 'clinic', 'film', 'school', 'network',
+         'water', 'festival', 'archive', 'lab', 'map', 'kitchen', 'bridge', 'radio', 'atlas', 'forest']
+
+
+def table_sizes(contributions):
+    return {
+        "campaigns": max(10, contributions // 50),
+        "users": max(20, contributions // 4),
+        "comments": contributions // 2,
+        "contributions": contributions
+    }
+
+
+def power_law(count, exponent):
+    """Cumulative weights for random.choices: the item at rank r has weight 1 / r**exponent"""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class Dataset:
+    """Seeded row generator; rows are produced in chunks so any size fits in memory"""
+
+    def __init__(self, contributions, seed=1, now=None):
+        self.sizes = table_sizes(contributions)
+        self.rng = random.Random(seed)
+        self.now = now or datetime.datetime.utcnow().replace(microsecond=0)
+        self.start = self.now - datetime.timedelta(days=HISTORY_DAYS)
+
+        # Popularity ranks are shuffled so that heavy users and campaigns are spread over the ID range
+        self.user_ids = list(range(1, self.sizes["users"] + 1))
+        self.rng.shuffle(self.user_ids)
+        self.campaign_ids = list(range(self.sizes["campaigns"]))
+        self.rng.shuffle(self.campaign_ids)
+        self.user_weights = power_law(self.sizes["users"], USER_EXPONENT)
+        self.campaign_weights = power_law(self.sizes["campaigns"], CAMPAIGN_EXPONENT)
+
+        addresses = self.rng.randbytes(20 * self.sizes["users"]).hex()
+        self.addresses = ['0x' + addresses[start:start + 40] for start in range(0, len(addresses), 40)]
+        self.totals = defaultdict(float)
+
+    def address(self, user_id):
+        return self.addresses[user_id - 1]
+
+    def pick_users(self, count):
+        return self.rng.choices(self.user_ids, cum_weights=self.user_weights, k=count)
+
+    def pick_campaigns(self, count):
+        return self.rng.choices(self.campaign_ids, cum_weights=self.campaign_weights, k=count)
+
+    def moment(self):
+        return self.start + datetime.timedelta(seconds=self.rng.uniform(0, HISTORY_DAYS * 86400))
+
+    def users(self):
+        rng = self.rng
+        for user_id in range(1, self.sizes["users"] + 1):
+            created_at = self.moment()
+            yield {
+                "id": user_id,
+                "wallet_address": self.address(user_id),
+                "username": f"user{user_id}" if rng.random() < 0.3 else None,
+                "email": f"user{user_id}@example.com" if rng.random() < 0.1 else None,
+                "bio": f"Backer of {rng.choice(WORDS)} projects" if rng.random() < 0.2 else None,
+                "created_at": created_at,
+                "updated_at": created_at
+            }
+
+    def campaign_creators(self):
+        """Creator user ID of every campaign, long-tail distributed"""
+        return self.pick_users(self.sizes["campaigns"])
+
+    def campaigns(self, creators):
+        rng = self.rng
+        for chain_id, creator_id in enumerate(creators):
+            created_at = self.moment()
+            title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {chain_id}"
+            yield {
+                "id": chain_id + 1,
+                "chain_id": chain_id,
+                "creator_id": creator_id,
+                "title": title,
+                "description": f"Funding the {title.lower()} " + " ".join(rng.choices(WORDS, k=30)),
+                "image_url": f"https://picsum.photos/seed/{chain_id}/800/500",
+                "category": rng.choice(CATEGORIES),
+                "tags": ",".join(rng.sample(WORDS, 3)),
+                "created_at": created_at,
+                "updated_at": created_at
+            }
+
+    def contributions(self, chunk_size):
+        """Chunks of (contribution rows, activity rows)"""
+        rng = self.rng
+        remaining = self.sizes["contributions"]
+        while remaining:
+            count = min(chunk_size, remaining)
+            remaining -= count
+            contributions, activities = [], []
+            for campaign_id, user_id in zip(self.pick_campaigns(count), self.pick_users(count)):
+                amount = round(min(rng.lognormvariate(-2.5, 1.2), 50.0), 6)
+                transaction_hash = '0x' + rng.randbytes(32).hex()
+                timestamp = self.moment()
+                self.totals[campaign_id] += amount
+                contributions.append({
+                    "campaign_id": campaign_id, "contributor_address": self.address(user_id),
+                    "amount": amount, "transaction_hash": transaction_hash, "timestamp": timestamp
+                })
+                activities.append({
+                    "user_id": user_id, "activity_type": "contribution", "campaign_id": campaign_id,
+                    "activity_data": json.dumps({"amount": amount, "transaction_hash": transaction_hash}),
+                    "created_at": timestamp
+                })
+            yield contributions, activities
+
+    def comments(self, chunk_size):
+        """Chunks of (comment rows, activity rows), in creation order so replies follow their parents"""
+        rng = self.rng
+        total = self.sizes["comments"]
+        step = HISTORY_DAYS * 86400 / max(total, 1)
+        recent = defaultdict(lambda: deque(maxlen=REPLY_WINDOW))
+        comment_id = 0
+        while comment_id < total:
+            count = min(chunk_size, total - comment_id)
+            comments, activities = [], []
+            for campaign_id, user_id in zip(self.pick_campaigns(count), self.pick_users(count)):
+                comment_id += 1
+                created_at = self.start + datetime.timedelta(seconds=comment_id * step)
+                thread = recent[campaign_id]
+                parent_id = None
+                if thread and rng.random() < REPLY_SHARE:
+                    # Favour the newest comments, so conversations keep going deeper
+                    parent_id = thread[-1 - min(int(rng.expovariate(1.0)), len(thread) - 1)]
+                thread.append(comment_id)
+                comments.append({
+                    "id": comment_id, "user_id": user_id, "campaign_id": campaign_id + 1,
+                    "content": " ".join(rng.choices(WORDS, k=rng.randint(3, 40))),
+                    "parent_id": parent_id, "created_at": created_at, "updated_at": created_at
+                })
+                activities.append({
+                    "user_id": user_id, "activity_type": "comment", "campaign_id": campaign_id,
+                    "activity_data": json.dumps({"comment_id": comment_id}), "created_at": created_at
+                })
+            yield comments, activities
+
+    def chain_campaigns(self, creators, head_block):
+        rng = self.rng
+        now = int(self.now.timestamp())
+        for chain_id, creator_id in enumerate(creators):
+            goal = round(rng.lognormvariate(0.5, 1.0) + 0.1, 4)
+            raised = self.totals.get(chain_id, 0.0)
+            deadline = now + rng.randint(-60 * 86400, 90 * 86400)
+            created_block = rng.randint(1, head_block)
+            yield {
+                "chain_id": chain_id,
+                "creator": self.address(creator_id),
+                "title": f"Campaign {chain_id}",
+                "description": None,
+                "image_url": None,
+                "funding_goal": goal,
+                "current_amount": raised,
+                "funding_ratio": raised / goal,
+                "deadline": deadline,
+                "claimed": deadline <= now and raised >= goal and rng.random() < 0.5,
+                "created_block": created_block,
+                "updated_block": created_block
+            }
+
+
+def insert_rows(model, rows, chunk_size):
+    """Insert rows (an iterable of dicts) in executemany chunks, committing each one"""
+    inserted = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return inserted
+        db.session.execute(db.insert(model), chunk)
+        db.session.commit()
+        inserted += len(chunk)
+
+
+def reset_sequences():
+    """Move PostgreSQL ID sequences past the explicitly inserted IDs"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in ('users', 'campaigns', 'comments'):
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+    db.session.commit()
+
+
+def generate(contributions, seed=1, chunk_size=10000, head_block=1_000_000):
+    """Generate and insert the dataset into the current app's database and return the row counts"""
+    # Imported here so that the app's configuration is read after the caller set up the environment
+    from api.indexer import INDEXER_NAME
+    from api.stats import reconcile_stats
+
+    data = Dataset(contributions, seed)
+    counts = defaultdict(int)
+
+    counts["users"] = insert_rows(User, data.users(), chunk_size)
+    creators = data.campaign_creators()
+    counts["campaigns"] = insert_rows(OffChainCampaign, data.campaigns(creators), chunk_size)
+
+    for contribution_rows, activity_rows in data.contributions(chunk_size):
+        db.session.execute(db.insert(Contribution), contribution_rows)
+        db.session.execute(db.insert(UserActivity), activity_rows)
+        db.session.commit()
+        counts["contributions"] += len(contribution_rows)
+        counts["user_activities"] += len(activity_rows)
+
+    for comment_rows, activity_rows in data.comments(chunk_size):
+        db.session.execute(db.insert(Comment), comment_rows)
+        db.session.execute(db.insert(UserActivity), activity_rows)
+        db.session.commit()
+        counts["comments"] += len(comment_rows)
+        counts["user_activities"] += len(activity_rows)
+
+    # What the indexer would have built from the same contributions
+    counts["chain_campaigns"] = insert_rows(ChainCampaign, data.chain_campaigns(creators, head_block), chunk_size)
+    db.session.execute(db.insert(ContributionBalance).from_select(
+        ['campaign_id', 'contributor_address', 'amount', 'updated_block'],
+        db.select(Contribution.campaign_id, Contribution.contributor_address, db.func.sum(Contribution.amount),
+                  db.literal(head_block)).group_by(Contribution.campaign_id, Contribution.contributor_address)
+    ))
+    db.session.add(IndexerState(name=INDEXER_NAME, last_block=head_block))
+    db.session.commit()
+
+    counts["campaign_stats"] = reconcile_stats()
+    reset_sequences()
+    return dict(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a scratch database with a synthetic dataset")
+    parser.add_argument("--contributions", type=int, default=100000, help="Scale of the dataset")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first")
+    args = parser.parse_args()
+
+    # The simulated chain is not needed to write the database
+    os.environ.setdefault("SIM_CAMPAIGNS", "0")
+    from api.app import app
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        if User.query.first() is not None:
+            sys.exit("The database already has data; use --reset on a scratch database")
+
+        started = time.monotonic()
+        counts = generate(args.contributions, args.seed, args.chunk_size)
+
+    for table, count in counts.items():
+        print(f"{table:>16}: {count}")
+    print(f"Generated in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Stub Ethereum JSON-RPC server serving a fake Campaign contract
+
+Answers the calls the API makes (campaignCount, getCampaign, getContribution,
+eth_blockNumber, eth_chainId, eth_getLogs, eth_getBlockByNumber), including
+batch requests, with configurable latency and failures. Run several on
+different ports to exercise the provider pool:
+
+    python scripts/stub_rpc.py --port 8545 --latency 0.02 &
+    python scripts/stub_rpc.py --port 8546 --latency 0.15 --fail-rate 0.1 &
+    RPC_URLS=http://127.0.0.1:8545,http://127.0.0.1:8546 python run_api.py
+
+Any contract address is accepted; the API needs INFURA_KEY or RPC_URLS set
+so that it does not start in development mode.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from eth_abi import encode, decode
+from eth_utils import keccak
+
+
+def selector(signature):
+    return keccak(text=signature)[:4].hex()
+
+
+CAMPAIGN_COUNT = selector("campaignCount()")
+GET_CAMPAIGN = selector("getCampaign(uint256)")
+GET_CONTRIBUTION = selector("getContribution(uint256,address)")
+CAMPAIGN_TYPES = ["address", "string", "string", "string", "uint256", "uint256", "uint256", "bool", "bool"]
+
+
+class StubRPCServer:
+    """
+    A stub JSON-RPC endpoint running in a background thread
+    latency, fail_rate and down can be changed while it runs
+    """
+
+    def __init__(self, port=0, campaigns=100, latency=0.0, fail_rate=0.0, chain_id=11155111):
+        self.campaigns = campaigns
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.down = False
+        self.chain_id = chain_id
+        self.block_number = 1000
+        self.requests = 0
+        self.calls = Counter()  # JSON-RPC calls answered, by method (eth_call by contract function)
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                status, payload = stub.handle(body)
+                data = json.dumps(payload).encode() if payload is not None else b""
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting (e.g. a timeout under test)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, body):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.down or random.random() < self.fail_rate:
+            return 503, {"error": "unavailable"}
+
+        request = json.loads(body)
+        if isinstance(request, list):
+            return 200, [self.answer(item) for item in request]
+        return 200, self.answer(request)
+
+    def answer(self, request):
+        with self._lock:
+            method = request["method"]
+            if method == "eth_call":
+                data = request["params"][0].get("data") or request["params"][0].get("input")
+                method = {CAMPAIGN_COUNT: "campaignCount", GET_CAMPAIGN: "getCampaign",
+                          GET_CONTRIBUTION: "getContribution"}.get(data[2:10], method)
+            self.calls[method] += 1
+        try:
+            result = self.result(request["method"], request.get("params", []))
+            return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": str(e)}}
+
+    def result(self, method, params):
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_getLogs":
+            return []
+        if method == "eth_getBlockByNumber":
+            number = self.block_number if params[0] in ("latest", "pending") else int(params[0], 16)
+            return {"number": hex(number), "timestamp": hex(1700000000 + 12 * number),
+                    "hash": "0x" + number.to_bytes(32, "big").hex(), "parentHash": "0x" + "00" * 32,
+                    "transactions": []}
+        if method == "eth_call":
+            return "0x" + self.call(params[0].get("data") or params[0].get("input")).hex()
+        raise ValueError(f"Method {method} is not supported by the stub")
+
+    def call(self, data):
+        function, args = data[2:10], bytes.fromhex(data[10:])
+        if function == CAMPAIGN_COUNT:
+            return encode(["uint256"], [self.campaigns])
+        if function == GET_CAMPAIGN:
+            (campaign_id,) = decode(["uint256"], args)
+            exists = campaign_id < self.campaigns
+            return encode(CAMPAIGN_TYPES, [
+                "0x" + f"{campaign_id % 256:02x}" * 20, f"Campaign {campaign_id}" if exists else "",
+                "Stub campaign" if exists else "", "https://picsum.photos/800/500" if exists else "",
+                (campaign_id % 10 + 1) * 10**18 if exists else 0, campaign_id * 10**15 if exists else 0,
+                1900000000 + campaign_id if exists else 0, False, exists
+            ])
+        if function == GET_CONTRIBUTION:
+            campaign_id, contributor = decode(["uint256", "address"], args)
+            return encode(["uint256"], [(campaign_id + int(contributor, 16)) % 10 * 10**16])
+        raise ValueError("execution reverted")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a fake Campaign contract over JSON-RPC")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--campaigns", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    args = parser.parse_args()
+
+    stub = StubRPCServer(args.port, args.campaigns, args.latency, args.fail_rate).start()
+    print(f"Stub JSON-RPC server listening on {stub.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()